@@ -6,6 +6,8 @@ from .models import (
     AgentPerformance,
     SystemLog,
     ConfiguracionSistema,
+    HorarioLaboral,
+    DiaFeriado,
     RotacionProgramada
 )
 
@@ -108,6 +110,7 @@ class ConfiguracionSistemaAdmin(admin.ModelAdmin):
                 'mensaje_auto_respuesta',
                 'color_primario',
                 'horario_laboral',
+                'hora_limite_tickets',
             )
         }),
         ('Control', {
@@ -116,6 +119,24 @@ class ConfiguracionSistemaAdmin(admin.ModelAdmin):
     )
 
 
+# =====================================================
+# CALENDARIO LABORAL
+# =====================================================
+@admin.register(HorarioLaboral)
+class HorarioLaboralAdmin(admin.ModelAdmin):
+    list_display = ('area', 'dia_semana', 'hora_inicio', 'hora_fin')
+    list_filter = ('area', 'dia_semana')
+    ordering = ('area', 'dia_semana', 'hora_inicio')
+
+
+@admin.register(DiaFeriado)
+class DiaFeriadoAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'nombre', 'area')
+    list_filter = ('area',)
+    search_fields = ('nombre',)
+    date_hierarchy = 'fecha'
+
+
 # =====================================================
 # ROTACIÓN DE PERSONAL
 # =====================================================
@@ -1,10 +1,17 @@
 # admin_serializers.py - ACTUALIZAR
+from datetime import time
+
 from rest_framework import serializers
 from django.utils import timezone
 from tickets.models import Ticket
 from users.models import User, Rol, Area  # Importar Rol y Area
-from django.db.models import Avg, Q
-from .models import AgentPerformance, Category, Priority, SLA, ConfiguracionSistema, SystemLog, RotacionProgramada
+from django.db.models import Count, Q
+from django.utils.functional import cached_property
+from .models import (
+    AgentPerformance, Category, Priority, SLA, ConfiguracionSistema, SystemLog, RotacionProgramada,
+    HorarioLaboral, DiaFeriado,
+)
+from .filtros import FiltroTicketsService
 
 
 class AdminDashboardMetricsSerializer(serializers.Serializer):
@@ -32,7 +39,6 @@ class AdminAgentPerformanceSerializer(serializers.ModelSerializer):
     agente = serializers.CharField(source="agente.username", read_only=True)
     agente_id = serializers.IntegerField(source="agente.id", read_only=True)
     rol = serializers.CharField(source="agente.rol.nombre_visible", read_only=True)
-    rating_promedio = serializers.SerializerMethodField()
 
     class Meta:
         model = AgentPerformance
@@ -48,11 +54,6 @@ class AdminAgentPerformanceSerializer(serializers.ModelSerializer):
             "actualizado_en",
         ]
 
-    def get_rating_promedio(self, obj):
-        qs = Ticket.objects.filter(agente=obj.agente, rating__isnull=False)
-        if qs.exists():
-            return round(qs.aggregate(Avg("rating"))["rating__avg"], 2)
-        return 0
 
 class RolAdminSerializer(serializers.ModelSerializer):
     """Serializer para mostrar información de roles en el panel de administración."""
@@ -377,8 +378,15 @@ class AdminUserListSerializer(serializers.ModelSerializer):
             'fecha_registro', 'ultimo_login',
             'total_tickets_asignados', 'dias_desde_registro', 'dias_desde_ultimo_login'
         ]
+        # Necesidades de carga de la lista (ver tickets/optimizacion.py)
+        select_related = ('rol', 'area')
+        anotaciones = {'num_tickets_asignados': Count('tickets_asignados')}
     
     def get_total_tickets_asignados(self, obj):
+        # Anotado en las listas; un usuario suelto (crear / actualizar) se cuenta aparte
+        total = getattr(obj, 'num_tickets_asignados', None)
+        if total is not None:
+            return total
         from tickets.models import Ticket
         return Ticket.objects.filter(agente=obj).count()
     
@@ -447,19 +455,16 @@ class AdminTicketSerializer(serializers.ModelSerializer):
             'solicitante_info', 'agente_info', 'categoria_principal', 'rating',
             'fecha_creacion', 'fecha_actualizacion', 'fecha_cierre', 'dias_abierto'
         ]
+        select_related = ('solicitante', 'agente', 'categoria_principal')
+
+    @cached_property
+    def colores_prioridad(self):
+        # Una sola lectura por lista (con many=True la instancia se reutiliza por fila)
+        return FiltroTicketsService.catalogos()['colores']
 
     def get_prioridad_color(self, obj):
-        # Si es un objeto (ForeignKey)
-        if hasattr(obj, 'prioridad') and hasattr(obj.prioridad, 'color'):
-            return obj.prioridad.color
-        # Si es un string (CharField) - Caso más probable según utils_filters.py
-        if isinstance(obj.prioridad, str):
-            try:
-                p = Priority.objects.filter(nombre=obj.prioridad).first()
-                return p.color if p else "#808080"
-            except:
-                pass
-        return "#808080"
+        # El ticket guarda el nombre de la prioridad (CharField)
+        return self.colores_prioridad.get(obj.prioridad, "#808080")
 
 
 class AdminTicketUpdateSerializer(serializers.ModelSerializer):
@@ -515,6 +520,30 @@ class SLASerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class HorarioLaboralSerializer(serializers.ModelSerializer):
+    area_nombre = serializers.CharField(source='area.nombre', read_only=True, allow_null=True)
+    dia_semana_display = serializers.CharField(source='get_dia_semana_display', read_only=True)
+
+    class Meta:
+        model = HorarioLaboral
+        fields = ['id', 'area', 'area_nombre', 'dia_semana', 'dia_semana_display', 'hora_inicio', 'hora_fin']
+
+    def validate(self, data):
+        inicio = data.get('hora_inicio', getattr(self.instance, 'hora_inicio', None))
+        fin = data.get('hora_fin', getattr(self.instance, 'hora_fin', None))
+        if inicio and fin and fin != time.min and fin <= inicio:
+            raise serializers.ValidationError({'hora_fin': 'La hora de fin debe ser posterior a la de inicio.'})
+        return data
+
+
+class DiaFeriadoSerializer(serializers.ModelSerializer):
+    area_nombre = serializers.CharField(source='area.nombre', read_only=True, allow_null=True)
+
+    class Meta:
+        model = DiaFeriado
+        fields = ['id', 'fecha', 'nombre', 'area', 'area_nombre']
+
+
 class SystemLogSerializer(serializers.ModelSerializer):
     usuario = serializers.CharField(source='usuario.username', read_only=True, allow_null=True)
     accion_display = serializers.CharField(source='get_accion_display', read_only=True)
@@ -533,7 +562,7 @@ class ConfiguracionSistemaSerializer(serializers.ModelSerializer):
         fields = [
             'nombre_empresa', 'logo', 'limite_adjuntos_mb',
             'mensaje_auto_respuesta', 'color_primario', 'horario_laboral',
-            'actualizado_en'
+            'hora_limite_tickets', 'actualizado_en'
         ]
 
 
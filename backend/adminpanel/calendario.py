@@ -0,0 +1,307 @@
+# adminpanel/calendario.py
+import bisect
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from time import monotonic, time_ns
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICRO = timedelta(microseconds=1)
+DIAS_VENTANA = 400           # días compilados antes y después de hoy
+VERSION_TTL = 5              # segundos que el proceso reutiliza la versión leída de la caché
+MAX_EXTENSIONES = 10         # ampliaciones de la ventana al sumar horas
+LOTE = 500
+
+
+def _micro(momento):
+    """Microsegundos desde epoch (enteros: sin errores de redondeo)."""
+    return (momento - EPOCH) // MICRO
+
+
+def _momento(micro):
+    return timezone.localtime(EPOCH + timedelta(microseconds=micro))
+
+
+class CalendarioLaboral:
+    """
+    Intervalos laborables de un área compilados entre dos fechas: inicios y
+    fines (microsegundos desde epoch, ordenados y sin solapes) y el tiempo
+    laborable acumulado al comienzo de cada intervalo. Sumar horas laborables
+    y medir el tiempo laborable transcurrido son búsquedas binarias, O(log n).
+    """
+
+    def __init__(self, horario, feriados, desde, hasta):
+        # horario: {dia_semana: [(hora_inicio, hora_fin)]}; feriados: set de fechas
+        self.desde, self.hasta = desde, hasta
+        self.horario, self.feriados = horario, feriados
+        self.inicios, self.fines, self.acumulado = [], [], []
+        total = 0
+        dia = desde
+        while dia < hasta:
+            if dia not in feriados:
+                for hora_inicio, hora_fin in horario.get(dia.weekday(), ()):
+                    inicio = _micro(timezone.make_aware(datetime.combine(dia, hora_inicio)))
+                    fin_dia = dia + timedelta(days=1) if hora_fin == time.min else dia
+                    fin = _micro(timezone.make_aware(datetime.combine(fin_dia, hora_fin)))
+                    if self.fines and inicio <= self.fines[-1]:
+                        # Contiguo o solapado con el anterior: se fusionan
+                        if fin > self.fines[-1]:
+                            total += fin - self.fines[-1]
+                            self.fines[-1] = fin
+                        continue
+                    self.inicios.append(inicio)
+                    self.fines.append(fin)
+                    self.acumulado.append(total)
+                    total += fin - inicio
+            dia += timedelta(days=1)
+        self.total = total
+        self.inicio_micro = _micro(timezone.make_aware(datetime.combine(desde, time.min)))
+        self.fin_micro = _micro(timezone.make_aware(datetime.combine(hasta, time.min)))
+
+    def cubre(self, momento):
+        return self.inicio_micro <= _micro(momento) <= self.fin_micro
+
+    def _acumulado_en(self, micro):
+        """Tiempo laborable desde el inicio de la ventana hasta `micro`."""
+        i = bisect.bisect_right(self.inicios, micro) - 1
+        if i < 0:
+            return 0
+        return self.acumulado[i] + min(micro, self.fines[i]) - self.inicios[i]
+
+    def en_horario(self, momento):
+        micro = _micro(momento)
+        i = bisect.bisect_right(self.inicios, micro) - 1
+        return i >= 0 and micro < self.fines[i]
+
+    def transcurrido(self, inicio, fin):
+        """Tiempo laborable entre dos momentos (timedelta, nunca negativo)."""
+        segundos = self._acumulado_en(_micro(fin)) - self._acumulado_en(_micro(inicio))
+        return timedelta(microseconds=max(0, segundos))
+
+    def sumar(self, momento, horas):
+        """
+        Momento en que se cumplen `horas` laborables contadas desde `momento`,
+        o None si cae fuera de la ventana compilada.
+        """
+        if horas <= 0:
+            return momento
+        objetivo = self._acumulado_en(_micro(momento)) + int(horas * 3600 * 1_000_000)
+        if objetivo > self.total:
+            return None
+        # Primer intervalo que alcanza el objetivo (al final de uno, no al inicio del siguiente)
+        j = max(bisect.bisect_left(self.acumulado, objetivo) - 1, 0)
+        return _momento(self.inicios[j] + objetivo - self.acumulado[j])
+
+
+class CalendarioService:
+    """
+    Calendario laboral (HorarioLaboral + DiaFeriado) por área.
+
+    Sin horarios configurados todos los días son laborables completos (reloj
+    continuo, salvo feriados). Un área con horarios propios reemplaza el
+    horario general; sus feriados se suman a los generales.
+
+    Los calendarios compilados se guardan en memoria del proceso y se
+    invalidan con una versión en la caché compartida (cambia al editar
+    horarios, feriados o la configuración). La versión se relee como mucho
+    cada VERSION_TTL segundos, no en cada cálculo (exportaciones, motor SLA).
+    """
+
+    VERSION_KEY = "calendario_laboral:version"
+    HORA_LIMITE_KEY = "config:hora_limite_tickets"
+    _compilados = {}
+    _version = (None, 0.0)   # (versión, instante monotónico en que vence)
+
+    # -------------------------------------------
+    # Versión / invalidación
+    # -------------------------------------------
+    @staticmethod
+    def version():
+        version, vence = CalendarioService._version
+        if version is not None and monotonic() < vence:
+            return version
+        try:
+            version = cache.get(CalendarioService.VERSION_KEY)
+            if version is None:
+                # Valor inicial único: si la caché se vacía, los calendarios
+                # compilados antes no coinciden con la nueva versión
+                cache.add(CalendarioService.VERSION_KEY, time_ns(), None)
+                version = cache.get(CalendarioService.VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"Caché del calendario no disponible: {e}")
+            return None
+        CalendarioService._version = (version, monotonic() + VERSION_TTL)
+        return version
+
+    @staticmethod
+    def invalidar():
+        try:
+            cache.incr(CalendarioService.VERSION_KEY)
+        except ValueError:
+            cache.add(CalendarioService.VERSION_KEY, time_ns(), None)
+        except Exception as e:
+            logger.warning(f"No se pudo invalidar el calendario laboral: {e}")
+        cache.delete(CalendarioService.HORA_LIMITE_KEY)
+        CalendarioService._version = (None, 0.0)
+        CalendarioService._compilados.clear()
+
+    # -------------------------------------------
+    # Compilación
+    # -------------------------------------------
+    @staticmethod
+    def _compilar(area_id, desde, hasta):
+        from .models import DiaFeriado, HorarioLaboral
+
+        filas = list(
+            HorarioLaboral.objects.filter(area_id=area_id).values_list('dia_semana', 'hora_inicio', 'hora_fin')
+        ) if area_id else []
+        if not filas:
+            filas = list(
+                HorarioLaboral.objects.filter(area__isnull=True).values_list('dia_semana', 'hora_inicio', 'hora_fin')
+            )
+        horario = defaultdict(list)
+        for dia, inicio, fin in filas:
+            horario[dia].append((inicio, fin))
+        if not filas:
+            horario = {dia: [(time.min, time.min)] for dia in range(7)}
+        for intervalos in horario.values():
+            intervalos.sort()
+
+        areas = Q(area__isnull=True) | Q(area_id=area_id) if area_id else Q(area__isnull=True)
+        feriados = set(
+            DiaFeriado.objects.filter(areas, fecha__gte=desde, fecha__lt=hasta).values_list('fecha', flat=True)
+        )
+        return CalendarioLaboral(dict(horario), feriados, desde, hasta)
+
+    @staticmethod
+    def obtener(area_id=None, momento=None):
+        """Calendario compilado del área, con una ventana que incluye `momento`."""
+        version = CalendarioService.version()
+        guardado = CalendarioService._compilados.get(area_id)
+        if guardado and guardado[0] == version and (momento is None or guardado[1].cubre(momento)):
+            return guardado[1]
+
+        hoy = timezone.localdate()
+        desde, hasta = hoy - timedelta(days=DIAS_VENTANA), hoy + timedelta(days=DIAS_VENTANA)
+        if momento is not None:
+            fecha = timezone.localtime(momento).date()
+            desde = min(desde, fecha - timedelta(days=1))
+            hasta = max(hasta, fecha + timedelta(days=DIAS_VENTANA))
+        calendario = CalendarioService._compilar(area_id, desde, hasta)
+        CalendarioService._compilados[area_id] = (version, calendario)
+        return calendario
+
+    @staticmethod
+    def _ampliar(calendario, area_id):
+        hasta = calendario.hasta + timedelta(days=DIAS_VENTANA)
+        ampliado = CalendarioService._compilar(area_id, calendario.desde, hasta)
+        CalendarioService._compilados[area_id] = (CalendarioService.version(), ampliado)
+        return ampliado
+
+    # -------------------------------------------
+    # Cálculos
+    # -------------------------------------------
+    @staticmethod
+    def sumar_horas(momento, horas, area_id=None):
+        """Momento en que se cumplen `horas` laborables desde `momento`."""
+        calendario = CalendarioService.obtener(area_id, momento)
+        for _ in range(MAX_EXTENSIONES):
+            resultado = calendario.sumar(momento, horas)
+            if resultado is not None:
+                return resultado
+            calendario = CalendarioService._ampliar(calendario, area_id)
+        # Calendario sin tiempo laborable (p. ej. sin horarios útiles): reloj continuo
+        logger.warning(f"Calendario laboral sin tiempo disponible (área {area_id}); se usa reloj continuo")
+        return momento + timedelta(hours=horas)
+
+    @staticmethod
+    def transcurrido(inicio, fin, area_id=None):
+        """Tiempo laborable (timedelta) entre dos momentos."""
+        calendario = CalendarioService.obtener(area_id, inicio)
+        if not calendario.cubre(fin):
+            calendario = CalendarioService.obtener(area_id, fin)
+            if not calendario.cubre(inicio):
+                calendario = CalendarioService._compilar(
+                    area_id, timezone.localtime(inicio).date(),
+                    timezone.localtime(fin).date() + timedelta(days=1)
+                )
+        return calendario.transcurrido(inicio, fin)
+
+    @staticmethod
+    def en_horario(momento=None, area_id=None):
+        momento = momento or timezone.now()
+        return CalendarioService.obtener(area_id, momento).en_horario(momento)
+
+    @staticmethod
+    def hora_limite_tickets():
+        """Hora límite para recibir / asignar tickets (ConfiguracionSistema, cacheada 60 s)."""
+        hora = cache.get(CalendarioService.HORA_LIMITE_KEY)
+        if hora is None:
+            from .models import ConfiguracionSistema
+            hora = ConfiguracionSistema.objects.filter(pk=1).values_list(
+                'hora_limite_tickets', flat=True
+            ).first() or time(15, 0)
+            cache.set(CalendarioService.HORA_LIMITE_KEY, hora, 60)
+        return hora
+
+    @staticmethod
+    def antes_de_hora_limite(momento=None):
+        return timezone.localtime(momento).time() < CalendarioService.hora_limite_tickets()
+
+    # -------------------------------------------
+    # Tickets abiertos
+    # -------------------------------------------
+    @staticmethod
+    def recalcular_tickets_abiertos():
+        """
+        Recalcula las fechas límite de los tickets abiertos (cambió el
+        calendario o la tabla de SLA) y los marca para reevaluar el SLA.
+        Devuelve la cantidad de tickets actualizados.
+        """
+        from tickets.models import Ticket
+        from .sla_notifications import slas_por_categoria
+
+        slas = slas_por_categoria()
+        ahora = timezone.now()
+        abiertos = Ticket.objects.exclude(estado__in=['Resuelto', 'Cerrado']).select_related(
+            'categoria_principal', 'solicitante'
+        ).only(
+            'id', 'fecha_creacion', 'tiempo_estimado_resolucion',
+            'categoria_principal__nombre', 'solicitante__area',
+        )
+
+        lote, total = [], 0
+        for t in abiertos.iterator(chunk_size=LOTE):
+            area_id = t.solicitante.area_id if t.solicitante else None
+            sla = slas.get(t.categoria_principal.nombre.strip().lower()) if t.categoria_principal else None
+            t.fecha_limite_resolucion = CalendarioService.sumar_horas(
+                t.fecha_creacion, t.tiempo_estimado_resolucion, area_id
+            )
+            t.fecha_limite_respuesta = CalendarioService.sumar_horas(
+                t.fecha_creacion, sla.tiempo_respuesta_horas, area_id
+            ) if sla else None
+            t.sla_revision = ahora
+            lote.append(t)
+            if len(lote) >= LOTE:
+                total += Ticket.objects.bulk_update(
+                    lote, ['fecha_limite_resolucion', 'fecha_limite_respuesta', 'sla_revision']
+                )
+                lote = []
+        if lote:
+            total += Ticket.objects.bulk_update(
+                lote, ['fecha_limite_resolucion', 'fecha_limite_respuesta', 'sla_revision']
+            )
+        return total
+
+    @staticmethod
+    def calendario_modificado():
+        """Invalida el calendario y recalcula las fechas límite tras el commit."""
+        CalendarioService.invalidar()
+        transaction.on_commit(CalendarioService.recalcular_tickets_abiertos)
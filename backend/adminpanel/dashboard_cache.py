@@ -0,0 +1,112 @@
+# adminpanel/dashboard_cache.py
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardCache:
+    """
+    Caché de respuestas del dashboard y las estadísticas de tickets.
+
+    - Clave: nombre de la vista + filtros normalizados (orden y valores vacíos no importan).
+    - Versionado: cada cambio de ticket incrementa una versión global; las entradas
+      de una versión anterior pasan a estar vencidas.
+    - Stale-while-revalidate: una entrada vencida se sigue sirviendo mientras un
+      único request (el que obtiene el lock) la recalcula.
+    """
+
+    VERSION_KEY = "dashboard:version"
+    LOCK_TIMEOUT = 30        # segundos; por si el proceso que recalcula muere
+    ESPERA_INTENTOS = 20     # sin entrada previa: esperar hasta 2 s al que recalcula
+    ESPERA_INTERVALO = 0.1
+
+    @staticmethod
+    def ttl():
+        return getattr(settings, 'DASHBOARD_CACHE_TTL', 60)
+
+    @staticmethod
+    def stale_ttl():
+        return getattr(settings, 'DASHBOARD_CACHE_STALE_TTL', 600)
+
+    # -------------------------------------------
+    # Versión / invalidación
+    # -------------------------------------------
+    @staticmethod
+    def version():
+        version = cache.get(DashboardCache.VERSION_KEY)
+        if version is None:
+            cache.add(DashboardCache.VERSION_KEY, 1, None)
+            version = cache.get(DashboardCache.VERSION_KEY, 1)
+        return version
+
+    @staticmethod
+    def invalidar():
+        """Marca como vencidas todas las entradas (cambio de tickets)."""
+        try:
+            cache.incr(DashboardCache.VERSION_KEY)
+        except ValueError:
+            cache.add(DashboardCache.VERSION_KEY, 1, None)
+        except Exception as e:
+            logger.warning(f"No se pudo invalidar la caché del dashboard: {e}")
+
+    # -------------------------------------------
+    # Lectura
+    # -------------------------------------------
+    @staticmethod
+    def clave(nombre, params, campos):
+        filtros = {
+            campo: str(params.get(campo)).strip()
+            for campo in campos
+            if params.get(campo) not in (None, '')
+        }
+        digest = hashlib.md5(json.dumps(filtros, sort_keys=True).encode()).hexdigest()
+        return f"dashboard:{nombre}:{digest}"
+
+    @staticmethod
+    def obtener(nombre, params, campos, calcular):
+        """
+        Devuelve (datos, estado) con estado HIT / STALE / MISS.
+        `calcular` se invoca solo si la entrada falta o está vencida y este
+        request obtiene el lock de recálculo.
+        """
+        try:
+            clave = DashboardCache.clave(nombre, params, campos)
+            version = DashboardCache.version()
+            entrada = cache.get(clave)
+        except Exception as e:
+            logger.warning(f"Caché del dashboard no disponible: {e}")
+            return calcular(), "MISS"
+
+        if entrada and entrada["version"] == version \
+                and time.time() - entrada["creado"] < DashboardCache.ttl():
+            return entrada["datos"], "HIT"
+
+        lock = f"{clave}:lock"
+        if cache.add(lock, 1, DashboardCache.LOCK_TIMEOUT):
+            try:
+                datos = calcular()
+                cache.set(clave, {
+                    "datos": datos,
+                    "version": version,
+                    "creado": time.time(),
+                }, DashboardCache.stale_ttl())
+            finally:
+                cache.delete(lock)
+            return datos, "MISS"
+
+        # Otro request ya está recalculando
+        if entrada:
+            return entrada["datos"], "STALE"
+
+        for _ in range(DashboardCache.ESPERA_INTENTOS):
+            time.sleep(DashboardCache.ESPERA_INTERVALO)
+            entrada = cache.get(clave)
+            if entrada:
+                return entrada["datos"], "HIT"
+        return calcular(), "MISS"
@@ -0,0 +1,185 @@
+# adminpanel/exportaciones.py
+import csv
+import json
+import zlib
+from datetime import date, datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from notifications.models import Notification
+from tickets.models import TicketHistory
+from .models import SystemLog
+from .utils_filters import filtrar_tickets
+
+CHUNK_EXPORTACION = 2000     # filas por viaje al cursor del servidor
+LINEAS_POR_BLOQUE = 500      # líneas que se agrupan en cada envío al cliente
+FILTROS_TICKET = ('search', 'estado', 'categoria', 'prioridad', 'agente')
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve la línea en lugar de escribirla."""
+    def write(self, valor):
+        return valor
+
+
+def _tickets_filtrados(request):
+    """Ids de tickets según filtrar_tickets, o None si no hay filtros de ticket."""
+    if not any(request.query_params.get(campo) for campo in FILTROS_TICKET):
+        return None
+    return filtrar_tickets(request).order_by().values('id')
+
+
+def _exportar_tickets(request):
+    return filtrar_tickets(request), 'fecha_creacion', {
+        'id': 'id',
+        'titulo': 'titulo',
+        'estado': 'estado',
+        'prioridad': 'prioridad',
+        'categoria': 'categoria_principal__nombre',
+        'subcategoria': 'subcategoria__nombre',
+        'solicitante': 'solicitante__username',
+        'agente': 'agente__username',
+        'fecha_creacion': 'fecha_creacion',
+        'fecha_cierre': 'fecha_cierre',
+        'rating': 'rating',
+    }
+
+
+def _exportar_historial(request):
+    queryset = TicketHistory.objects.all()
+    tickets = _tickets_filtrados(request)
+    if tickets is not None:
+        queryset = queryset.filter(ticket_id__in=tickets)
+    return queryset, 'fecha', {
+        'id': 'id',
+        'ticket_id': 'ticket_id',
+        'usuario': 'usuario__username',
+        'accion': 'accion',
+        'descripcion': 'descripcion',
+        'fecha': 'fecha',
+    }
+
+
+def _exportar_logs(request):
+    queryset = SystemLog.objects.all()
+    if request.query_params.get('accion'):
+        queryset = queryset.filter(accion=request.query_params['accion'])
+    if request.query_params.get('usuario'):
+        queryset = queryset.filter(usuario__username=request.query_params['usuario'])
+    return queryset, 'fecha', {
+        'id': 'id',
+        'usuario': 'usuario__username',
+        'accion': 'accion',
+        'descripcion': 'descripcion',
+        'ip': 'ip',
+        'fecha': 'fecha',
+    }
+
+
+def _exportar_notificaciones(request):
+    queryset = Notification.objects.all()
+    if request.query_params.get('tipo'):
+        queryset = queryset.filter(tipo=request.query_params['tipo'])
+    if request.query_params.get('usuario'):
+        queryset = queryset.filter(usuario__username=request.query_params['usuario'])
+    if request.query_params.get('leida') in ('true', 'false'):
+        queryset = queryset.filter(leida=request.query_params['leida'] == 'true')
+    tickets = _tickets_filtrados(request)
+    if tickets is not None:
+        queryset = queryset.filter(ticket_id__in=tickets)
+    return queryset, 'fecha_creacion', {
+        'id': 'id',
+        'usuario': 'usuario__username',
+        'tipo': 'tipo',
+        'mensaje': 'mensaje',
+        'ticket_id': 'ticket_id',
+        'leida': 'leida',
+        'fecha_creacion': 'fecha_creacion',
+    }
+
+
+RECURSOS = {
+    'tickets': _exportar_tickets,
+    'historial': _exportar_historial,
+    'logs': _exportar_logs,
+    'notificaciones': _exportar_notificaciones,
+}
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class ExportacionService:
+    """
+    Exportaciones masivas en CSV / NDJSON generadas fila a fila.
+    Las filas se leen con cursor de servidor (iterator) en orden de id, de modo
+    que una descarga interrumpida se reanuda con ?desde_id=<último id recibido>.
+    """
+
+    @staticmethod
+    def queryset(recurso, request):
+        """Devuelve (queryset de tuplas, columnas) ya filtrado y ordenado por id."""
+        queryset, campo_fecha, columnas = RECURSOS[recurso](request)
+        params = request.query_params
+
+        desde_id = params.get('desde_id')
+        if desde_id and desde_id.isdigit():
+            queryset = queryset.filter(id__gt=int(desde_id))
+
+        fecha_desde = parse_date(params.get('fecha_desde') or '')
+        if fecha_desde:
+            queryset = queryset.filter(**{f"{campo_fecha}__date__gte": fecha_desde})
+        fecha_hasta = parse_date(params.get('fecha_hasta') or '')
+        if fecha_hasta:
+            queryset = queryset.filter(**{f"{campo_fecha}__date__lte": fecha_hasta})
+
+        queryset = queryset.order_by('id').values_list(*columnas.values())
+
+        limite = params.get('limite')
+        if limite and limite.isdigit():
+            queryset = queryset[:int(limite)]
+        return queryset, list(columnas)
+
+    @staticmethod
+    def _valor(valor):
+        if isinstance(valor, datetime):
+            return timezone.localtime(valor).isoformat()
+        if isinstance(valor, date):
+            return valor.isoformat()
+        return valor
+
+    @staticmethod
+    def lineas(queryset, columnas, formato):
+        """Genera el contenido como bloques de texto (varias líneas por bloque)."""
+        filas = queryset.iterator(chunk_size=CHUNK_EXPORTACION)
+        valor = ExportacionService._valor
+
+        if formato == 'csv':
+            writer = csv.writer(_Eco())
+            yield writer.writerow(columnas)
+            formatear = lambda fila: writer.writerow(['' if v is None else valor(v) for v in fila])
+        else:
+            formatear = lambda fila: json.dumps(
+                {c: valor(v) for c, v in zip(columnas, fila)}, ensure_ascii=False
+            ) + '\n'
+
+        bloque = []
+        for fila in filas:
+            bloque.append(formatear(fila))
+            if len(bloque) >= LINEAS_POR_BLOQUE:
+                yield ''.join(bloque)
+                bloque = []
+        if bloque:
+            yield ''.join(bloque)
+
+    @staticmethod
+    def comprimir(bloques):
+        """Comprime en gzip al vuelo."""
+        compresor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for bloque in bloques:
+            datos = compresor.compress(bloque.encode('utf-8'))
+            if datos:
+                yield datos
+        yield compresor.flush()
@@ -0,0 +1,177 @@
+# adminpanel/filtros.py
+import hashlib
+import json
+import logging
+from time import time_ns
+
+from django.core.cache import cache
+
+from tickets.models import Ticket, CategoriaPrincipal
+from tickets.services.busqueda_service import BusquedaTicketService
+from .models import Priority
+
+logger = logging.getLogger(__name__)
+
+# orden pedido → orden aplicado. dias_abierto equivale a ordenar por creación
+# (al revés) y así usa el índice de fecha_creacion en lugar de una expresión.
+ORDENES = {
+    **{campo: campo for campo in (
+        'fecha_creacion', 'fecha_actualizacion', 'fecha_cierre', 'prioridad', 'titulo', 'estado', 'id',
+    )},
+    'dias_abierto': '-fecha_creacion',
+}
+ORDEN_POR_DEFECTO = '-fecha_creacion'
+
+class FiltroTicketsService:
+    """
+    Compilador único de filtros de tickets para el panel de administración
+    (lista de tickets, dashboard, reportes y exportaciones).
+
+    compilar(params) valida los parámetros y devuelve una especificación
+    normalizada (dict de valores simples); queryset(espec) la convierte
+    en el queryset. Dos requests equivalentes (p. ej. prioridad por id o por
+    nombre) producen la misma especificación y la misma huella, que sirve como
+    clave de caché.
+
+    Prioridades y categorías se leen de un catálogo en memoria del proceso,
+    invalidado con una versión en la caché compartida.
+    """
+
+    VERSION_KEY = "filtros:catalogos:version"
+    _catalogos = None
+
+    # -------------------------------------------
+    # Catálogos
+    # -------------------------------------------
+    @staticmethod
+    def version():
+        try:
+            version = cache.get(FiltroTicketsService.VERSION_KEY)
+            if version is None:
+                cache.add(FiltroTicketsService.VERSION_KEY, time_ns(), None)
+                version = cache.get(FiltroTicketsService.VERSION_KEY)
+            return version
+        except Exception as e:
+            logger.warning(f"Caché de catálogos no disponible: {e}")
+            return None
+
+    @staticmethod
+    def invalidar():
+        try:
+            cache.incr(FiltroTicketsService.VERSION_KEY)
+        except ValueError:
+            cache.add(FiltroTicketsService.VERSION_KEY, time_ns(), None)
+        except Exception as e:
+            logger.warning(f"No se pudieron invalidar los catálogos de filtros: {e}")
+        FiltroTicketsService._catalogos = None
+
+    @staticmethod
+    def catalogos():
+        """{'prioridades': {id: nombre}, 'colores': {nombre: color}, 'categorias': {id: nombre}}"""
+        version = FiltroTicketsService.version()
+        guardado = FiltroTicketsService._catalogos
+        if guardado and version is not None and guardado[0] == version:
+            return guardado[1]
+        prioridades = list(Priority.objects.values_list('id', 'nombre', 'color'))
+        datos = {
+            'prioridades': {pk: nombre for pk, nombre, _ in prioridades},
+            'colores': {nombre: color for _, nombre, color in prioridades},
+            'categorias': dict(CategoriaPrincipal.objects.values_list('id', 'nombre')),
+        }
+        FiltroTicketsService._catalogos = (version, datos)
+        return datos
+
+    # -------------------------------------------
+    # Compilación
+    # -------------------------------------------
+    @staticmethod
+    def _id(params, campo, mensaje):
+        valor = str(params.get(campo) or '').strip()
+        if not valor:
+            return None
+        if not valor.isdigit():
+            raise ValueError(mensaje)
+        return int(valor)
+
+    @staticmethod
+    def compilar(params):
+        """Especificación normalizada de los filtros. Lanza ValueError con el mensaje para el cliente."""
+        catalogos = FiltroTicketsService.catalogos()
+        espec = {}
+
+        search = ' '.join(str(params.get('search') or '').split())
+        if search:
+            espec['search'] = search
+
+        estado = params.get('estado')
+        if estado:
+            if estado not in dict(Ticket.ESTADO_CHOICES):
+                raise ValueError('Estado no válido.')
+            espec['estado'] = estado
+
+        categoria = FiltroTicketsService._id(params, 'categoria', 'Categoría no válida.')
+        if categoria is not None:
+            if categoria not in catalogos['categorias']:
+                raise ValueError('Categoría no válida.')
+            espec['categoria'] = categoria
+
+        agente = FiltroTicketsService._id(params, 'agente', 'Agente no válido.')
+        if agente is not None:
+            espec['agente'] = agente
+
+        # El ticket guarda el nombre de la prioridad; se acepta id o nombre
+        prioridad = str(params.get('prioridad') or '').strip()
+        if prioridad:
+            if prioridad.isdigit():
+                # Un id inexistente se ignora (comportamiento anterior de filtrar_tickets)
+                prioridad = catalogos['prioridades'].get(int(prioridad))
+            if prioridad:
+                espec['prioridad'] = prioridad
+
+        orden = str(params.get('orden') or '').strip()
+        if orden:
+            campo = orden.lstrip('-')
+            if campo not in ORDENES:
+                raise ValueError(f'Orden no válido. Use: {", ".join(ORDENES)}.')
+            aplicado = ORDENES[campo]
+            if orden.startswith('-'):
+                aplicado = aplicado[1:] if aplicado.startswith('-') else f'-{aplicado}'
+            espec['orden'] = aplicado
+        return espec
+
+    @staticmethod
+    def huella(espec):
+        return hashlib.md5(json.dumps(espec, sort_keys=True).encode()).hexdigest()
+
+    # -------------------------------------------
+    # Queryset
+    # -------------------------------------------
+    @staticmethod
+    def queryset(espec):
+        # El tsvector de búsqueda solo se usa en el WHERE. Las relaciones que
+        # lee cada serializer las agrega la vista (tickets/optimizacion.py).
+        queryset = Ticket.objects.defer('busqueda')
+
+        filtros = {}
+        if 'estado' in espec:
+            filtros['estado'] = espec['estado']
+        if 'categoria' in espec:
+            filtros['categoria_principal_id'] = espec['categoria']
+        if 'agente' in espec:
+            filtros['agente_id'] = espec['agente']
+        if 'prioridad' in espec:
+            filtros['prioridad'] = espec['prioridad']
+        if filtros:
+            queryset = queryset.filter(**filtros)
+
+        queryset, por_relevancia = BusquedaTicketService.filtrar(
+            queryset, espec.get('search'), con_email=True
+        )
+        if por_relevancia and 'orden' not in espec:
+            return BusquedaTicketService.ordenar_por_relevancia(queryset)
+        orden = espec.get('orden', ORDEN_POR_DEFECTO)
+        if orden.lstrip('-') == 'id':
+            return queryset.order_by(orden)
+        # Desempate por id en la misma dirección: orden estable entre páginas y
+        # (fecha, id) paginable por cursor (tickets/pagination.py)
+        return queryset.order_by(orden, '-id' if orden.startswith('-') else 'id')
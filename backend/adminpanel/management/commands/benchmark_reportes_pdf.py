@@ -0,0 +1,59 @@
+# backend/adminpanel/management/commands/benchmark_reportes_pdf.py
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from reportlab.platypus import Paragraph
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+
+from adminpanel.report_generator import _construir_pdf_paginado, ESTILO_TABLA_TICKETS
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo y la memoria del PDF de tickets paginado con filas sintéticas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, nargs='+', default=[10000, 50000, 100000])
+        parser.add_argument(
+            '--memoria', action='store_true',
+            help='Medir el pico de memoria con tracemalloc (bastante más lento)'
+        )
+
+    def filas(self, cantidad):
+        estilo_texto = getSampleStyleSheet()['BodyText']
+        fecha = datetime.now().strftime("%d/%m/%Y")
+        for i in range(cantidad):
+            yield [
+                i,
+                Paragraph("Solicitud de vacaciones " * (i % 3 + 1), estilo_texto),
+                "Abierto",
+                f"agente{i % 25}",
+                fecha,
+            ]
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directorio:
+            for cantidad in options['filas']:
+                ruta = os.path.join(directorio, f"benchmark_{cantidad}.pdf")
+                if options['memoria']:
+                    tracemalloc.start()
+                inicio = time.perf_counter()
+
+                _construir_pdf_paginado(
+                    ruta, "Reporte de Tickets",
+                    ["ID", "Título", "Estado", "Agente", "Fecha Creación"], self.filas(cantidad),
+                    [0.5*inch, 2.5*inch, 1*inch, 1.5*inch, 1.2*inch], ESTILO_TABLA_TICKETS,
+                    rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30,
+                )
+
+                duracion = time.perf_counter() - inicio
+                linea = f"{cantidad:>7} filas: {duracion:6.1f} s, {os.path.getsize(ruta) / 1e6:5.1f} MB"
+                if options['memoria']:
+                    _, pico = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    linea += f", pico de memoria {pico / 1e6:5.1f} MB"
+                self.stdout.write(linea)
@@ -4,6 +4,7 @@ from django.utils import timezone
 from django.db import transaction
 from django.db.models import Q
 from adminpanel.models import RotacionProgramada, SystemLog
+from adminpanel.metricas import MetricasTicketService
 from tickets.models import Ticket, TicketHistory
 
 class Command(BaseCommand):
@@ -45,14 +46,18 @@ class Command(BaseCommand):
                         estado__in=['Resuelto', 'Cerrado', 'Cancelado']
                     )
                     
-                    total_tickets = tickets_activos.count()
+                    # Ids antes del update: después ya no coinciden con el filtro por agente
+                    ids_activos = list(tickets_activos.values_list('id', flat=True))
+                    total_tickets = len(ids_activos)
 
                     if total_tickets > 0 and reemplazo:
-                        # Actualizar el agente de los tickets
-                        tickets_activos.update(agente=reemplazo)
+                        # Actualizar el agente de los tickets (manteniendo las métricas del dashboard)
+                        MetricasTicketService.update_masivo(
+                            Ticket.objects.filter(id__in=ids_activos), agente=reemplazo
+                        )
 
                         # Dejar constancia en el historial de cada ticket
-                        for ticket in tickets_activos:
+                        for ticket in Ticket.objects.filter(id__in=ids_activos):
                             TicketHistory.objects.create(
                                 ticket=ticket,
                                 usuario=None, # Sistema
@@ -0,0 +1,13 @@
+# backend/adminpanel/management/commands/recalcular_fechas_limite.py
+from django.core.management.base import BaseCommand
+
+from adminpanel.calendario import CalendarioService
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las fechas límite de los tickets abiertos según el calendario laboral y los SLA.'
+
+    def handle(self, *args, **options):
+        CalendarioService.invalidar()
+        total = CalendarioService.recalcular_tickets_abiertos()
+        self.stdout.write(self.style.SUCCESS(f"✅ Fechas límite recalculadas: {total} tickets."))
@@ -0,0 +1,24 @@
+# backend/adminpanel/management/commands/recalcular_metricas_tickets.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from adminpanel.metricas import MetricasTicketService
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye las métricas pre-agregadas de tickets (por hora y por día).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Fecha inicial YYYY-MM-DD (inclusive)')
+        parser.add_argument('--hasta', help='Fecha final YYYY-MM-DD (inclusive)')
+
+    def handle(self, *args, **options):
+        try:
+            desde = date.fromisoformat(options['desde']) if options['desde'] else None
+            hasta = date.fromisoformat(options['hasta']) if options['hasta'] else None
+        except ValueError:
+            raise CommandError('Las fechas deben tener el formato YYYY-MM-DD.')
+
+        filas = MetricasTicketService.reconstruir(desde, hasta)
+        self.stdout.write(self.style.SUCCESS(f"✅ Métricas recalculadas: {filas} filas por hora."))
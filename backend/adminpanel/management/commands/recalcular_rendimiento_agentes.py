@@ -0,0 +1,12 @@
+# backend/adminpanel/management/commands/recalcular_rendimiento_agentes.py
+from django.core.management.base import BaseCommand
+
+from adminpanel.rendimiento import RendimientoAgenteService
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de rendimiento de los agentes desde los tickets.'
+
+    def handle(self, *args, **options):
+        registros = RendimientoAgenteService.reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"✅ Rendimiento recalculado: {registros} agentes."))
@@ -0,0 +1,343 @@
+# adminpanel/metricas.py
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from tickets.condicional import VersionTablas
+from tickets.models import Ticket
+from .dashboard_cache import DashboardCache
+from .filtros import FiltroTicketsService
+from .models import MetricaTicketDia, MetricaTicketHora
+
+logger = logging.getLogger(__name__)
+
+# Campos del ticket que afectan a los rollups
+CAMPOS_TICKET = (
+    'fecha_creacion', 'categoria_principal_id', 'agente_id',
+    'prioridad', 'estado', 'rating', 'fecha_cierre',
+)
+DIMENSIONES = ('categoria_id', 'agente_id', 'prioridad', 'estado')
+MEDIDAS = ('total', 'rating_suma', 'rating_cantidad', 'resolucion_segundos', 'resolucion_cantidad')
+
+RANGOS = ('dia', 'semana', 'mes', 'anio', '7dias', '30dias')
+
+
+def inicio_rango(rango, ahora=None):
+    """
+    Inicio (aware, hora local) del rango del dashboard. None = sin límite.
+    Los rangos de calendario empiezan a las 00:00 locales.
+    """
+    ahora = timezone.localtime(ahora or timezone.now())
+    medianoche = ahora.replace(hour=0, minute=0, second=0, microsecond=0)
+    if rango == 'dia':
+        return medianoche
+    if rango == 'semana':
+        return medianoche - timedelta(days=medianoche.weekday())
+    if rango == 'mes':
+        return medianoche.replace(day=1)
+    if rango == 'anio':
+        return medianoche.replace(month=1, day=1)
+    if rango == '7dias':
+        return ahora - timedelta(days=7)
+    if rango == '30dias':
+        return ahora - timedelta(days=30)
+    return None
+
+
+def _inicio_dia(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+class MetricasTicketService:
+    """
+    Mantenimiento incremental y lectura de los rollups de tickets
+    (MetricaTicketHora / MetricaTicketDia).
+    """
+
+    # -------------------------------------------
+    # Mantenimiento incremental
+    # -------------------------------------------
+    @staticmethod
+    def valores_ticket(ticket):
+        return {campo: getattr(ticket, campo) for campo in CAMPOS_TICKET}
+
+    @staticmethod
+    def valores_en_bd(ticket_ids):
+        """Valores actuales en BD de los tickets indicados, por id."""
+        return {
+            fila['id']: fila
+            for fila in Ticket.objects.filter(id__in=ticket_ids).values('id', *CAMPOS_TICKET)
+        }
+
+    @staticmethod
+    def _contribucion(valores):
+        """(hora, fecha, dimensiones, medidas) con que un ticket aporta a los rollups."""
+        if not valores or not valores.get('fecha_creacion'):
+            return None
+        local = timezone.localtime(valores['fecha_creacion'])
+        rating = valores.get('rating')
+        cierre = valores.get('fecha_cierre')
+        dimensiones = {
+            'categoria_id': valores.get('categoria_principal_id'),
+            'agente_id': valores.get('agente_id'),
+            'prioridad': valores.get('prioridad') or '',
+            'estado': valores.get('estado') or '',
+        }
+        medidas = {
+            'total': 1,
+            'rating_suma': rating or 0,
+            'rating_cantidad': 1 if rating is not None else 0,
+            'resolucion_segundos': int((cierre - valores['fecha_creacion']).total_seconds()) if cierre else 0,
+            'resolucion_cantidad': 1 if cierre else 0,
+        }
+        hora = local.replace(minute=0, second=0, microsecond=0)
+        return hora, local.date(), dimensiones, medidas
+
+    @staticmethod
+    def _incrementar(modelo, clave, medidas, signo):
+        cambios = {campo: F(campo) + signo * valor for campo, valor in medidas.items() if valor}
+        if modelo.objects.filter(**clave).update(**cambios):
+            return
+        try:
+            with transaction.atomic():
+                modelo.objects.create(**clave, **{c: signo * v for c, v in medidas.items()})
+        except IntegrityError:
+            # Otro proceso creó la fila en paralelo
+            modelo.objects.filter(**clave).update(**cambios)
+
+    @staticmethod
+    def _sumar(valores, signo):
+        contribucion = MetricasTicketService._contribucion(valores)
+        if not contribucion:
+            return
+        hora, fecha, dimensiones, medidas = contribucion
+        MetricasTicketService._incrementar(MetricaTicketHora, {'hora': hora, **dimensiones}, medidas, signo)
+        MetricasTicketService._incrementar(MetricaTicketDia, {'fecha': fecha, **dimensiones}, medidas, signo)
+
+    @staticmethod
+    def aplicar_cambio(anterior, nuevo):
+        """
+        Mueve la contribución de un ticket de `anterior` a `nuevo`
+        (dicts con CAMPOS_TICKET; None para alta/baja).
+        """
+        if anterior and nuevo and all(anterior.get(c) == nuevo.get(c) for c in CAMPOS_TICKET):
+            return
+        try:
+            with transaction.atomic():
+                if anterior:
+                    MetricasTicketService._sumar(anterior, -1)
+                if nuevo:
+                    MetricasTicketService._sumar(nuevo, 1)
+        except Exception as e:
+            # Los rollups nunca deben romper el guardado del ticket;
+            # la reconstrucción periódica corrige cualquier desvío.
+            logger.error(f"❌ Error actualizando métricas de tickets: {e}")
+
+    @staticmethod
+    def update_masivo(queryset, **cambios):
+        """queryset.update(**cambios) manteniendo los rollups y el rendimiento de agentes."""
+        from .rendimiento import RendimientoAgenteService
+
+        anteriores = list(queryset.values('id', *CAMPOS_TICKET))
+        total = queryset.update(**cambios)
+        for anterior in anteriores:
+            nuevo = {**anterior, **{
+                (f"{campo}_id" if f"{campo}_id" in CAMPOS_TICKET else campo): getattr(valor, 'pk', valor)
+                for campo, valor in cambios.items()
+            }}
+            MetricasTicketService.aplicar_cambio(anterior, nuevo)
+            RendimientoAgenteService.aplicar_cambio(anterior, nuevo)
+        if total:
+            transaction.on_commit(DashboardCache.invalidar)
+            # update() no dispara post_save: las respuestas con ETag (cargas de agentes) deben cambiar
+            transaction.on_commit(lambda: VersionTablas.invalidar('tickets'))
+        return total
+
+    # -------------------------------------------
+    # Reconstrucción (backfill / reconciliación)
+    # -------------------------------------------
+    @staticmethod
+    @transaction.atomic
+    def reconstruir(desde=None, hasta=None):
+        """
+        Recalcula los rollups de los tickets creados entre las fechas locales
+        `desde` y `hasta` (inclusive). Sin fechas reconstruye todo.
+        Devuelve la cantidad de filas horarias generadas.
+        """
+        tickets = Ticket.objects.all()
+        horas = MetricaTicketHora.objects.all()
+        dias = MetricaTicketDia.objects.all()
+        if desde:
+            tickets = tickets.filter(fecha_creacion__gte=_inicio_dia(desde))
+            horas = horas.filter(hora__gte=_inicio_dia(desde))
+            dias = dias.filter(fecha__gte=desde)
+        if hasta:
+            fin = _inicio_dia(hasta + timedelta(days=1))
+            tickets = tickets.filter(fecha_creacion__lt=fin)
+            horas = horas.filter(hora__lt=fin)
+            dias = dias.filter(fecha__lte=hasta)
+
+        horas.delete()
+        dias.delete()
+
+        filas = tickets.annotate(
+            hora=TruncHour('fecha_creacion'),
+        ).values(
+            'hora', 'categoria_principal_id', 'agente_id', 'prioridad', 'estado'
+        ).annotate(
+            **MetricasTicketService._agregados()
+        ).order_by()
+
+        por_hora = []
+        por_dia = defaultdict(lambda: dict.fromkeys(MEDIDAS, 0))
+        for fila in filas:
+            medidas = MetricasTicketService._medidas(fila)
+            dimensiones = {
+                'categoria_id': fila['categoria_principal_id'],
+                'agente_id': fila['agente_id'],
+                'prioridad': fila['prioridad'] or '',
+                'estado': fila['estado'] or '',
+            }
+            por_hora.append(MetricaTicketHora(hora=fila['hora'], **dimensiones, **medidas))
+
+            clave = (timezone.localtime(fila['hora']).date(), *dimensiones.values())
+            for campo, valor in medidas.items():
+                por_dia[clave][campo] += valor
+
+        MetricaTicketHora.objects.bulk_create(por_hora, batch_size=1000)
+        MetricaTicketDia.objects.bulk_create([
+            MetricaTicketDia(fecha=clave[0], **dict(zip(DIMENSIONES, clave[1:])), **medidas)
+            for clave, medidas in por_dia.items()
+        ], batch_size=1000)
+        transaction.on_commit(DashboardCache.invalidar)
+        return len(por_hora)
+
+    # -------------------------------------------
+    # Lectura
+    # -------------------------------------------
+    @staticmethod
+    def _agregados():
+        return {
+            'total': Count('id'),
+            'rating_suma': Sum('rating'),
+            'rating_cantidad': Count('rating'),
+            'resolucion': Sum(
+                ExpressionWrapper(F('fecha_cierre') - F('fecha_creacion'), output_field=DurationField()),
+                filter=Q(fecha_cierre__isnull=False),
+            ),
+            'resolucion_cantidad': Count('fecha_cierre'),
+        }
+
+    @staticmethod
+    def _medidas(fila):
+        resolucion = fila.get('resolucion')
+        return {
+            'total': fila['total'],
+            'rating_suma': fila['rating_suma'] or 0,
+            'rating_cantidad': fila['rating_cantidad'],
+            'resolucion_segundos': int(resolucion.total_seconds()) if resolucion else 0,
+            'resolucion_cantidad': fila['resolucion_cantidad'],
+        }
+
+    @staticmethod
+    def filtros_desde_request(request):
+        """
+        Normaliza los filtros del dashboard que los rollups pueden resolver.
+        Devuelve None si hay filtros que requieren la tabla de tickets (búsqueda).
+        """
+        try:
+            espec = FiltroTicketsService.compilar(request.query_params)
+        except ValueError as e:
+            raise ValidationError({'error': str(e)})
+        if 'search' in espec:
+            return None
+        return {campo: espec[campo] for campo in ('estado', 'categoria', 'agente', 'prioridad') if campo in espec}
+
+    @staticmethod
+    def _filtrar(queryset, filtros, campo_categoria, campo_agente):
+        if 'estado' in filtros:
+            queryset = queryset.filter(estado=filtros['estado'])
+        if 'prioridad' in filtros:
+            queryset = queryset.filter(prioridad=filtros['prioridad'])
+        if 'categoria' in filtros:
+            queryset = queryset.filter(**{campo_categoria: filtros['categoria']})
+        if 'agente' in filtros:
+            queryset = queryset.filter(**{campo_agente: filtros['agente']})
+        return queryset
+
+    @staticmethod
+    def _filas_en_vivo(filtros, desde, hasta=None):
+        tickets = MetricasTicketService._filtrar(
+            Ticket.objects.filter(fecha_creacion__gte=desde),
+            filtros, 'categoria_principal_id', 'agente_id'
+        )
+        if hasta:
+            tickets = tickets.filter(fecha_creacion__lt=hasta)
+        for fila in tickets.values(
+            'categoria_principal_id', 'agente_id', 'prioridad', 'estado'
+        ).annotate(**MetricasTicketService._agregados()).order_by():
+            yield (
+                fila['categoria_principal_id'], fila['agente_id'], fila['prioridad'], fila['estado'],
+            ), MetricasTicketService._medidas(fila)
+
+    @staticmethod
+    def _filas_rollup(queryset, filtros):
+        queryset = MetricasTicketService._filtrar(queryset, filtros, 'categoria_id', 'agente_id')
+        for fila in queryset.values(*DIMENSIONES).annotate(
+            **{campo: Sum(campo) for campo in MEDIDAS}
+        ).order_by():
+            yield tuple(fila[d] for d in DIMENSIONES), {c: fila[c] or 0 for c in MEDIDAS}
+
+    @staticmethod
+    def agregados_por_dimension(filtros, inicio=None, ahora=None):
+        """
+        Medidas agrupadas por (categoria_id, agente_id, prioridad, estado) para los
+        tickets creados desde `inicio`, más el total creado hoy:
+          - días completos anteriores a hoy  → MetricaTicketDia
+          - horas completas del primer día    → MetricaTicketHora
+          - fracción de hora inicial y hoy    → consulta en vivo a Ticket
+        """
+        ahora = timezone.localtime(ahora or timezone.now())
+        hoy = ahora.replace(hour=0, minute=0, second=0, microsecond=0)
+        resultado = defaultdict(lambda: dict.fromkeys(MEDIDAS, 0))
+
+        def acumular(filas):
+            for clave, medidas in filas:
+                for campo, valor in medidas.items():
+                    resultado[clave][campo] += valor
+
+        # 1. Hoy, siempre en vivo
+        desde_hoy = max(inicio, hoy) if inicio else hoy
+        filas_hoy = list(MetricasTicketService._filas_en_vivo(filtros, desde_hoy))
+        total_hoy = sum(m['total'] for _, m in filas_hoy) if desde_hoy == hoy else None
+        acumular(filas_hoy)
+
+        if inicio is None or inicio < hoy:
+            dias = MetricaTicketDia.objects.filter(fecha__lt=hoy.date())
+            if inicio is not None:
+                inicio = timezone.localtime(inicio)
+                primer_dia = inicio.replace(hour=0, minute=0, second=0, microsecond=0)
+                if inicio != primer_dia:
+                    # Primer día parcial: horas completas desde rollup horario
+                    siguiente_hora = inicio.replace(minute=0, second=0, microsecond=0)
+                    if siguiente_hora != inicio:
+                        siguiente_hora += timedelta(hours=1)
+                        acumular(MetricasTicketService._filas_en_vivo(filtros, inicio, siguiente_hora))
+                    fin_primer_dia = primer_dia + timedelta(days=1)
+                    acumular(MetricasTicketService._filas_rollup(
+                        MetricaTicketHora.objects.filter(hora__gte=siguiente_hora, hora__lt=fin_primer_dia),
+                        filtros
+                    ))
+                    primer_dia = fin_primer_dia
+                dias = dias.filter(fecha__gte=primer_dia.date())
+            acumular(MetricasTicketService._filas_rollup(dias, filtros))
+
+        if total_hoy is None:
+            total_hoy = 0
+        return resultado, total_hoy
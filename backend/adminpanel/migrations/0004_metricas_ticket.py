@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0003_rotacionprogramada'),
+        ('tickets', '0008_uploadsession'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaTicketDia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prioridad', models.CharField(max_length=20)),
+                ('estado', models.CharField(max_length=30)),
+                ('total', models.IntegerField(default=0)),
+                ('rating_suma', models.IntegerField(default=0)),
+                ('rating_cantidad', models.IntegerField(default=0)),
+                ('resolucion_segundos', models.BigIntegerField(default=0)),
+                ('resolucion_cantidad', models.IntegerField(default=0)),
+                ('fecha', models.DateField(db_index=True)),
+                ('agente', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('categoria', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tickets.categoriaprincipal')),
+            ],
+            options={
+                'verbose_name': 'Métrica de tickets por día',
+                'verbose_name_plural': 'Métricas de tickets por día',
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'categoria', 'agente', 'prioridad', 'estado'), name='metrica_ticket_dia_unica', nulls_distinct=False)],
+            },
+        ),
+        migrations.CreateModel(
+            name='MetricaTicketHora',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prioridad', models.CharField(max_length=20)),
+                ('estado', models.CharField(max_length=30)),
+                ('total', models.IntegerField(default=0)),
+                ('rating_suma', models.IntegerField(default=0)),
+                ('rating_cantidad', models.IntegerField(default=0)),
+                ('resolucion_segundos', models.BigIntegerField(default=0)),
+                ('resolucion_cantidad', models.IntegerField(default=0)),
+                ('hora', models.DateTimeField(db_index=True)),
+                ('agente', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('categoria', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tickets.categoriaprincipal')),
+            ],
+            options={
+                'verbose_name': 'Métrica de tickets por hora',
+                'verbose_name_plural': 'Métricas de tickets por hora',
+                'constraints': [models.UniqueConstraint(fields=('hora', 'categoria', 'agente', 'prioridad', 'estado'), name='metrica_ticket_hora_unica', nulls_distinct=False)],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0005_reportejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agentperformance',
+            name='rating_cantidad',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agentperformance',
+            name='rating_promedio',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agentperformance',
+            name='rating_suma',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agentperformance',
+            name='resolucion_cantidad',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='agentperformance',
+            name='resolucion_segundos',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
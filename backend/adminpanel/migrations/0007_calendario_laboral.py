@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:15
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0006_rendimiento_incremental'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='configuracionsistema',
+            name='hora_limite_tickets',
+            field=models.TimeField(default=datetime.time(15, 0), help_text='Hora a partir de la cual no se reciben ni asignan tickets nuevos'),
+        ),
+        migrations.AlterField(
+            model_name='configuracionsistema',
+            name='horario_laboral',
+            field=models.CharField(default='Lunes a Viernes - 08:00 a 17:00', help_text='Texto informativo; los cálculos usan los horarios laborales y feriados', max_length=120),
+        ),
+        migrations.CreateModel(
+            name='HorarioLaboral',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia_semana', models.PositiveSmallIntegerField(choices=[(0, 'Lunes'), (1, 'Martes'), (2, 'Miércoles'), (3, 'Jueves'), (4, 'Viernes'), (5, 'Sábado'), (6, 'Domingo')])),
+                ('hora_inicio', models.TimeField()),
+                ('hora_fin', models.TimeField(help_text='00:00 indica el fin del día')),
+                ('area', models.ForeignKey(blank=True, help_text='Vacío: horario general. Un área con horario propio no usa el general.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='horarios_laborales', to='users.area')),
+            ],
+            options={
+                'verbose_name': 'Horario laboral',
+                'verbose_name_plural': 'Horarios laborales',
+                'ordering': ['area', 'dia_semana', 'hora_inicio'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DiaFeriado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(db_index=True)),
+                ('nombre', models.CharField(max_length=100)),
+                ('area', models.ForeignKey(blank=True, help_text='Vacío: feriado para todas las áreas', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='feriados', to='users.area')),
+            ],
+            options={
+                'verbose_name': 'Día feriado',
+                'verbose_name_plural': 'Días feriados',
+                'ordering': ['fecha'],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'area'), name='feriado_fecha_area_unico')],
+            },
+        ),
+    ]
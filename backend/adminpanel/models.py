@@ -1,3 +1,7 @@
+import uuid
+from datetime import time
+
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth import get_user_model
 
@@ -76,6 +80,13 @@ class AgentPerformance(models.Model):
 
     tiempo_promedio_resolucion = models.FloatField(default=0)  # horas
     efectividad = models.FloatField(default=0)  # %
+    rating_promedio = models.FloatField(default=0)
+
+    # Sumas acumuladas para mantener los promedios de forma incremental
+    rating_suma = models.IntegerField(default=0)
+    rating_cantidad = models.IntegerField(default=0)
+    resolucion_segundos = models.BigIntegerField(default=0)
+    resolucion_cantidad = models.IntegerField(default=0)
 
     actualizado_en = models.DateTimeField(auto_now=True)
 
@@ -146,7 +157,13 @@ class ConfiguracionSistema(models.Model):
 
     horario_laboral = models.CharField(
         max_length=120,
-        default="Lunes a Viernes - 08:00 a 17:00"
+        default="Lunes a Viernes - 08:00 a 17:00",
+        help_text="Texto informativo; los cálculos usan los horarios laborales y feriados"
+    )
+
+    hora_limite_tickets = models.TimeField(
+        default=time(15, 0),
+        help_text="Hora a partir de la cual no se reciben ni asignan tickets nuevos"
     )
 
     actualizado_en = models.DateTimeField(auto_now=True)
@@ -159,6 +176,65 @@ class ConfiguracionSistema(models.Model):
         return self.nombre_empresa
 
 
+# =====================================================
+# CALENDARIO LABORAL (ver adminpanel/calendario.py)
+# =====================================================
+class HorarioLaboral(models.Model):
+    DIAS_SEMANA = [
+        (0, "Lunes"), (1, "Martes"), (2, "Miércoles"), (3, "Jueves"),
+        (4, "Viernes"), (5, "Sábado"), (6, "Domingo"),
+    ]
+
+    area = models.ForeignKey(
+        'users.Area',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='horarios_laborales',
+        help_text="Vacío: horario general. Un área con horario propio no usa el general."
+    )
+    dia_semana = models.PositiveSmallIntegerField(choices=DIAS_SEMANA)
+    hora_inicio = models.TimeField()
+    hora_fin = models.TimeField(help_text="00:00 indica el fin del día")
+
+    class Meta:
+        ordering = ["area", "dia_semana", "hora_inicio"]
+        verbose_name = "Horario laboral"
+        verbose_name_plural = "Horarios laborales"
+
+    def clean(self):
+        if self.hora_fin != time.min and self.hora_fin <= self.hora_inicio:
+            raise ValidationError("La hora de fin debe ser posterior a la de inicio.")
+
+    def __str__(self):
+        area = self.area or "General"
+        return f"{area} - {self.get_dia_semana_display()} {self.hora_inicio:%H:%M}-{self.hora_fin:%H:%M}"
+
+
+class DiaFeriado(models.Model):
+    fecha = models.DateField(db_index=True)
+    nombre = models.CharField(max_length=100)
+    area = models.ForeignKey(
+        'users.Area',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='feriados',
+        help_text="Vacío: feriado para todas las áreas"
+    )
+
+    class Meta:
+        ordering = ["fecha"]
+        verbose_name = "Día feriado"
+        verbose_name_plural = "Días feriados"
+        constraints = [
+            models.UniqueConstraint(fields=["fecha", "area"], name="feriado_fecha_area_unico"),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} - {self.nombre}"
+
+
 # =====================================================
 # ROTACIÓN DE PERSONAL (AUTOMATIZACIÓN)
 # =====================================================
@@ -194,3 +270,131 @@ class RotacionProgramada(models.Model):
         verbose_name = "Rotación de Personal"
         verbose_name_plural = "Rotaciones Programadas"
         ordering = ['fecha_inicio']
+
+
+# =====================================================
+# MÉTRICAS PRE-AGREGADAS DE TICKETS (ROLLUPS)
+# =====================================================
+class MetricaTicketBase(models.Model):
+    """
+    Contadores de tickets agrupados por (periodo, categoría, agente, prioridad, estado).
+    El periodo es el de CREACIÓN del ticket, igual que los filtros de rango del dashboard.
+    Se mantienen en adminpanel/metricas.py y se reconstruyen con
+    `manage.py recalcular_metricas_tickets`.
+    """
+    categoria = models.ForeignKey(
+        'tickets.CategoriaPrincipal',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+'
+    )
+    agente = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+'
+    )
+    prioridad = models.CharField(max_length=20)
+    estado = models.CharField(max_length=30)
+
+    total = models.IntegerField(default=0)
+    rating_suma = models.IntegerField(default=0)
+    rating_cantidad = models.IntegerField(default=0)
+    resolucion_segundos = models.BigIntegerField(default=0)
+    resolucion_cantidad = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class MetricaTicketHora(MetricaTicketBase):
+    hora = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Métrica de tickets por hora"
+        verbose_name_plural = "Métricas de tickets por hora"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['hora', 'categoria', 'agente', 'prioridad', 'estado'],
+                name='metrica_ticket_hora_unica',
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.hora:%Y-%m-%d %H}h - {self.estado}: {self.total}"
+
+
+class MetricaTicketDia(MetricaTicketBase):
+    fecha = models.DateField(db_index=True)
+
+    class Meta:
+        verbose_name = "Métrica de tickets por día"
+        verbose_name_plural = "Métricas de tickets por día"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fecha', 'categoria', 'agente', 'prioridad', 'estado'],
+                name='metrica_ticket_dia_unica',
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} - {self.estado}: {self.total}"
+
+
+# =====================================================
+# REPORTES ASÍNCRONOS (JOBS DE CELERY)
+# =====================================================
+class ReporteJob(models.Model):
+    TIPO_CHOICES = [
+        ('dashboard', 'Dashboard'),
+        ('tickets', 'Tickets'),
+        ('usuarios', 'Usuarios'),
+        ('rendimiento', 'Rendimiento'),
+        ('categorias', 'Categorías'),
+    ]
+    FORMATO_CHOICES = [
+        ('xlsx', 'Excel'),
+        ('pdf', 'PDF'),
+    ]
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('completado', 'Completado'),
+        ('error', 'Error'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    formato = models.CharField(max_length=10, choices=FORMATO_CHOICES)
+    parametros = models.JSONField(default=dict, blank=True)
+    # Hash de tipo + formato + parámetros normalizados (deduplicación)
+    huella = models.CharField(max_length=64, db_index=True)
+    # Versión de los datos (DashboardCache) con la que se generó el archivo
+    version_datos = models.BigIntegerField(default=0)
+
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente', db_index=True)
+    progreso = models.PositiveSmallIntegerField(default=0)
+    archivo = models.CharField(max_length=255, blank=True)  # relativo a MEDIA_ROOT
+    error = models.TextField(blank=True)
+
+    solicitado_por = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reportes_solicitados'
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Reporte generado"
+        verbose_name_plural = "Reportes generados"
+        ordering = ['-fecha_creacion']
+
+    def __str__(self):
+        return f"{self.tipo}.{self.formato} ({self.estado} {self.progreso}%)"
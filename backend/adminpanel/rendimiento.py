@@ -0,0 +1,149 @@
+# adminpanel/rendimiento.py
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from tickets.models import Ticket
+from users.models import User
+from .dashboard_cache import DashboardCache
+from .models import AgentPerformance
+
+logger = logging.getLogger(__name__)
+
+# Contadores de AgentPerformance que se mantienen como sumas acumuladas
+CONTADORES = (
+    'tickets_asignados', 'tickets_resueltos', 'rating_suma', 'rating_cantidad',
+    'resolucion_segundos', 'resolucion_cantidad',
+)
+
+
+class RendimientoAgenteService:
+    """
+    Mantenimiento incremental de AgentPerformance.
+    Cada ticket aporta a los contadores de su agente; al asignarlo, resolverlo o
+    calificarlo se mueve su aporte con el delta (mismos valores que usan los
+    rollups, ver MetricasTicketService). Los promedios y la efectividad se
+    derivan de las sumas, así que leer el rendimiento es O(agentes).
+    """
+
+    @staticmethod
+    def _contribucion(valores):
+        """(agente_id, contadores) con que un ticket aporta al rendimiento."""
+        if not valores or not valores.get('agente_id'):
+            return None
+        rating = valores.get('rating')
+        cierre = valores.get('fecha_cierre')
+        creacion = valores.get('fecha_creacion')
+        cerrado = bool(cierre and creacion)
+        return valores['agente_id'], {
+            'tickets_asignados': 1,
+            'tickets_resueltos': 1 if valores.get('estado') == 'Resuelto' else 0,
+            'rating_suma': rating or 0,
+            'rating_cantidad': 1 if rating is not None else 0,
+            'resolucion_segundos': int((cierre - creacion).total_seconds()) if cerrado else 0,
+            'resolucion_cantidad': 1 if cerrado else 0,
+        }
+
+    @staticmethod
+    def derivar(perf):
+        """Recalcula efectividad y promedios a partir de los contadores."""
+        perf.efectividad = (
+            round(perf.tickets_resueltos * 100 / perf.tickets_asignados, 2)
+            if perf.tickets_asignados else 0
+        )
+        perf.rating_promedio = (
+            round(perf.rating_suma / perf.rating_cantidad, 2) if perf.rating_cantidad else 0
+        )
+        perf.tiempo_promedio_resolucion = (
+            round(perf.resolucion_segundos / perf.resolucion_cantidad / 3600, 2)
+            if perf.resolucion_cantidad else 0
+        )
+
+    @staticmethod
+    def _aplicar(deltas):
+        for agente_id, delta in deltas.items():
+            if not any(delta.values()):
+                continue
+            perf, _ = AgentPerformance.objects.select_for_update().get_or_create(agente_id=agente_id)
+            for campo, valor in delta.items():
+                setattr(perf, campo, getattr(perf, campo) + valor)
+            RendimientoAgenteService.derivar(perf)
+            perf.save()
+
+    @staticmethod
+    def aplicar_cambio(anterior, nuevo):
+        """
+        Mueve el aporte de un ticket de `anterior` a `nuevo`
+        (dicts con CAMPOS_TICKET; None para alta/baja).
+        """
+        deltas = defaultdict(lambda: dict.fromkeys(CONTADORES, 0))
+        for valores, signo in ((anterior, -1), (nuevo, 1)):
+            contribucion = RendimientoAgenteService._contribucion(valores)
+            if contribucion:
+                agente_id, contadores = contribucion
+                for campo, valor in contadores.items():
+                    deltas[agente_id][campo] += signo * valor
+        if not deltas:
+            return
+        try:
+            with transaction.atomic():
+                RendimientoAgenteService._aplicar(deltas)
+        except Exception as e:
+            # Igual que los rollups: nunca romper el guardado del ticket,
+            # la reconciliación nocturna corrige el desvío.
+            logger.error(f"❌ Error actualizando rendimiento de agentes: {e}")
+
+    @staticmethod
+    @transaction.atomic
+    def reconstruir():
+        """
+        Recalcula los contadores de todos los agentes desde la tabla de tickets
+        (una consulta agrupada). Crea el registro de los agentes que no lo tengan.
+        Devuelve la cantidad de registros actualizados.
+        """
+        filas = Ticket.objects.filter(agente__isnull=False).values('agente_id').annotate(
+            tickets_asignados=Count('id'),
+            tickets_resueltos=Count('id', filter=Q(estado='Resuelto')),
+            rating_suma=Sum('rating'),
+            rating_cantidad=Count('rating'),
+            resolucion=Sum(
+                ExpressionWrapper(F('fecha_cierre') - F('fecha_creacion'), output_field=DurationField()),
+                filter=Q(fecha_cierre__isnull=False),
+            ),
+            resolucion_cantidad=Count('fecha_cierre'),
+        ).order_by()
+        por_agente = {fila.pop('agente_id'): fila for fila in filas}
+
+        existentes = set(AgentPerformance.objects.values_list('agente_id', flat=True))
+        faltantes = (
+            set(User.objects.filter(rol__tipo_base='agente').values_list('id', flat=True))
+            | set(por_agente)
+        ) - existentes
+        AgentPerformance.objects.bulk_create(
+            [AgentPerformance(agente_id=agente_id) for agente_id in faltantes], ignore_conflicts=True
+        )
+
+        ahora = timezone.now()
+        registros = list(AgentPerformance.objects.select_for_update())
+        for perf in registros:
+            fila = por_agente.get(perf.agente_id, {})
+            resolucion = fila.get('resolucion')
+            perf.tickets_asignados = fila.get('tickets_asignados', 0)
+            perf.tickets_resueltos = fila.get('tickets_resueltos', 0)
+            perf.rating_suma = fila.get('rating_suma') or 0
+            perf.rating_cantidad = fila.get('rating_cantidad', 0)
+            perf.resolucion_segundos = int(resolucion.total_seconds()) if resolucion else 0
+            perf.resolucion_cantidad = fila.get('resolucion_cantidad', 0)
+            perf.actualizado_en = ahora
+            RendimientoAgenteService.derivar(perf)
+
+        AgentPerformance.objects.bulk_update(
+            registros,
+            [*CONTADORES, 'efectividad', 'rating_promedio', 'tiempo_promedio_resolucion', 'actualizado_en'],
+            batch_size=500,
+        )
+        transaction.on_commit(DashboardCache.invalidar)
+        return len(registros)
@@ -1,11 +1,18 @@
 import os
+from functools import lru_cache
+from io import BytesIO
+from itertools import chain, islice
+from xml.sax.saxutils import escape
+
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.drawing.image import Image
-from django.db.models import Avg
+from openpyxl.utils import get_column_letter
 from openpyxl.styles import Alignment, Font
 from datetime import datetime
 from django.conf import settings
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from django.utils import timezone
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.charts.barcharts import VerticalBarChart
@@ -17,6 +24,159 @@ from reportlab.lib.units import inch, cm
 from svglib.svglib import svg2rlg
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
 
+from .calendario import CalendarioService
+
+
+# =====================================================
+# 📄 PDF: TABLAS PAGINADAS EN MEMORIA CONSTANTE
+# =====================================================
+FILAS_POR_BLOQUE_PDF = 80     # filas candidatas por página (más de las que caben)
+LOGO_PATH = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo_emsa.png')
+
+# Estilos construidos una sola vez y compartidos por todas las tablas y reportes
+ESTILO_ENCABEZADO_PDF = TableStyle([('VALIGN', (0, 0), (-1, -1), 'MIDDLE')])
+ESTILO_TITULO_PDF = ParagraphStyle(name='Title', fontSize=24, alignment=TA_CENTER, leading=28)
+ESTILO_TABLA_TICKETS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+ESTILO_TABLA_USUARIOS = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+ESTILO_TABLA_RENDIMIENTO = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.purple),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+@lru_cache(maxsize=1)
+def _logo_bytes():
+    """Contenido del logo, leído una sola vez por proceso."""
+    if not os.path.exists(LOGO_PATH):
+        return None
+    with open(LOGO_PATH, 'rb') as f:
+        return f.read()
+
+
+def _encabezado_pdf(titulo, ancho):
+    """Logo + título (o solo título si no hay logo)."""
+    logo = _logo_bytes()
+    if logo is None:
+        return Paragraph(titulo, getSampleStyleSheet()["Title"])
+    logo_img = PlatypusImage(BytesIO(logo), width=4*cm, height=1.5*cm)
+    logo_img.hAlign = 'LEFT'
+    return Table(
+        [[logo_img, Paragraph(titulo, ESTILO_TITULO_PDF)]],
+        colWidths=[5*cm, ancho - 5*cm],
+        style=ESTILO_ENCABEZADO_PDF,
+    )
+
+
+class _FlowablesPerezosos(list):
+    """
+    Lista de flowables que se rellena desde un generador a medida que
+    doc.build() la consume: solo hay unas pocas tablas vivas a la vez.
+    """
+    MINIMO = 3
+
+    def __init__(self, fuente):
+        super().__init__()
+        self._fuente = iter(fuente)
+
+    def _rellenar(self):
+        while self._fuente is not None and list.__len__(self) < self.MINIMO:
+            try:
+                self.append(next(self._fuente))
+            except StopIteration:
+                self._fuente = None
+
+    def __len__(self):
+        self._rellenar()
+        return list.__len__(self)
+
+    def __getitem__(self, indice):
+        self._rellenar()
+        return list.__getitem__(self, indice)
+
+
+def _tablas_paginadas(encabezados, filas, col_widths, estilo, frame_ancho, frame_alto, alto_inicial):
+    """
+    Genera una tabla por página (con encabezado) a partir de un iterable de filas.
+    Cada bloque se parte al alto disponible y las filas que no caben pasan a la
+    página siguiente, así el costo de maquetación es lineal en el número de filas.
+    """
+    filas = iter(filas)
+    pendientes = []
+    disponible = alto_inicial
+    limite = FILAS_POR_BLOQUE_PDF
+    agotado = False
+
+    while True:
+        while not agotado and len(pendientes) < limite:
+            try:
+                pendientes.append(next(filas))
+            except StopIteration:
+                agotado = True
+        if not pendientes:
+            return
+
+        tabla = Table([encabezados] + pendientes, colWidths=col_widths, style=estilo, repeatRows=1)
+        if agotado:
+            # Últimas filas: bloque acotado, doc.build lo parte si hace falta
+            yield tabla
+            return
+
+        _, alto = tabla.wrap(frame_ancho, disponible)
+        if alto <= disponible:
+            # Filas muy bajas: el bloque entero cabe, se agranda
+            limite *= 2
+            continue
+
+        partes = tabla.split(frame_ancho, disponible)
+        if not partes:
+            # Ni el encabezado y una fila caben: página nueva
+            yield PageBreak()
+            disponible = frame_alto
+            continue
+
+        primera = partes[0]
+        yield primera
+        yield PageBreak()
+        pendientes = pendientes[len(primera._cellvalues) - 1:]
+        disponible = frame_alto
+
+
+def _construir_pdf_paginado(ruta, titulo, encabezados, filas, col_widths, estilo, **margenes):
+    """Documento A4: encabezado con logo + tabla paginada por bloques."""
+    doc = SimpleDocTemplate(ruta, pagesize=A4, **margenes)
+    encabezado = _encabezado_pdf(titulo, doc.width)
+    separador = Spacer(1, 0.3 * inch)
+
+    # Alto útil del frame (el frame de SimpleDocTemplate tiene 6pt de padding)
+    frame_ancho, frame_alto = doc.width - 12, doc.height - 12
+    alto_inicial = (
+        frame_alto - encabezado.wrap(frame_ancho, frame_alto)[1]
+        - encabezado.getSpaceAfter() - separador.height
+    )
+
+    doc.build(_FlowablesPerezosos(chain(
+        [encabezado, separador],
+        _tablas_paginadas(encabezados, filas, col_widths, estilo, frame_ancho, frame_alto, alto_inicial),
+    )))
+    return ruta
+
 
 def generar_excel_dashboard(data, rango):
     nombre = f"reporte_dashboard_{rango}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
@@ -212,18 +372,84 @@ def generar_pdf_dashboard(data, rango):
     return ruta
 
 
-def generar_excel_tickets(tickets_queryset):
+def _notificar_progreso(progreso, hechos, total):
+    """Llama al callback de progreso (0-100) cada 500 filas."""
+    if progreso and total and hechos % 500 == 0:
+        progreso(hechos * 100 / total)
+
+
+# Columnas del listado de tickets: (encabezado, campo para values_list)
+COLUMNAS_TICKETS = [
+    ("ID", 'id'),
+    ("Título", 'titulo'),
+    ("Estado", 'estado'),
+    ("Prioridad", 'prioridad'),
+    ("Categoría", 'categoria_principal__nombre'),
+    ("Solicitante", 'solicitante__username'),
+    ("Agente", 'agente__username'),
+    ("Fecha Creación", 'fecha_creacion'),
+    ("Fecha Cierre", 'fecha_cierre'),
+    ("Rating", 'rating'),
+    ("Horas Laborables", 'solicitante__area'),   # resolución según el calendario laboral del área
+]
+CHUNK_EXPORTACION = 2000      # filas por viaje al cursor del servidor
+MUESTRA_ANCHOS = 200          # filas usadas para estimar el ancho de columnas
+ANCHO_MAXIMO_COLUMNA = 60
+
+
+def _fila_ticket_excel(fila, estados):
+    (ticket_id, titulo, estado, prioridad, categoria,
+     solicitante, agente, fecha_creacion, fecha_cierre, rating, area_id) = fila
+    horas_laborables = ""
+    if fecha_creacion and fecha_cierre:
+        horas_laborables = round(
+            CalendarioService.transcurrido(fecha_creacion, fecha_cierre, area_id).total_seconds() / 3600, 2
+        )
+    return [
+        ticket_id,
+        titulo,
+        estados.get(estado, estado),
+        prioridad or "N/A",
+        categoria or "N/A",
+        solicitante or "N/A",
+        agente or "Sin asignar",
+        timezone.localtime(fecha_creacion).strftime("%Y-%m-%d %H:%M") if fecha_creacion else "",
+        timezone.localtime(fecha_cierre).strftime("%Y-%m-%d %H:%M") if fecha_cierre else "",
+        rating if rating is not None else "Sin calificar",
+        horas_laborables,
+    ]
+
+
+def escribir_excel_tickets(tickets_queryset, destino, progreso=None):
     """
-    Genera un reporte de listado de tickets en formato Excel.
+    Escribe el listado de tickets en `destino` (ruta o archivo binario) con un
+    workbook write-only: las filas salen del cursor por bloques como tuplas
+    (values_list) y se escriben sin mantener el libro en memoria.
+    `progreso(porcentaje)` es opcional y se usa desde los jobs asíncronos.
     """
-    nombre = f"reporte_tickets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    reportes_dir = os.path.join(settings.MEDIA_ROOT, 'reportes')
-    os.makedirs(reportes_dir, exist_ok=True)
-    ruta = os.path.join(reportes_dir, nombre)
-
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Listado de Tickets"
+    from tickets.models import Ticket
+
+    estados = dict(Ticket.ESTADO_CHOICES)
+    headers = [encabezado for encabezado, _ in COLUMNAS_TICKETS]
+    total = tickets_queryset.count() if progreso else 0
+    filas = (
+        _fila_ticket_excel(fila, estados)
+        for fila in tickets_queryset.values_list(
+            *[campo for _, campo in COLUMNAS_TICKETS]
+        ).iterator(chunk_size=CHUNK_EXPORTACION)
+    )
+
+    # En modo write-only los anchos se fijan antes de escribir: se estiman con una muestra
+    muestra = list(islice(filas, MUESTRA_ANCHOS))
+    anchos = [len(encabezado) for encabezado in headers]
+    for fila in muestra:
+        for i, valor in enumerate(fila):
+            anchos[i] = max(anchos[i], len(str(valor)))
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Listado de Tickets")
+    for i, ancho in enumerate(anchos, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = min(ancho + 2, ANCHO_MAXIMO_COLUMNA)
 
     # --- AÑADIR LOGO ---
     logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo_emsa.png')
@@ -234,115 +460,80 @@ def generar_excel_tickets(tickets_queryset):
         ws.add_image(img, 'A1')
 
     # --- Título ---
-    title_cell = ws["C1"]
-    title_cell.value = "Reporte de Tickets"
+    title_cell = WriteOnlyCell(ws, value="Reporte de Tickets")
     title_cell.font = Font(size=18, bold=True)
     title_cell.alignment = Alignment(horizontal='center', vertical='center')
-    ws.merge_cells("C1:J2")
     ws.row_dimensions[1].height = 40
+    ws.append([None, None, title_cell])
+    ws.append([])
 
     # --- Encabezados ---
-    headers = [
-        "ID", "Título", "Estado", "Prioridad", "Categoría",
-        "Solicitante", "Agente", "Fecha Creación", "Fecha Cierre", "Rating"
-    ]
-    ws.append([])
-    ws.append(headers)
-    for cell in ws[ws.max_row]: # Corregido: aplicar estilo a la última fila (la de los encabezados)
+    header_cells = []
+    for encabezado in headers:
+        cell = WriteOnlyCell(ws, value=encabezado)
         cell.font = Font(bold=True)
+        header_cells.append(cell)
+    ws.append(header_cells)
 
     # --- Datos ---
-    for ticket in tickets_queryset:
-        ws.append([
-            ticket.id,
-            ticket.titulo,
-            ticket.get_estado_display(),
-            ticket.prioridad if ticket.prioridad else "N/A",
-            ticket.categoria_principal.nombre if ticket.categoria_principal else "N/A",
-            ticket.solicitante.username if ticket.solicitante else "N/A",
-            ticket.agente.username if ticket.agente else "Sin asignar",
-            ticket.fecha_creacion.strftime("%Y-%m-%d %H:%M") if ticket.fecha_creacion else "",
-            ticket.fecha_cierre.strftime("%Y-%m-%d %H:%M") if ticket.fecha_cierre else "",
-            ticket.rating if ticket.rating is not None else "Sin calificar"
-        ])
+    for i, fila in enumerate(chain(muestra, filas), start=1):
+        _notificar_progreso(progreso, i, total)
+        ws.append(fila)
 
-    # Ajustar ancho de columnas
-    for col in ws.columns:
-        max_length = 0
-        column = col[2].column_letter # Usar una fila que no esté combinada (fila 3 de encabezados)
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column].width = adjusted_width
-
-    wb.save(ruta)
-    return ruta
+    wb.save(destino)
+    return destino
 
 
-def generar_pdf_tickets(tickets_queryset):
+def generar_excel_tickets(tickets_queryset, progreso=None):
     """
-    Genera un reporte de listado de tickets en formato PDF.
+    Genera un reporte de listado de tickets en formato Excel (en media/reportes).
     """
-    nombre = f"reporte_tickets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    nombre = f"reporte_tickets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     reportes_dir = os.path.join(settings.MEDIA_ROOT, 'reportes')
     os.makedirs(reportes_dir, exist_ok=True)
     ruta = os.path.join(reportes_dir, nombre)
+    return escribir_excel_tickets(tickets_queryset, ruta, progreso=progreso)
 
-    doc = SimpleDocTemplate(ruta, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-    styles = getSampleStyleSheet()
-    elements = []
-
-    # --- AÑADIR LOGO Y TÍTULO ---
-    logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo_emsa.png')
-    if os.path.exists(logo_path):
-        logo_img = PlatypusImage(logo_path, width=4*cm, height=1.5*cm)
-        logo_img.hAlign = 'LEFT'
-        
-        title_style = ParagraphStyle(name='Title', fontSize=24, alignment=TA_CENTER, leading=28)
-        title = Paragraph("Reporte de Tickets", title_style)
-        
-        header_table = Table([[logo_img, title]], colWidths=[5*cm, doc.width - 5*cm])
-        header_table.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'MIDDLE')]))
-        elements.append(header_table)
-    else:
-        elements.append(Paragraph("Reporte de Tickets", styles["Title"]))
-
-    elements.append(Spacer(1, 0.3 * inch))
-
-    # --- Datos de la tabla ---
-    data = [
-        ["ID", "Título", "Estado", "Agente", "Fecha Creación"] # Encabezados
-    ]
-    for ticket in tickets_queryset:
-        data.append([
-            ticket.id,
-            Paragraph(ticket.titulo, styles['BodyText']),
-            ticket.get_estado_display(),
-            ticket.agente.username if ticket.agente else "N/A",
-            ticket.fecha_creacion.strftime("%d/%m/%Y")
-        ])
-
-    table = Table(data, colWidths=[0.5*inch, 2.5*inch, 1*inch, 1.5*inch, 1.2*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
 
-    elements.append(table)
-    doc.build(elements)
-    return ruta
+def generar_pdf_tickets(tickets_queryset, progreso=None):
+    """
+    Genera un reporte de listado de tickets en formato PDF.
+    `progreso(porcentaje)` es opcional y se usa desde los jobs asíncronos.
+    """
+    from tickets.models import Ticket
 
+    nombre = f"reporte_tickets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    reportes_dir = os.path.join(settings.MEDIA_ROOT, 'reportes')
+    os.makedirs(reportes_dir, exist_ok=True)
+    ruta = os.path.join(reportes_dir, nombre)
 
-def generar_excel_categorias(category_queryset):
+    estados = dict(Ticket.ESTADO_CHOICES)
+    estilo_texto = getSampleStyleSheet()['BodyText']
+    total = tickets_queryset.count() if progreso else 0
+
+    def filas():
+        datos = tickets_queryset.values_list(
+            'id', 'titulo', 'estado', 'agente__username', 'fecha_creacion'
+        ).iterator(chunk_size=CHUNK_EXPORTACION)
+        for i, (ticket_id, titulo, estado, agente, fecha_creacion) in enumerate(datos, start=1):
+            _notificar_progreso(progreso, i, total)
+            yield [
+                ticket_id,
+                Paragraph(escape(titulo), estilo_texto),
+                estados.get(estado, estado),
+                agente or "N/A",
+                timezone.localtime(fecha_creacion).strftime("%d/%m/%Y"),
+            ]
+
+    return _construir_pdf_paginado(
+        ruta, "Reporte de Tickets",
+        ["ID", "Título", "Estado", "Agente", "Fecha Creación"], filas(),
+        [0.5*inch, 2.5*inch, 1*inch, 1.5*inch, 1.2*inch], ESTILO_TABLA_TICKETS,
+        rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30,
+    )
+
+
+def generar_excel_categorias(categorias):
     """
     Genera un reporte de métricas por categoría en formato Excel.
     """
@@ -382,14 +573,14 @@ def generar_excel_categorias(category_queryset):
         cell.font = Font(bold=True)
 
     # --- Datos ---
-    for cat in category_queryset:
+    for cat in categorias:
         ws.append([
-            cat.nombre,
-            cat.total_tickets,
-            cat.tickets_abiertos,
-            cat.tickets_resueltos,
-            round(cat.rating_promedio or 0, 2),
-            round(cat.tiempo_promedio_resolucion_horas or 0, 2)
+            cat['nombre'],
+            cat['total_tickets'],
+            cat['tickets_abiertos'],
+            cat['tickets_resueltos'],
+            round(cat['rating_promedio'] or 0, 2),
+            round(cat['tiempo_promedio_resolucion_horas'] or 0, 2)
         ])
 
     # Ajustar ancho de columnas
@@ -409,7 +600,7 @@ def generar_excel_categorias(category_queryset):
     return ruta
 
 
-def generar_pdf_categorias(category_queryset):
+def generar_pdf_categorias(categorias):
     """
     Genera un reporte de métricas por categoría en formato PDF.
     """
@@ -440,8 +631,11 @@ def generar_pdf_categorias(category_queryset):
     elements.append(Spacer(1, 0.3 * inch))
 
     data = [["Categoría", "Total Tickets", "Rating Promedio", "Tiempo Prom. Res. (h)"]]
-    for cat in category_queryset:
-        data.append([cat.nombre, cat.total_tickets, round(cat.rating_promedio or 0, 2), round(cat.tiempo_promedio_resolucion_horas or 0, 2)])
+    for cat in categorias:
+        data.append([
+            cat['nombre'], cat['total_tickets'],
+            round(cat['rating_promedio'] or 0, 2), round(cat['tiempo_promedio_resolucion_horas'] or 0, 2)
+        ])
 
     table = Table(data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch, 1.8*inch])
     table.setStyle(TableStyle([
@@ -536,47 +730,17 @@ def generar_pdf_usuarios(users_queryset):
     os.makedirs(reportes_dir, exist_ok=True)
     ruta = os.path.join(reportes_dir, nombre)
 
-    doc = SimpleDocTemplate(ruta, pagesize=A4)
-    styles = getSampleStyleSheet()
-    elements = []
-
-    # --- AÑADIR LOGO Y TÍTULO ---
-    logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo_emsa.png')
-    if os.path.exists(logo_path):
-        logo_img = PlatypusImage(logo_path, width=4*cm, height=1.5*cm)
-        logo_img.hAlign = 'LEFT'
-        
-        title_style = ParagraphStyle(name='Title', fontSize=24, alignment=TA_CENTER, leading=28)
-        title = Paragraph("Reporte de Usuarios", title_style)
-        
-        header_table = Table([[logo_img, title]], colWidths=[5*cm, doc.width - 5*cm])
-        header_table.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'MIDDLE')]))
-        elements.append(header_table)
-    else:
-        elements.append(Paragraph("Reporte de Usuarios", styles["Title"]))
-
-    elements.append(Spacer(1, 0.3 * inch))
-
-    data = [["ID", "Username", "Email", "Rol", "Activo"]]
-    for user in users_queryset:
-        data.append([
-            user.id, user.username, user.email, 
-            user.rol.nombre_visible if user.rol else "Sin rol", 
-            "Sí" if user.is_active else "No"
-        ])
-
-    table = Table(data, colWidths=[0.5*inch, 2*inch, 2.5*inch, 1.5*inch, 0.8*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-
-    elements.append(table)
-    doc.build(elements)
-    return ruta
+    filas = (
+        [user_id, username, email, rol or "Sin rol", "Sí" if activo else "No"]
+        for user_id, username, email, rol, activo in users_queryset.values_list(
+            'id', 'username', 'email', 'rol__nombre_visible', 'is_active'
+        ).iterator(chunk_size=CHUNK_EXPORTACION)
+    )
+    return _construir_pdf_paginado(
+        ruta, "Reporte de Usuarios",
+        ["ID", "Username", "Email", "Rol", "Activo"], filas,
+        [0.5*inch, 2*inch, 2.5*inch, 1.5*inch, 0.8*inch], ESTILO_TABLA_USUARIOS,
+    )
 
 
 def generar_excel_rendimiento(performance_queryset):
@@ -620,8 +784,6 @@ def generar_excel_rendimiento(performance_queryset):
 
     # --- Datos ---
     for perf in performance_queryset:
-        # Calcular el rating promedio aquí, ya que no es un campo directo del modelo
-        rating_avg = perf.agente.tickets_asignados.filter(rating__isnull=False).aggregate(Avg('rating'))['rating__avg'] or 0
         ws.append([
             perf.agente.username,
             perf.agente.rol.nombre_visible if perf.agente.rol else "Sin rol",
@@ -629,7 +791,7 @@ def generar_excel_rendimiento(performance_queryset):
             perf.tickets_resueltos,
             round(perf.tiempo_promedio_resolucion, 2),
             round(perf.efectividad, 2),
-            round(rating_avg, 2),
+            round(perf.rating_promedio, 2),
             perf.actualizado_en.strftime("%Y-%m-%d %H:%M") if perf.actualizado_en else "",
         ])
 
@@ -659,45 +821,14 @@ def generar_pdf_rendimiento(performance_queryset):
     os.makedirs(reportes_dir, exist_ok=True)
     ruta = os.path.join(reportes_dir, nombre)
 
-    doc = SimpleDocTemplate(ruta, pagesize=A4)
-    styles = getSampleStyleSheet()
-    elements = []
-
-    # --- AÑADIR LOGO Y TÍTULO ---
-    logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo_emsa.png')
-    if os.path.exists(logo_path):
-        logo_img = PlatypusImage(logo_path, width=4*cm, height=1.5*cm)
-        logo_img.hAlign = 'LEFT'
-        
-        title_style = ParagraphStyle(name='Title', fontSize=24, alignment=TA_CENTER, leading=28)
-        title = Paragraph("Reporte de Rendimiento de Agentes", title_style)
-        
-        header_table = Table([[logo_img, title]], colWidths=[5*cm, doc.width - 5*cm])
-        header_table.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'MIDDLE')]))
-        elements.append(header_table)
-    else:
-        elements.append(Paragraph("Reporte de Rendimiento de Agentes", styles["Title"]))
-
-    elements.append(Spacer(1, 0.3 * inch))
-
-    data = [["Agente", "Tickets Resueltos", "Efectividad (%)", "Rating Promedio"]]
-    for perf in performance_queryset:
-        # Calcular el rating promedio aquí, ya que no es un campo directo del modelo
-        rating_avg = perf.agente.tickets_asignados.filter(rating__isnull=False).aggregate(Avg('rating'))['rating__avg'] or 0
-        data.append([
-            perf.agente.username, perf.tickets_resueltos, 
-            f"{round(perf.efectividad, 2)}%", round(rating_avg, 2)
-        ])
-
-    table = Table(data, colWidths=[2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.purple),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-
-    elements.append(table)
-    doc.build(elements)
-    return ruta
+    filas = (
+        [username, resueltos, f"{round(efectividad, 2)}%", round(rating or 0, 2)]
+        for username, resueltos, efectividad, rating in performance_queryset.values_list(
+            'agente__username', 'tickets_resueltos', 'efectividad', 'rating_promedio'
+        ).iterator(chunk_size=CHUNK_EXPORTACION)
+    )
+    return _construir_pdf_paginado(
+        ruta, "Reporte de Rendimiento de Agentes",
+        ["Agente", "Tickets Resueltos", "Efectividad (%)", "Rating Promedio"], filas,
+        [2*inch, 1.5*inch, 1.5*inch, 1.5*inch], ESTILO_TABLA_RENDIMIENTO,
+    )
@@ -0,0 +1,251 @@
+# adminpanel/reportes.py
+import hashlib
+import json
+import logging
+import os
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db.models import Avg, Count, F, Q
+from django.utils import timezone
+
+from tickets import models as ticket_models
+from users.models import User
+from .dashboard_cache import DashboardCache
+from .filtros import FiltroTicketsService
+from .models import AgentPerformance, ReporteJob
+from .report_generator import (
+    generar_excel_dashboard, generar_pdf_dashboard,
+    generar_excel_tickets, generar_pdf_tickets,
+    generar_excel_usuarios, generar_pdf_usuarios,
+    generar_excel_rendimiento, generar_pdf_rendimiento,
+    generar_excel_categorias, generar_pdf_categorias,
+)
+from .utils_filters import filtrar_tickets
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = ('xlsx', 'pdf')
+
+# Parámetros que acepta cada reporte (el resto se ignora para la huella)
+PARAMETROS_POR_TIPO = {
+    'dashboard': ('rango', 'categoria', 'estado', 'prioridad', 'agente', 'search'),
+    'tickets': ('search', 'estado', 'categoria', 'prioridad', 'agente', 'orden'),
+    'usuarios': (),
+    'rendimiento': (),
+    'categorias': ('categoria',),
+}
+
+
+class ReporteService:
+    """
+    Generación de reportes XLSX/PDF, síncrona (vistas GET) o en jobs de Celery.
+    """
+
+    # Un job pendiente más antiguo que esto se considera abandonado
+    JOB_TIMEOUT = timedelta(hours=1)
+
+    # -------------------------------------------
+    # Parámetros
+    # -------------------------------------------
+    @staticmethod
+    def normalizar_parametros(tipo, params):
+        """Lanza ValueError si los filtros de tickets no son válidos."""
+        if tipo in ('dashboard', 'tickets'):
+            # Filtros de tickets ya compilados: requests equivalentes comparten huella
+            parametros = FiltroTicketsService.compilar(params)
+            if tipo == 'dashboard':
+                parametros.pop('orden', None)
+                parametros['rango'] = str(params.get('rango') or '30dias').strip()
+            return parametros
+        parametros = {
+            campo: str(params.get(campo)).strip()
+            for campo in PARAMETROS_POR_TIPO[tipo]
+            if params.get(campo) not in (None, '')
+        }
+        return parametros
+
+    @staticmethod
+    def huella(tipo, formato, parametros):
+        contenido = json.dumps([tipo, formato, parametros], sort_keys=True)
+        return hashlib.sha256(contenido.encode()).hexdigest()
+
+    # -------------------------------------------
+    # Generación
+    # -------------------------------------------
+    @staticmethod
+    def generar(tipo, formato, parametros, progreso=None):
+        """Genera el archivo y devuelve su ruta absoluta."""
+        # filtrar_tickets y el dashboard solo leen request.query_params
+        request = SimpleNamespace(query_params=parametros)
+        excel = formato == 'xlsx'
+
+        if tipo == 'dashboard':
+            from .views.admin_views import AdminDashboardView
+            data = AdminDashboardView.get_dashboard_data(request)
+            if progreso:
+                progreso(50)
+            generador = generar_excel_dashboard if excel else generar_pdf_dashboard
+            return generador(data, parametros['rango'])
+
+        if tipo == 'tickets':
+            tickets = filtrar_tickets(request)
+            generador = generar_excel_tickets if excel else generar_pdf_tickets
+            return generador(tickets, progreso=progreso)
+
+        if tipo == 'usuarios':
+            usuarios = User.objects.all().order_by('username')
+            generador = generar_excel_usuarios if excel else generar_pdf_usuarios
+            return generador(usuarios)
+
+        if tipo == 'rendimiento':
+            rendimiento = AgentPerformance.objects.select_related(
+                'agente__rol'
+            ).all().order_by('-tickets_resueltos')
+            generador = generar_excel_rendimiento if excel else generar_pdf_rendimiento
+            return generador(rendimiento)
+
+        if tipo == 'categorias':
+            categorias = ReporteService.metricas_categorias(parametros.get('categoria'))
+            if progreso:
+                progreso(50)
+            generador = generar_excel_categorias if excel else generar_pdf_categorias
+            return generador(categorias)
+
+        raise ValueError(f"Tipo de reporte no válido: {tipo}")
+
+    @staticmethod
+    def metricas_categorias(categoria_id=None):
+        """Métricas de tickets por categoría activa, en una sola consulta agrupada."""
+        categorias = ticket_models.CategoriaPrincipal.objects.filter(activo=True)
+        if categoria_id:
+            categorias = categorias.filter(id=categoria_id)
+
+        cerrados = Q(tickets__fecha_cierre__isnull=False)
+        filas = categorias.order_by('orden', 'nombre').values(
+            'id', 'nombre', 'descripcion', 'activo'
+        ).annotate(
+            total_tickets=Count('tickets'),
+            tickets_abiertos=Count('tickets', filter=Q(tickets__estado__in=['Abierto', 'En Proceso'])),
+            tickets_resueltos=Count('tickets', filter=Q(tickets__estado='Resuelto')),
+            rating_promedio=Avg('tickets__rating'),
+            tiempo_resolucion=Avg(
+                F('tickets__fecha_cierre') - F('tickets__fecha_creacion'), filter=cerrados
+            ),
+        )
+
+        categorias_con_metricas = []
+        for fila in filas:
+            tiempo_res = fila.pop('tiempo_resolucion')
+            fila['rating_promedio'] = round(fila['rating_promedio'] or 0, 2)
+            fila['tiempo_promedio_resolucion_horas'] = (
+                round(tiempo_res.total_seconds() / 3600, 2) if tiempo_res else 0
+            )
+            categorias_con_metricas.append(fila)
+        return categorias_con_metricas
+
+    # -------------------------------------------
+    # Jobs
+    # -------------------------------------------
+    @staticmethod
+    def ruta_absoluta(job):
+        return os.path.join(settings.MEDIA_ROOT, job.archivo)
+
+    @staticmethod
+    def solicitar(tipo, formato, params, usuario):
+        """
+        Crea un job o reutiliza uno equivalente: en curso, o completado
+        sin cambios de datos desde entonces. Devuelve (job, reutilizado).
+        """
+        parametros = ReporteService.normalizar_parametros(tipo, params)
+        huella = ReporteService.huella(tipo, formato, parametros)
+        try:
+            version = DashboardCache.version()
+        except Exception as e:
+            logger.warning(f"Caché no disponible, no se reutilizan reportes completados: {e}")
+            version = None
+
+        reutilizables = Q(estado__in=['pendiente', 'procesando'],
+                          fecha_creacion__gte=timezone.now() - ReporteService.JOB_TIMEOUT)
+        if version is not None:
+            reutilizables |= Q(estado='completado', version_datos=version)
+        candidatos = ReporteJob.objects.filter(huella=huella).filter(
+            reutilizables
+        ).order_by('-fecha_creacion')
+        for job in candidatos[:3]:
+            if job.estado != 'completado' or os.path.exists(ReporteService.ruta_absoluta(job)):
+                return job, True
+
+        job = ReporteJob.objects.create(
+            tipo=tipo,
+            formato=formato,
+            parametros=parametros,
+            huella=huella,
+            version_datos=version or 0,
+            solicitado_por=usuario,
+        )
+        from .tasks import encolar_reporte
+        encolar_reporte(job.id)
+        return job, False
+
+    @staticmethod
+    def ejecutar(job):
+        """Genera el archivo de un job actualizando su estado y progreso."""
+        ReporteJob.objects.filter(id=job.id).update(estado='procesando', progreso=1)
+        ultimo = {'valor': 1}
+
+        def progreso(porcentaje):
+            porcentaje = max(1, min(int(porcentaje), 99))
+            # Solo se escribe en BD cuando el avance es apreciable
+            if porcentaje - ultimo['valor'] >= 5:
+                ultimo['valor'] = porcentaje
+                ReporteJob.objects.filter(id=job.id).update(progreso=porcentaje)
+
+        try:
+            ruta = ReporteService.generar(job.tipo, job.formato, job.parametros, progreso=progreso)
+        except Exception as e:
+            logger.error(f"Error generando reporte {job.id}: {e}", exc_info=True)
+            ReporteJob.objects.filter(id=job.id).update(
+                estado='error', error=str(e), fecha_fin=timezone.now()
+            )
+            return False
+
+        ReporteJob.objects.filter(id=job.id).update(
+            estado='completado',
+            progreso=100,
+            archivo=os.path.relpath(ruta, settings.MEDIA_ROOT),
+            fecha_fin=timezone.now(),
+        )
+        return True
+
+    # -------------------------------------------
+    # Limpieza
+    # -------------------------------------------
+    @staticmethod
+    def limpiar_antiguos():
+        """
+        Borra los jobs creados hace más de REPORTES_RETENCION_DIAS días y los
+        archivos de media/reportes con esa antigüedad (también los generados
+        por las vistas síncronas, que no tienen job). Devuelve (jobs, archivos).
+        """
+        limite = timezone.now() - timedelta(days=settings.REPORTES_RETENCION_DIAS)
+        antiguos = ReporteJob.objects.filter(fecha_creacion__lt=limite)
+        rutas = [ReporteService.ruta_absoluta(job) for job in antiguos.exclude(archivo='')]
+        jobs, _ = antiguos.delete()
+
+        archivos = 0
+        directorio = os.path.join(settings.MEDIA_ROOT, 'reportes')
+        if os.path.isdir(directorio):
+            with os.scandir(directorio) as entradas:
+                rutas += [
+                    e.path for e in entradas
+                    if e.is_file() and e.stat().st_mtime < limite.timestamp()
+                ]
+        for ruta in set(rutas):
+            try:
+                os.remove(ruta)
+                archivos += 1
+            except FileNotFoundError:
+                pass
+        return jobs, archivos
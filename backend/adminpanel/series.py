@@ -0,0 +1,268 @@
+# adminpanel/series.py
+import hashlib
+import json
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Aggregate, CharField, Count, DurationField, ExpressionWrapper, F, FloatField, Func, IntegerField, Value,
+)
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from tickets.models import Ticket
+
+logger = logging.getLogger(__name__)
+
+# intervalo → (kind de Trunc, paso, ventana por defecto)
+INTERVALOS = {
+    'hora': ('hour', timedelta(hours=1), timedelta(hours=48)),
+    'dia': ('day', timedelta(days=1), timedelta(days=30)),
+    'semana': ('week', timedelta(weeks=1), timedelta(weeks=12)),
+}
+# agrupar → (campo id, campo nombre) en Ticket
+AGRUPACIONES = {
+    'categoria': ('categoria_principal_id', 'categoria_principal__nombre'),
+    'agente': ('agente_id', 'agente__username'),
+}
+PERCENTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99))
+MAX_PERIODOS = 1000
+
+
+class PercentileCont(Aggregate):
+    """percentile_cont(p) WITHIN GROUP (ORDER BY expr) de PostgreSQL."""
+    function = 'percentile_cont'
+    template = '%(function)s(%(percentil)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+    def __init__(self, expression, percentil, **extra):
+        super().__init__(expression, percentil=float(percentil), **extra)
+
+
+class Epoch(Func):
+    """Segundos de un intervalo (EXTRACT(EPOCH FROM ...))."""
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+    output_field = FloatField()
+
+
+def inicio_periodo(momento, intervalo):
+    """Inicio (aware, hora local) del periodo que contiene `momento`, como Trunc."""
+    local = timezone.localtime(momento)
+    if intervalo == 'hora':
+        return local.replace(minute=0, second=0, microsecond=0)
+    medianoche = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    if intervalo == 'semana':
+        return medianoche - timedelta(days=medianoche.weekday())
+    return medianoche
+
+
+class SeriesTemporalService:
+    """
+    Series temporales de tickets por hora / día / semana: creados, resueltos y
+    percentiles (p50/p90/p99) del tiempo de resolución en horas, opcionalmente
+    agrupadas por categoría o agente. Los percentiles se calculan en la base de
+    datos con percentile_cont (solo PostgreSQL).
+
+    Los periodos ya cerrados no cambian (salvo correcciones de datos), así que se
+    cachean juntos durante SERIES_CACHE_TTL; solo el periodo en curso se calcula
+    en cada request.
+    """
+
+    # -------------------------------------------
+    # Parámetros
+    # -------------------------------------------
+    @staticmethod
+    def parametros(params, ahora=None):
+        """Valida y normaliza los parámetros. Lanza ValueError con el mensaje para el cliente."""
+        intervalo = params.get('intervalo', 'dia')
+        if intervalo not in INTERVALOS:
+            raise ValueError(f'Intervalo no válido. Use: {", ".join(INTERVALOS)}.')
+        agrupar = params.get('agrupar') or None
+        if agrupar and agrupar not in AGRUPACIONES:
+            raise ValueError(f'Agrupación no válida. Use: {", ".join(AGRUPACIONES)}.')
+
+        ahora = ahora or timezone.now()
+        _, paso, ventana = INTERVALOS[intervalo]
+        fechas = {}
+        for campo in ('desde', 'hasta'):
+            valor = params.get(campo)
+            if not valor:
+                continue
+            fecha = parse_date(valor)
+            if not fecha:
+                raise ValueError(f'"{campo}" debe tener el formato YYYY-MM-DD.')
+            fechas[campo] = fecha
+
+        # hasta es inclusive: el periodo termina al final de ese día
+        hasta = (
+            timezone.make_aware(datetime.combine(fechas['hasta'] + timedelta(days=1), time.min))
+            if 'hasta' in fechas else ahora
+        )
+        desde = (
+            timezone.make_aware(datetime.combine(fechas['desde'], time.min))
+            if 'desde' in fechas else hasta - ventana
+        )
+        desde = inicio_periodo(desde, intervalo)
+        if desde >= hasta:
+            raise ValueError('"desde" debe ser anterior a "hasta".')
+        if (hasta - desde) / paso > MAX_PERIODOS:
+            raise ValueError(f'El rango supera el máximo de {MAX_PERIODOS} periodos; use un intervalo mayor.')
+
+        filtros = {}
+        for campo in ('categoria', 'agente'):
+            valor = params.get(campo)
+            if valor:
+                if not str(valor).isdigit():
+                    raise ValueError(f'"{campo}" no válido.')
+                filtros[f'{campo}_id' if campo == 'agente' else 'categoria_principal_id'] = int(valor)
+
+        return {
+            'intervalo': intervalo,
+            'agrupar': agrupar,
+            'desde': desde,
+            'hasta': hasta,
+            'filtros': filtros,
+        }
+
+    # -------------------------------------------
+    # Cálculo
+    # -------------------------------------------
+    @staticmethod
+    def _grupo(agrupar):
+        if not agrupar:
+            return {
+                'grupo_id': Value(None, output_field=IntegerField()),
+                'grupo': Value('Total', output_field=CharField()),
+            }
+        campo_id, campo_nombre = AGRUPACIONES[agrupar]
+        return {'grupo_id': F(campo_id), 'grupo': F(campo_nombre)}
+
+    @staticmethod
+    def _creados(p, desde, hasta):
+        kind = INTERVALOS[p['intervalo']][0]
+        return Ticket.objects.filter(
+            fecha_creacion__gte=desde, fecha_creacion__lt=hasta, **p['filtros']
+        ).annotate(
+            periodo=Trunc('fecha_creacion', kind), **SeriesTemporalService._grupo(p['agrupar'])
+        ).values('periodo', 'grupo_id', 'grupo').annotate(creados=Count('id')).order_by()
+
+    @staticmethod
+    def _resueltos(p, desde, hasta):
+        """Resueltos y percentiles por periodo de cierre: [(periodo, grupo_id, grupo, medidas)]."""
+        kind = INTERVALOS[p['intervalo']][0]
+        tickets = Ticket.objects.filter(
+            fecha_cierre__gte=desde, fecha_cierre__lt=hasta, **p['filtros']
+        ).annotate(
+            periodo=Trunc('fecha_cierre', kind), **SeriesTemporalService._grupo(p['agrupar'])
+        )
+        duracion = ExpressionWrapper(F('fecha_cierre') - F('fecha_creacion'), output_field=DurationField())
+
+        filas = tickets.values('periodo', 'grupo_id', 'grupo').annotate(
+            resueltos=Count('id'),
+            **{nombre: PercentileCont(Epoch(duracion), p_) for nombre, p_ in PERCENTILES},
+        ).order_by()
+        return [
+            (f['periodo'], f['grupo_id'], f['grupo'], {
+                'resueltos': f['resueltos'],
+                **{nombre: f[nombre] for nombre, _ in PERCENTILES},
+            })
+            for f in filas
+        ]
+
+    @staticmethod
+    def _calcular(p, desde, hasta):
+        """{(periodo_iso, grupo_id): punto} de los periodos entre desde y hasta."""
+        puntos = {}
+        vacio = lambda grupo: {
+            'grupo': grupo, 'creados': 0, 'resueltos': 0, **dict.fromkeys(dict(PERCENTILES))
+        }
+
+        for f in SeriesTemporalService._creados(p, desde, hasta):
+            clave = (timezone.localtime(f['periodo']).isoformat(), f['grupo_id'])
+            puntos.setdefault(clave, vacio(f['grupo']))['creados'] = f['creados']
+
+        for periodo, grupo_id, grupo, medidas in SeriesTemporalService._resueltos(p, desde, hasta):
+            clave = (timezone.localtime(periodo).isoformat(), grupo_id)
+            punto = puntos.setdefault(clave, vacio(grupo))
+            punto['resueltos'] = medidas['resueltos']
+            for nombre, _ in PERCENTILES:
+                segundos = medidas[nombre]
+                punto[nombre] = round(segundos / 3600, 2) if segundos is not None else None
+
+        # Lista (no tuplas) para que sobreviva a la serialización de la caché
+        return [[periodo, grupo_id, punto] for (periodo, grupo_id), punto in puntos.items()]
+
+    @staticmethod
+    def _clave(p, desde, hasta):
+        contenido = json.dumps(
+            [p['intervalo'], p['agrupar'], p['filtros'], desde.isoformat(), hasta.isoformat()],
+            sort_keys=True,
+        )
+        return f"series:{hashlib.md5(contenido.encode()).hexdigest()}"
+
+    @staticmethod
+    def _cerrados(p, hasta):
+        """Periodos cerrados (anteriores a `hasta`), desde la caché si están."""
+        calcular = lambda: SeriesTemporalService._calcular(p, p['desde'], hasta)
+        try:
+            clave = SeriesTemporalService._clave(p, p['desde'], hasta)
+            datos = cache.get(clave)
+            if datos is None:
+                datos = calcular()
+                cache.set(clave, datos, getattr(settings, 'SERIES_CACHE_TTL', 3600))
+            return datos
+        except Exception as e:
+            logger.warning(f"Caché de series no disponible: {e}")
+            return calcular()
+
+    @staticmethod
+    def obtener(p, ahora=None):
+        ahora = ahora or timezone.now()
+        intervalo = p['intervalo']
+        # Frontera entre periodos cerrados y el periodo en curso
+        frontera = max(min(inicio_periodo(ahora, intervalo), p['hasta']), p['desde'])
+
+        filas = []
+        if frontera > p['desde']:
+            filas += SeriesTemporalService._cerrados(p, frontera)
+        if p['hasta'] > frontera:
+            filas += SeriesTemporalService._calcular(p, frontera, p['hasta'])
+
+        # Todos los periodos del rango, con ceros donde no hubo actividad
+        _, paso, _ = INTERVALOS[intervalo]
+        periodos = []
+        periodo = p['desde']
+        while periodo < p['hasta']:
+            periodos.append(periodo.isoformat())
+            periodo = timezone.localtime(periodo) + paso
+
+        series = {}
+        for periodo, grupo_id, punto in filas:
+            grupo = punto.pop('grupo')
+            serie = series.setdefault(grupo_id, {'grupo_id': grupo_id, 'grupo': grupo, 'puntos': {}})
+            serie['puntos'][periodo] = punto
+        if not series and not p['agrupar']:
+            series[None] = {'grupo_id': None, 'grupo': 'Total', 'puntos': {}}
+
+        vacio = {'creados': 0, 'resueltos': 0, **dict.fromkeys(dict(PERCENTILES))}
+        return {
+            'intervalo': intervalo,
+            'agrupar': p['agrupar'],
+            'desde': p['desde'].isoformat(),
+            'hasta': p['hasta'].isoformat(),
+            'periodos': periodos,
+            'series': [
+                {
+                    'grupo_id': serie['grupo_id'],
+                    'grupo': serie['grupo'] or 'Sin asignar',
+                    'puntos': [
+                        {'periodo': periodo, **serie['puntos'].get(periodo, vacio)}
+                        for periodo in periodos
+                    ],
+                }
+                for serie in sorted(series.values(), key=lambda s: (s['grupo'] is None, s['grupo'] or ''))
+            ],
+        }
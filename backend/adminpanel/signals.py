@@ -0,0 +1,162 @@
+# adminpanel/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from tickets.condicional import VersionTablas
+from tickets.models import CategoriaPrincipal, Subcategoria, Ticket, TicketAssignment
+from users.models import Rol, User
+from .calendario import CalendarioService
+from .dashboard_cache import DashboardCache
+from .filtros import FiltroTicketsService
+from .metricas import MetricasTicketService
+from .models import AgentPerformance, ConfiguracionSistema, DiaFeriado, HorarioLaboral, Priority, SLA
+from .rendimiento import RendimientoAgenteService
+
+
+# =====================================================
+# 📊 MANTENIMIENTO DE ROLLUPS DE TICKETS Y RENDIMIENTO
+# =====================================================
+@receiver(pre_save, sender=Ticket)
+def capturar_metricas_anteriores(sender, instance, raw=False, **kwargs):
+    """Guarda los valores actuales en BD para calcular el delta en post_save."""
+    if raw or not instance.pk:
+        instance._metricas_anteriores = None
+        return
+    instance._metricas_anteriores = MetricasTicketService.valores_en_bd([instance.pk]).get(instance.pk)
+
+
+@receiver(post_save, sender=Ticket)
+def actualizar_metricas_ticket(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = None if created else getattr(instance, '_metricas_anteriores', None)
+    nuevo = MetricasTicketService.valores_ticket(instance)
+    MetricasTicketService.aplicar_cambio(anterior, nuevo)
+    # Asignación, resolución y calificación mueven el rendimiento del agente
+    RendimientoAgenteService.aplicar_cambio(anterior, nuevo)
+
+
+@receiver(post_delete, sender=Ticket)
+def descontar_metricas_ticket(sender, instance, **kwargs):
+    anterior = MetricasTicketService.valores_ticket(instance)
+    MetricasTicketService.aplicar_cambio(anterior, None)
+    RendimientoAgenteService.aplicar_cambio(anterior, None)
+
+
+# =====================================================
+# ⏱️ SLA: MARCAR TICKETS PARA REEVALUAR
+# =====================================================
+@receiver(post_save, sender=Ticket)
+def marcar_revision_sla(sender, instance, created, raw=False, **kwargs):
+    """
+    Un ticket nuevo, o que cambia de estado o categoría, se reevalúa en la
+    próxima pasada del motor de SLA. Se usa update() para que funcione también
+    con save(update_fields=...).
+    """
+    if raw:
+        return
+    anterior = None if created else getattr(instance, '_metricas_anteriores', None)
+    ahora = timezone.now()
+    cambios = {}
+    cambio_categoria = anterior is not None and anterior['categoria_principal_id'] != instance.categoria_principal_id
+    if anterior is None or anterior['estado'] != instance.estado or cambio_categoria:
+        cambios['sla_revision'] = ahora
+    if cambio_categoria:
+        # Fechas límite recalculadas en pre_save (también si se guardó con update_fields)
+        cambios['fecha_limite_respuesta'] = instance.fecha_limite_respuesta
+        cambios['fecha_limite_resolucion'] = instance.fecha_limite_resolucion
+    if instance.fecha_primera_respuesta is None and instance.estado in ('En Proceso', 'Resuelto', 'Cerrado'):
+        cambios['fecha_primera_respuesta'] = ahora
+    if cambios:
+        Ticket.objects.filter(pk=instance.pk).update(**cambios)
+        for campo, valor in cambios.items():
+            setattr(instance, campo, valor)
+
+
+@receiver(post_save, sender=SLA)
+@receiver(post_delete, sender=SLA)
+def reevaluar_tickets_abiertos(sender, raw=False, **kwargs):
+    """
+    Cambió la tabla de SLA: recalcular la fecha límite de respuesta y
+    reevaluar todos los tickets abiertos.
+    """
+    if raw:
+        return
+    transaction.on_commit(CalendarioService.recalcular_tickets_abiertos)
+
+
+@receiver(post_save, sender=HorarioLaboral)
+@receiver(post_delete, sender=HorarioLaboral)
+@receiver(post_save, sender=DiaFeriado)
+@receiver(post_delete, sender=DiaFeriado)
+def calendario_modificado(sender, raw=False, **kwargs):
+    """Cambió el calendario laboral: las fechas límite de los abiertos se recalculan."""
+    if raw:
+        return
+    CalendarioService.calendario_modificado()
+
+
+@receiver(post_save, sender=ConfiguracionSistema)
+def configuracion_modificada(sender, raw=False, **kwargs):
+    if raw:
+        return
+    CalendarioService.invalidar()
+
+
+# =====================================================
+# 🔎 CATÁLOGOS DEL COMPILADOR DE FILTROS
+# =====================================================
+@receiver(post_save, sender=Priority)
+@receiver(post_delete, sender=Priority)
+@receiver(post_save, sender=CategoriaPrincipal)
+@receiver(post_delete, sender=CategoriaPrincipal)
+def invalidar_catalogos_filtros(sender, raw=False, **kwargs):
+    """Prioridades / categorías cacheadas por el compilador de filtros."""
+    if raw:
+        return
+    FiltroTicketsService.invalidar()
+
+
+# =====================================================
+# 🏷️ VERSIONES PARA PETICIONES CONDICIONALES (ETag)
+# =====================================================
+TABLAS_VERSIONADAS = {
+    Ticket: 'tickets',
+    TicketAssignment: 'asignaciones',
+    CategoriaPrincipal: 'categorias',
+    Subcategoria: 'categorias',
+    Priority: 'prioridades',
+    User: 'usuarios',
+    Rol: 'roles',
+}
+
+
+def cambiar_version_tabla(sender, raw=False, **kwargs):
+    if raw:
+        return
+    # Tras el commit: un ETag nuevo no debe quedar asociado a datos sin confirmar
+    transaction.on_commit(lambda: VersionTablas.invalidar(TABLAS_VERSIONADAS[sender]))
+
+
+for modelo in TABLAS_VERSIONADAS:
+    post_save.connect(cambiar_version_tabla, sender=modelo, dispatch_uid=f"version_tabla_guardar_{modelo.__name__}")
+    post_delete.connect(cambiar_version_tabla, sender=modelo, dispatch_uid=f"version_tabla_borrar_{modelo.__name__}")
+
+
+# =====================================================
+# 🗄️ INVALIDACIÓN DE LA CACHÉ DEL DASHBOARD
+# =====================================================
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+@receiver(post_save, sender=TicketAssignment)
+@receiver(post_delete, sender=TicketAssignment)
+@receiver(post_save, sender=AgentPerformance)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidar_cache_dashboard(sender, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields and set(update_fields) == {'last_login'}):
+        return
+    # Tras el commit: un recálculo concurrente no debe leer datos sin confirmar
+    transaction.on_commit(DashboardCache.invalidar)
@@ -1,192 +1,162 @@
 # adminpanel/sla_notifications.py
-
-from django.utils import timezone
 from django.db import transaction
-from django.db.models import Prefetch
+from django.utils import timezone
 
 from tickets.models import Ticket, TicketHistory
 from users.models import User
-from notifications.utils import send_notification
-from .views_sla import SLA_CONFIG  # Diccionario de SLA por categoría
+from notifications.utils import send_bulk_notification
+from .calendario import CalendarioService
+from .models import SLA
 
+# Proporción del tiempo de resolución a partir de la cual el ticket está en riesgo
+UMBRAL_RIESGO = 0.75
+ESTADOS_CERRADOS = ('Resuelto', 'Cerrado')
+# Estados que cuentan como primera respuesta del agente
+ESTADOS_RESPONDIDOS = ('En Proceso', 'Resuelto', 'Cerrado')
+NIVEL_SLA = {Ticket.SLA_OK: 0, Ticket.SLA_RIESGO: 1, Ticket.SLA_INCUMPLIDO: 2}
+LOTE = 500
 
-def verificar_sla_y_enviar_notificaciones():
-    """
-    Recorre todos los tickets, evalúa SLA (FRT + MTTR)
-    y envía notificaciones a admins, agentes y usuarios.
-    
-    Recomendado ejecutar cada 5–10 minutos:
-    - Cron
-    - Celery Beat
-    - Management command
-    """
-
-    ahora = timezone.now()
 
-    # Prefetch optimizado para evitar 2000 queries
-    tickets = Ticket.objects.select_related(
-        "categoria_principal",
-        "agente",
-        "solicitante"
-    ).prefetch_related(
-        Prefetch("historial", queryset=TicketHistory.objects.order_by("fecha"))
-    )
+def slas_por_categoria():
+    """SLA activos indexados por nombre (el SLA aplica a la categoría del mismo nombre)."""
+    return {sla.nombre.strip().lower(): sla for sla in SLA.objects.filter(activo=True)}
 
-    admins = list(User.objects.filter(rol__tipo_base="admin"))
 
-    contador_riesgo = 0
-    contador_incumplidos = 0
+def evaluar_sla(ticket, sla, ahora, area_id=None):
+    """
+    Evalúa FRT (primera respuesta) y MTTR (resolución) de un ticket, en horas
+    laborables del calendario del área (adminpanel/calendario.py).
+    Devuelve (estado, próxima revisión o None, detalle).
+    """
+    creacion = ticket.fecha_creacion
+    limite_respuesta = ticket.fecha_limite_respuesta or \
+        CalendarioService.sumar_horas(creacion, sla.tiempo_respuesta_horas, area_id)
+    limite_resolucion = CalendarioService.sumar_horas(creacion, sla.tiempo_resolucion_horas, area_id)
+    inicio_riesgo = CalendarioService.sumar_horas(creacion, sla.tiempo_resolucion_horas * UMBRAL_RIESGO, area_id)
+
+    resuelto = ticket.estado in ESTADOS_CERRADOS
+    fin = (ticket.fecha_cierre or ticket.fecha_actualizacion or ahora) if resuelto else None
+    respuesta = ticket.fecha_primera_respuesta or fin
+    if respuesta is None and ticket.estado in ESTADOS_RESPONDIDOS:
+        # Respondido sin fecha registrada (datos anteriores al motor SLA)
+        respuesta = ticket.fecha_actualizacion or creacion
+
+    frt_breach = (respuesta or ahora) > limite_respuesta
+    mttr_breach = (fin or ahora) > limite_resolucion
+
+    if frt_breach or mttr_breach:
+        detalle = "El ticket ha incumplido el SLA definido."
+        if frt_breach:
+            frt_min = CalendarioService.transcurrido(creacion, respuesta or ahora, area_id).total_seconds() / 60
+            detalle += f" FRT={frt_min:.2f} min (límite {sla.tiempo_respuesta_horas * 60} min)."
+        if mttr_breach:
+            mttr_horas = CalendarioService.transcurrido(creacion, fin or ahora, area_id).total_seconds() / 3600
+            detalle += f" MTTR={mttr_horas:.2f} h (límite {sla.tiempo_resolucion_horas} h)."
+        # Ya no puede empeorar: no hace falta volver a revisarlo
+        return Ticket.SLA_INCUMPLIDO, None, detalle
+
+    if resuelto:
+        return Ticket.SLA_OK, None, ""
+
+    # Próximo umbral que el ticket todavía no ha cruzado
+    umbrales = [inicio_riesgo, limite_resolucion]
+    if not respuesta:
+        umbrales.append(limite_respuesta)
+    revision = min(t for t in umbrales if t > ahora)
+
+    if ahora >= inicio_riesgo:
+        return Ticket.SLA_RIESGO, revision, "El ticket está en riesgo de incumplir el SLA."
+    return Ticket.SLA_OK, revision, ""
+
+
+def verificar_sla_y_enviar_notificaciones(ahora=None):
+    """
+    Evalúa el SLA solo de los tickets cuya revisión está vencida
+    (índice parcial sobre Ticket.sla_revision) y notifica los cambios a
+    riesgo / incumplido. El estado queda guardado en el ticket, así que un
+    aviso se envía una sola vez (basta comparar la columna).
 
-    for t in tickets:
+    Ejecutado por Celery Beat cada 5 minutos (adminpanel.tasks.verificar_sla).
+    """
+    ahora = ahora or timezone.now()
+    slas = slas_por_categoria()
+
+    pendientes = Ticket.objects.filter(
+        sla_revision__isnull=False, sla_revision__lte=ahora
+    ).select_related('categoria_principal', 'solicitante').only(
+        'id', 'estado', 'fecha_creacion', 'fecha_actualizacion', 'fecha_cierre',
+        'fecha_primera_respuesta', 'fecha_limite_respuesta', 'sla_estado', 'sla_revision',
+        'agente_id', 'solicitante__area', 'categoria_principal__nombre',
+    ).order_by('sla_revision')
+
+    actualizados = []
+    avisos = []
+    for t in pendientes.iterator(chunk_size=LOTE):
         categoria = t.categoria_principal
-
-        # Verificar si esta categoría tiene configuración SLA
-        sla = SLA_CONFIG.get(categoria.nombre)
-
+        sla = slas.get(categoria.nombre.strip().lower()) if categoria else None
         if not sla:
-            continue  # No existe SLA para esta categoría
-        
-        # =====================================================
-        # 1️⃣ TIEMPO DE PRIMERA RESPUESTA (FRT)
-        # =====================================================
-        primer_historial = None
-
-        for h in t.historial.all():
-            if "Proceso" in h.accion:
-                primer_historial = h
-                break
-
-        if primer_historial:
-            frt_min = (primer_historial.fecha - t.fecha_creacion).total_seconds() / 60
-        else:
-            frt_min = None  # Aún sin respuesta
+            # Sin SLA para la categoría: se vuelve a evaluar si cambia la categoría o la tabla SLA
+            t.sla_revision = None
+            actualizados.append(t)
+            continue
+
+        area_id = t.solicitante.area_id if t.solicitante else None
+        estado, revision, detalle = evaluar_sla(t, sla, ahora, area_id)
+        t.sla_revision = revision
+        if NIVEL_SLA[estado] > NIVEL_SLA[t.sla_estado]:
+            t.sla_estado = estado
+            avisos.append((t, categoria.nombre, detalle))
+        actualizados.append(t)
+
+    admin_ids = list(User.objects.filter(rol__tipo_base="admin").values_list('id', flat=True))
+
+    with transaction.atomic():
+        Ticket.objects.bulk_update(actualizados, ['sla_estado', 'sla_revision'], batch_size=LOTE)
+        TicketHistory.objects.bulk_create([
+            TicketHistory(
+                ticket_id=t.id,
+                usuario=None,
+                accion="SLA Incumplido" if t.sla_estado == Ticket.SLA_INCUMPLIDO else "SLA en Riesgo",
+                descripcion=detalle if t.sla_estado == Ticket.SLA_INCUMPLIDO
+                else f"{detalle} Categoría: {categoria}.",
+            )
+            for t, categoria, detalle in avisos
+        ], batch_size=LOTE)
+        transaction.on_commit(lambda: _notificar(avisos, admin_ids))
+
+    incumplidos = sum(1 for t, _, _ in avisos if t.sla_estado == Ticket.SLA_INCUMPLIDO)
+    return {
+        "evaluados": len(actualizados),
+        "riesgo_notificados": len(avisos) - incumplidos,
+        "incumplidos_notificados": incumplidos,
+    }
 
-        # =====================================================
-        # 2️⃣ TIEMPO DE RESOLUCIÓN (MTTR)
-        # =====================================================
-        if t.estado == "Resuelto" and t.fecha_actualizacion:
-            mttr_horas = (t.fecha_actualizacion - t.fecha_creacion).total_seconds() / 3600
-        else:
-            mttr_horas = None
-
-        # =====================================================
-        # 3️⃣ DETECTAR INCUMPLIMIENTO (BREACH)
-        # =====================================================
-        frt_breach = frt_min is not None and frt_min > sla["respuesta_min"]
-        mttr_breach = mttr_horas is not None and mttr_horas > sla["resolucion_horas"]
-
-        hay_brecha = frt_breach or mttr_breach
-
-        # =====================================================
-        # 4️⃣ DETECTAR RIESGO (75% del tiempo SLA)
-        # =====================================================
-        en_riesgo = False
-
-        if not hay_brecha and t.estado != "Resuelto":
-            horas_transcurridas = (ahora - t.fecha_creacion).total_seconds() / 3600
-            limite_75 = sla["resolucion_horas"] * 0.75
-
-            if horas_transcurridas >= limite_75:
-                en_riesgo = True
-
-        # =====================================================
-        # 5️⃣ PROCESAR NOTIFICACIONES
-        # =====================================================
-
-        # -------------------------
-        # INCUMPLIMIENTO DEL SLA
-        # -------------------------
-        if hay_brecha:
-
-            # Evitar SPAM duplicado
-            if TicketHistory.objects.filter(
-                ticket=t,
-                accion__iexact="SLA Incumplido"
-            ).exists():
-                continue
-
-            detalle = "El ticket ha incumplido el SLA definido."
-
-            if frt_breach:
-                detalle += f" FRT={frt_min:.2f} min (límite {sla['respuesta_min']} min)."
-
-            if mttr_breach:
-                detalle += f" MTTR={mttr_horas:.2f} h (límite {sla['resolucion_horas']} h)."
-
-            with transaction.atomic():
-                TicketHistory.objects.create(
-                    ticket=t,
-                    usuario=None,
-                    accion="SLA Incumplido",
-                    descripcion=detalle
-                )
 
-                # Notificar a agente
-                if t.agente:
-                    send_notification(
-                        user_id=t.agente.id,
-                        message=f"⚠ El ticket #{t.id} ha INCUMPLIDO el SLA.",
-                        tipo="sla_incumplido"
-                    )
-
-                # Notificar al solicitante
-                if t.solicitante:
-                    send_notification(
-                        user_id=t.solicitante.id,
-                        message=f"Tu ticket #{t.id} ha superado el tiempo máximo de atención (SLA).",
-                        tipo="sla_incumplido"
-                    )
-
-                # Notificar a todos los admins
-                for admin in admins:
-                    send_notification(
-                        user_id=admin.id,
-                        message=f"🚨 Ticket #{t.id} ha INCUMPLIDO el SLA. Categoría: {categoria.nombre}.",
-                        tipo="sla_incumplido"
-                    )
-
-                contador_incumplidos += 1
-
-            continue  # no marcamos como riesgo si ya incumplió
-
-        # -------------------------
-        # SLA EN RIESGO
-        # -------------------------
-        if en_riesgo:
-
-            if TicketHistory.objects.filter(
-                ticket=t,
-                accion__iexact="SLA en Riesgo"
-            ).exists():
-                continue
-
-            with transaction.atomic():
-                TicketHistory.objects.create(
-                    ticket=t,
-                    usuario=None,
-                    accion="SLA en Riesgo",
-                    descripcion=f"El ticket está en riesgo de incumplir el SLA. Categoría: {categoria.nombre}."
+def _notificar(avisos, admin_ids):
+    """Un aviso por ticket: agente / solicitante y un único envío al grupo de admins."""
+    for t, categoria, _ in avisos:
+        if t.sla_estado == Ticket.SLA_INCUMPLIDO:
+            tipo = "sla_incumplido"
+            if t.agente_id:
+                send_bulk_notification(
+                    [t.agente_id], f"⚠ El ticket #{t.id} ha INCUMPLIDO el SLA.", tipo, t.id
                 )
-
-                # Notificar al agente
-                if t.agente:
-                    send_notification(
-                        user_id=t.agente.id,
-                        message=f"⏰ El ticket #{t.id} está en RIESGO de incumplir el SLA.",
-                        tipo="sla_riesgo"
-                    )
-
-                # Notificar a admins
-                for admin in admins:
-                    send_notification(
-                        user_id=admin.id,
-                        message=f"⏰ Ticket #{t.id} está en riesgo de incumplir el SLA.",
-                        tipo="sla_riesgo"
-                    )
-
-                contador_riesgo += 1
-
-    return {
-        "riesgo_notificados": contador_riesgo,
-        "incumplidos_notificados": contador_incumplidos,
-    }
+            if t.solicitante_id:
+                send_bulk_notification(
+                    [t.solicitante_id],
+                    f"Tu ticket #{t.id} ha superado el tiempo máximo de atención (SLA).", tipo, t.id
+                )
+            send_bulk_notification(
+                admin_ids, f"🚨 Ticket #{t.id} ha INCUMPLIDO el SLA. Categoría: {categoria}.",
+                tipo, t.id, group="rol_admin"
+            )
+        else:
+            tipo = "sla_riesgo"
+            if t.agente_id:
+                send_bulk_notification(
+                    [t.agente_id], f"⏰ El ticket #{t.id} está en RIESGO de incumplir el SLA.", tipo, t.id
+                )
+            send_bulk_notification(
+                admin_ids, f"⏰ Ticket #{t.id} está en riesgo de incumplir el SLA.",
+                tipo, t.id, group="rol_admin"
+            )
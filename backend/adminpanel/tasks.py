@@ -0,0 +1,102 @@
+# adminpanel/tasks.py
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconciliar_metricas_tickets(dias=None):
+    """
+    Reconstruye los rollups de tickets de los últimos `dias` días
+    (por defecto METRICAS_RECONCILIACION_DIAS) para corregir cualquier
+    desvío del mantenimiento incremental.
+    """
+    from adminpanel.metricas import MetricasTicketService
+
+    if dias is None:
+        dias = settings.METRICAS_RECONCILIACION_DIAS
+    desde = timezone.localdate() - timedelta(days=dias)
+    filas = MetricasTicketService.reconstruir(desde=desde)
+    resultado = f"📊 Métricas de tickets reconciliadas desde {desde}: {filas} filas"
+    print(resultado)
+    return resultado
+
+
+@shared_task
+def reconstruir_metricas_tickets():
+    """
+    Reconstruye todos los rollups de tickets. Corrige los desvíos en tickets
+    antiguos (cambios fuera de la ventana de la reconciliación nocturna).
+    """
+    from adminpanel.metricas import MetricasTicketService
+
+    filas = MetricasTicketService.reconstruir()
+    resultado = f"📊 Métricas de tickets reconstruidas por completo: {filas} filas"
+    print(resultado)
+    return resultado
+
+
+@shared_task
+def reconciliar_rendimiento_agentes():
+    """Recalcula los contadores de AgentPerformance desde los tickets (corrige desvíos)."""
+    from adminpanel.rendimiento import RendimientoAgenteService
+
+    registros = RendimientoAgenteService.reconstruir()
+    resultado = f"📈 Rendimiento de agentes reconciliado: {registros} agentes"
+    print(resultado)
+    return resultado
+
+
+@shared_task
+def verificar_sla():
+    """Evalúa el SLA de los tickets con revisión vencida y envía los avisos."""
+    from adminpanel.sla_notifications import verificar_sla_y_enviar_notificaciones
+
+    resultado = verificar_sla_y_enviar_notificaciones()
+    print(f"⏱️ SLA verificado: {resultado}")
+    return resultado
+
+
+@shared_task
+def generar_reporte(job_id):
+    """Genera el archivo de un ReporteJob en media/reportes."""
+    from adminpanel.models import ReporteJob
+    from adminpanel.reportes import ReporteService
+
+    job = ReporteJob.objects.filter(id=job_id).first()
+    if not job:
+        return f"Reporte {job_id} no existe"
+    generado = ReporteService.ejecutar(job)
+    return f"Reporte {job_id}: {'completado' if generado else 'error'}"
+
+
+
+@shared_task
+def limpiar_reportes_antiguos():
+    """Borra los reportes generados (jobs y archivos de media/reportes) ya vencidos."""
+    from adminpanel.reportes import ReporteService
+
+    jobs, archivos = ReporteService.limpiar_antiguos()
+    resultado = f"🧹 Reportes antiguos eliminados: {jobs} jobs, {archivos} archivos"
+    print(resultado)
+    return resultado
+
+def encolar_reporte(job_id):
+    """
+    Encola la generación al confirmar la transacción.
+    Si Celery no está disponible, se genera en el mismo proceso.
+    """
+    def _encolar():
+        try:
+            generar_reporte.delay(str(job_id))
+        except Exception as e:
+            logger.warning(f"Celery no disponible, generando reporte en línea: {e}")
+            generar_reporte(str(job_id))
+
+    transaction.on_commit(_encolar)
@@ -1,6 +1,13 @@
-from django.test import TestCase
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from users.models import User
 from adminpanel.services import UserValidationService
+from adminpanel.metricas import MetricasTicketService
+from adminpanel.dashboard_cache import DashboardCache
 
 class UserValidationServiceTest(TestCase):
     
@@ -35,3 +42,570 @@ class UserValidationServiceTest(TestCase):
         suggestions = UserValidationService.get_suggested_username('testuser')
         self.assertEqual(len(suggestions), 5)
         self.assertTrue(all(sug.startswith('testuser') for sug in suggestions))
+
+
+class MetricasDashboardTest(TestCase):
+    """Los rollups deben dar el mismo dashboard que el cálculo en vivo."""
+
+    def setUp(self):
+        from datetime import timedelta
+        from tickets.models import CategoriaPrincipal, Ticket
+        from users.models import Rol
+
+        rol = Rol.objects.create(nombre_clave="agente_test", nombre_visible="Agente", tipo_base="agente")
+        self.agente = User.objects.create_user(username='agente1', password='123', rol=rol)
+        self.otro_agente = User.objects.create_user(username='agente2', password='123', rol=rol)
+        solicitante = User.objects.create_user(username='sol1', password='123')
+        categoria = CategoriaPrincipal.objects.create(nombre="Nómina")
+
+        ahora = timezone.now()
+        datos = [
+            # (hace, estado, prioridad, rating, agente, categoria)
+            (timedelta(minutes=5), 'Abierto', 'Alta', None, self.agente, categoria),
+            (timedelta(days=1, hours=3), 'Resuelto', 'Media', 4, self.agente, categoria),
+            (timedelta(days=3), 'En Proceso', 'Baja', None, self.otro_agente, None),
+            (timedelta(days=6, hours=20), 'Resuelto', 'Alta', 2, self.otro_agente, categoria),
+            (timedelta(days=40), 'Resuelto', '', 5, None, None),
+        ]
+        # bulk_create: sin señales de notificación/chat; los rollups se reconstruyen abajo
+        tickets = Ticket.objects.bulk_create([
+            Ticket(titulo=f"T{i}", descripcion="...", solicitante=solicitante,
+                   estado=estado, prioridad=prioridad, rating=rating,
+                   agente=agente, categoria_principal=cat)
+            for i, (_, estado, prioridad, rating, agente, cat) in enumerate(datos)
+        ])
+        for ticket, (hace, estado, *_) in zip(tickets, datos):
+            Ticket.objects.filter(id=ticket.id).update(
+                fecha_creacion=ahora - hace,
+                fecha_cierre=ahora - hace + timedelta(hours=2) if estado == 'Resuelto' else None,
+            )
+
+        MetricasTicketService.reconstruir()
+
+    def dashboard(self, **params):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+        from adminpanel.views.admin_views import AdminDashboardView
+
+        request = Request(APIRequestFactory().get('/', params))
+        return (
+            AdminDashboardView.get_dashboard_data(request),
+            AdminDashboardView.get_dashboard_data_en_vivo(request),
+        )
+
+    def test_rollups_coinciden_con_consulta_en_vivo(self):
+        for rango in ('total', 'dia', 'semana', 'mes', 'anio', '7dias', '30dias'):
+            with self.subTest(rango=rango):
+                rollup, en_vivo = self.dashboard(rango=rango)
+                self.assertEqual(rollup, en_vivo)
+
+        rollup, en_vivo = self.dashboard(rango='7dias', agente=self.otro_agente.id)
+        self.assertEqual(rollup, en_vivo)
+
+    def test_update_masivo_mantiene_los_rollups(self):
+        from tickets.models import Ticket
+
+        MetricasTicketService.update_masivo(
+            Ticket.objects.filter(agente=self.agente), agente=self.otro_agente
+        )
+        rollup, en_vivo = self.dashboard(rango='30dias')
+        self.assertEqual(rollup, en_vivo)
+        self.assertEqual(rollup["rating_por_agente"], {"agente2": 3.0})
+
+    def test_rendimiento_incremental_coincide_con_reconstruccion(self):
+        from tickets.models import Ticket
+        from adminpanel.models import AgentPerformance
+        from adminpanel.rendimiento import RendimientoAgenteService
+
+        campos = ('agente_id', 'tickets_asignados', 'tickets_resueltos', 'efectividad',
+                  'rating_promedio', 'tiempo_promedio_resolucion')
+        rendimiento = lambda: list(AgentPerformance.objects.order_by('agente_id').values_list(*campos))
+
+        RendimientoAgenteService.reconstruir()
+        # Reasignación, resolución y calificación
+        MetricasTicketService.update_masivo(
+            Ticket.objects.filter(agente=self.agente), agente=self.otro_agente
+        )
+        MetricasTicketService.update_masivo(
+            Ticket.objects.filter(estado='En Proceso'), estado='Resuelto', rating=5
+        )
+        incremental = rendimiento()
+
+        RendimientoAgenteService.reconstruir()
+        self.assertEqual(incremental, rendimiento())
+        self.assertIn((self.otro_agente.id, 4, 3, 75.0, 3.67, 2.0), incremental)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class DashboardCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.calculos = 0
+
+    def calcular(self):
+        self.calculos += 1
+        return {"total": self.calculos}
+
+    def obtener(self, **params):
+        return DashboardCache.obtener('prueba', params, ('rango', 'agente'), self.calcular)
+
+    def test_clave_normalizada_y_version(self):
+        self.assertEqual(self.obtener(rango='dia', agente=''), ({"total": 1}, "MISS"))
+        # Mismo conjunto de filtros (vacíos y campos ajenos se ignoran)
+        self.assertEqual(self.obtener(rango='dia', page='2'), ({"total": 1}, "HIT"))
+
+        DashboardCache.invalidar()
+        self.assertEqual(self.obtener(rango='dia'), ({"total": 2}, "MISS"))
+
+    def test_entrada_vencida_se_sirve_mientras_otro_recalcula(self):
+        self.obtener(rango='mes')
+        DashboardCache.invalidar()
+
+        # Simula un recálculo en curso en otro proceso
+        cache.add(f"{DashboardCache.clave('prueba', {'rango': 'mes'}, ('rango',))}:lock", 1)
+        self.assertEqual(self.obtener(rango='mes'), ({"total": 1}, "STALE"))
+        self.assertEqual(self.calculos, 1)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ReporteJobTest(TestCase):
+
+    def setUp(self):
+        import shutil
+        import tempfile
+        from rest_framework.test import APIClient
+        from users.models import Rol
+
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, True)
+        ajuste = override_settings(MEDIA_ROOT=media)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+        rol = Rol.objects.create(nombre_clave="admin_test", nombre_visible="Admin", tipo_base="admin")
+        self.admin = User.objects.create_user(username='admin1', password='123', rol=rol)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def solicitar(self):
+        from unittest import mock
+        from adminpanel.tasks import generar_reporte
+
+        # Sin broker en pruebas: ejecutar la tarea en el mismo proceso
+        with mock.patch.object(generar_reporte, 'delay', side_effect=generar_reporte), \
+                self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/admin/reportes/jobs/', {
+                'tipo': 'usuarios', 'formato': 'xlsx', 'page': '3',
+            }, format='json')
+
+    def test_job_genera_archivo_y_se_reutiliza(self):
+        response = self.solicitar()
+        self.assertEqual(response.status_code, 202)
+
+        estado = self.client.get(response.data['status_url']).data
+        self.assertEqual(estado['estado'], 'completado')
+        self.assertEqual(estado['progreso'], 100)
+
+        descarga = self.client.get(estado['download_url'])
+        self.assertEqual(descarga.status_code, 200)
+        self.assertTrue(b''.join(descarga.streaming_content).startswith(b'PK'))
+
+        # Mismos parámetros y sin cambios en los datos → mismo job
+        repetido = self.solicitar()
+        self.assertEqual(repetido.status_code, 200)
+        self.assertEqual(repetido.data['id'], response.data['id'])
+        self.assertTrue(repetido.data['reutilizado'])
+
+    def test_limpieza_borra_jobs_y_archivos_antiguos(self):
+        import os
+        from datetime import timedelta
+        from adminpanel.models import ReporteJob
+        from adminpanel.reportes import ReporteService
+
+        job = ReporteJob.objects.get(id=self.solicitar().data['id'])
+        ruta = ReporteService.ruta_absoluta(job)
+        huerfano = os.path.join(os.path.dirname(ruta), 'sincrono.pdf')
+        open(huerfano, 'wb').close()
+
+        self.assertEqual(ReporteService.limpiar_antiguos(), (0, 0))
+
+        vencido = (timezone.now() - timedelta(days=8)).timestamp()
+        os.utime(huerfano, (vencido, vencido))
+        ReporteJob.objects.filter(id=job.id).update(fecha_creacion=timezone.now() - timedelta(days=8))
+        self.assertEqual(ReporteService.limpiar_antiguos(), (1, 2))
+        self.assertFalse(ReporteJob.objects.exists())
+        self.assertFalse(os.path.exists(ruta) or os.path.exists(huerfano))
+
+
+class ExportacionTest(TestCase):
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+        from tickets.models import Ticket
+        from users.models import Rol
+
+        rol = Rol.objects.create(nombre_clave="admin_test", nombre_visible="Admin", tipo_base="admin")
+        admin = User.objects.create_user(username='admin1', password='123', rol=rol)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+        # bulk_create: sin señales de notificación/chat
+        self.tickets = Ticket.objects.bulk_create([
+            Ticket(titulo=f"Ticket {i}", descripcion="...", solicitante=admin,
+                   estado='Resuelto' if i % 2 else 'Abierto')
+            for i in range(5)
+        ])
+
+    def contenido(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_filtrado_y_reanudable(self):
+        lineas = self.contenido('/api/admin/exportar/tickets/?estado=Abierto').decode().splitlines()
+        self.assertEqual(lineas[0].split(',')[:3], ['id', 'titulo', 'estado'])
+        self.assertEqual(len(lineas), 1 + 3)
+
+        # Reanudar después del segundo ticket
+        desde = self.tickets[1].id
+        lineas = self.contenido(f'/api/admin/exportar/tickets/?desde_id={desde}').decode().splitlines()
+        self.assertEqual([int(l.split(',')[0]) for l in lineas[1:]], [t.id for t in self.tickets[2:]])
+
+    def test_ndjson_comprimido(self):
+        import gzip
+        import json
+
+        datos = self.contenido('/api/admin/exportar/tickets/?formato=ndjson&comprimir=1&limite=2')
+        filas = [json.loads(l) for l in gzip.decompress(datos).decode().splitlines()]
+        self.assertEqual([f['id'] for f in filas], [t.id for t in self.tickets[:2]])
+
+    def test_notificaciones_filtradas_por_username(self):
+        from notifications.models import Notification
+
+        admin = User.objects.get(username='admin1')
+        Notification.objects.create(usuario=admin, mensaje="Hola")
+        lineas = self.contenido('/api/admin/exportar/notificaciones/?usuario=admin1').decode().splitlines()
+        self.assertEqual(len(lineas), 1 + 1)
+        lineas = self.contenido('/api/admin/exportar/notificaciones/?usuario=otro').decode().splitlines()
+        self.assertEqual(len(lineas), 1)
+
+    async def test_streaming_incremental_bajo_asgi(self):
+        from unittest import mock
+        from rest_framework_simplejwt.tokens import AccessToken
+        from adminpanel.exportaciones import ExportacionService
+
+        original = ExportacionService.lineas
+        eventos = []
+
+        def lineas(*args):
+            for bloque in original(*args):
+                eventos.append('generado')
+                yield bloque
+            eventos.append('fin')
+
+        admin = await User.objects.aget(username='admin1')
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(admin)}'}
+        with mock.patch('adminpanel.exportaciones.LINEAS_POR_BLOQUE', 1), \
+                mock.patch.object(ExportacionService, 'lineas', lineas):
+            response = await self.async_client.get('/api/admin/exportar/tickets/', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+
+            bloques = aiter(response.streaming_content)
+            primero = await anext(bloques)
+            # El encabezado llega antes de que se generen las filas
+            self.assertTrue(primero.startswith(b'id,titulo'))
+            self.assertNotIn('fin', eventos)
+            resto = [bloque async for bloque in bloques]
+        self.assertEqual(len(resto), len(self.tickets))
+        self.assertEqual(eventos[-1], 'fin')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class MetricasCategoriasTest(TestCase):
+
+    def setUp(self):
+        from datetime import timedelta
+        from rest_framework.test import APIClient
+        from tickets.models import CategoriaPrincipal, Ticket
+        from users.models import Rol
+
+        cache.clear()
+        rol = Rol.objects.create(nombre_clave="admin_test", nombre_visible="Admin", tipo_base="admin")
+        admin = User.objects.create_user(username='admin1', password='123', rol=rol)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+        self.nomina = CategoriaPrincipal.objects.create(nombre="Nómina")
+        CategoriaPrincipal.objects.create(nombre="Vacaciones")
+        ahora = timezone.now()
+        Ticket.objects.bulk_create([
+            Ticket(titulo="T1", descripcion="...", solicitante=admin, categoria_principal=self.nomina,
+                   estado='Resuelto', rating=4, fecha_cierre=ahora + timedelta(hours=2)),
+            Ticket(titulo="T2", descripcion="...", solicitante=admin, categoria_principal=self.nomina,
+                   estado='Abierto'),
+        ])
+        Ticket.objects.update(fecha_creacion=ahora)
+
+    def test_metricas_en_una_consulta(self):
+        from adminpanel.reportes import ReporteService
+
+        with self.assertNumQueries(1):
+            categorias = ReporteService.metricas_categorias()
+
+        nomina, vacaciones = categorias
+        self.assertEqual(
+            (nomina['total_tickets'], nomina['tickets_abiertos'], nomina['tickets_resueltos']), (2, 1, 1)
+        )
+        self.assertEqual(nomina['rating_promedio'], 4)
+        self.assertEqual(nomina['tiempo_promedio_resolucion_horas'], 2)
+        self.assertEqual(vacaciones['total_tickets'], 0)
+
+    def test_endpoint_json(self):
+        response = self.client.get(f'/api/admin/reportes/categorias/metricas/?categoria={self.nomina.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c['nombre'] for c in response.data['categorias']], ['Nómina'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SeriesTemporalTest(TestCase):
+
+    def setUp(self):
+        from datetime import timedelta
+        from rest_framework.test import APIClient
+        from tickets.models import CategoriaPrincipal, Ticket
+        from users.models import Rol
+
+        cache.clear()
+        rol = Rol.objects.create(nombre_clave="admin_test", nombre_visible="Admin", tipo_base="admin")
+        admin = User.objects.create_user(username='admin1', password='123', rol=rol)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+        categoria = CategoriaPrincipal.objects.create(nombre="Nómina")
+        ayer = timezone.localtime().replace(hour=10, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        # bulk_create: sin señales de notificación/chat
+        tickets = Ticket.objects.bulk_create([
+            Ticket(titulo=f"T{horas}", descripcion="...", solicitante=admin, categoria_principal=categoria)
+            for horas in (1, 2, 3, 10)
+        ])
+        for ticket, horas in zip(tickets, (1, 2, 3, 10)):
+            Ticket.objects.filter(id=ticket.id).update(
+                fecha_creacion=ayer, fecha_cierre=ayer + timedelta(hours=horas)
+            )
+        self.ayer = ayer
+
+    @skipUnless(connection.vendor == 'postgresql', "percentile_cont solo existe en PostgreSQL")
+    def test_series_por_dia_y_categoria(self):
+        response = self.client.get('/api/admin/dashboard/series/?intervalo=dia&agrupar=categoria')
+        self.assertEqual(response.status_code, 200)
+
+        serie, = response.data['series']
+        self.assertEqual(serie['grupo'], 'Nómina')
+        self.assertEqual(len(serie['puntos']), len(response.data['periodos']))
+
+        punto = next(p for p in serie['puntos'] if p['periodo'].startswith(self.ayer.date().isoformat()))
+        self.assertEqual((punto['creados'], punto['resueltos']), (4, 4))
+        self.assertEqual((punto['p50'], punto['p90']), (2.5, 7.9))
+
+    def test_parametros_invalidos(self):
+        response = self.client.get('/api/admin/dashboard/series/?intervalo=hora&desde=2020-01-01')
+        self.assertEqual(response.status_code, 400)
+
+
+class SLAEngineTest(TestCase):
+
+    def setUp(self):
+        from datetime import timedelta
+        from adminpanel.models import SLA
+        from tickets.models import CategoriaPrincipal, Ticket
+        from users.models import Rol
+
+        rol_admin = Rol.objects.create(nombre_clave="admin_test", nombre_visible="Admin", tipo_base="admin")
+        rol_agente = Rol.objects.create(nombre_clave="agente_test", nombre_visible="Agente", tipo_base="agente")
+        self.admins = [
+            User.objects.create_user(username=f'admin{i}', password='123', rol=rol_admin) for i in range(3)
+        ]
+        agente = User.objects.create_user(username='agente1', password='123', rol=rol_agente)
+        solicitante = User.objects.create_user(username='sol1', password='123')
+        nomina = CategoriaPrincipal.objects.create(nombre="Nómina")
+        sin_sla = CategoriaPrincipal.objects.create(nombre="Otros")
+        SLA.objects.create(nombre="nómina", tiempo_respuesta_horas=2, tiempo_resolucion_horas=8)
+
+        self.ahora = timezone.now()
+        datos = [
+            # (hace, estado, categoria)
+            (timedelta(hours=1), 'Abierto', nomina),       # ok
+            (timedelta(hours=7), 'En Proceso', nomina),    # riesgo (≥ 75 % de 8 h)
+            (timedelta(hours=10), 'En Proceso', nomina),   # incumplido
+            (timedelta(hours=10), 'En Proceso', sin_sla),  # sin SLA
+        ]
+        # bulk_create: sin señales de notificación/chat
+        self.tickets = Ticket.objects.bulk_create([
+            Ticket(titulo=f"T{i}", descripcion="...", solicitante=solicitante, agente=agente,
+                   estado=estado, categoria_principal=categoria)
+            for i, (_, estado, categoria) in enumerate(datos)
+        ])
+        for ticket, (hace, *_) in zip(self.tickets, datos):
+            Ticket.objects.filter(id=ticket.id).update(
+                fecha_creacion=self.ahora - hace,
+                fecha_primera_respuesta=self.ahora - hace + timedelta(minutes=30),
+                sla_revision=self.ahora,
+            )
+
+    def test_estado_guardado_y_avisos_sin_repetir(self):
+        from datetime import timedelta
+        from notifications.models import Notification
+        from tickets.models import Ticket
+        from adminpanel.sla_notifications import verificar_sla_y_enviar_notificaciones
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resultado = verificar_sla_y_enviar_notificaciones(self.ahora)
+        self.assertEqual(resultado, {"evaluados": 4, "riesgo_notificados": 1, "incumplidos_notificados": 1})
+
+        estados = dict(Ticket.objects.values_list('id', 'sla_estado'))
+        self.assertEqual([estados[t.id] for t in self.tickets], ['ok', 'riesgo', 'incumplido', 'ok'])
+
+        # Riesgo: agente + 3 admins; incumplido: agente + solicitante + 3 admins
+        self.assertEqual(Notification.objects.count(), 9)
+
+        # Solo siguen pendientes los que todavía pueden cambiar, en su próximo umbral
+        revisiones = dict(Ticket.objects.values_list('id', 'sla_revision'))
+        self.assertEqual(revisiones[self.tickets[0].id], self.ahora + timedelta(hours=5))
+        self.assertIsNone(revisiones[self.tickets[2].id])
+        self.assertIsNone(revisiones[self.tickets[3].id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resultado = verificar_sla_y_enviar_notificaciones(self.ahora)
+        self.assertEqual(resultado["evaluados"], 0)
+        self.assertEqual(Notification.objects.count(), 9)
+
+
+    def test_en_proceso_sin_fecha_de_respuesta_no_incumple_frt(self):
+        from datetime import timedelta
+        from adminpanel.models import SLA
+        from adminpanel.sla_notifications import evaluar_sla
+        from tickets.models import Ticket
+
+        ticket = self.tickets[1]
+        Ticket.objects.filter(id=ticket.id).update(
+            fecha_creacion=self.ahora - timedelta(hours=3),
+            fecha_actualizacion=self.ahora - timedelta(hours=2),
+            fecha_primera_respuesta=None,
+            fecha_limite_respuesta=None,
+        )
+        ticket.refresh_from_db()
+        estado, _, _ = evaluar_sla(ticket, SLA.objects.get(), self.ahora)
+        self.assertEqual(estado, Ticket.SLA_OK)
+
+
+class CalendarioLaboralTest(TestCase):
+
+    def setUp(self):
+        from datetime import time
+        from adminpanel.models import DiaFeriado, HorarioLaboral
+        from users.models import Area
+
+        cache.clear()
+        for dia in range(5):
+            HorarioLaboral.objects.create(dia_semana=dia, hora_inicio=time(8), hora_fin=time(12))
+            HorarioLaboral.objects.create(dia_semana=dia, hora_inicio=time(13), hora_fin=time(17))
+        self.planta = Area.objects.create(nombre="Planta")
+        for dia in range(6):
+            HorarioLaboral.objects.create(area=self.planta, dia_semana=dia, hora_inicio=time(7), hora_fin=time(15))
+        # Lunes 19/10/2026 feriado general
+        DiaFeriado.objects.create(fecha=timezone.datetime(2026, 10, 19).date(), nombre="Feriado")
+
+    def tearDown(self):
+        from adminpanel.calendario import CalendarioService
+        # Los horarios se deshacen con la transacción de la prueba; el calendario compilado no
+        CalendarioService.invalidar()
+
+    def local(self, *args):
+        return timezone.make_aware(timezone.datetime(*args))
+
+    def test_sumar_y_transcurrido_en_horas_laborables(self):
+        from adminpanel.calendario import CalendarioService
+
+        viernes = self.local(2026, 10, 16, 15, 0)
+        # 2 h el viernes, lunes feriado, 2 h el martes
+        self.assertEqual(CalendarioService.sumar_horas(viernes, 4), self.local(2026, 10, 20, 10, 0))
+        self.assertEqual(CalendarioService.sumar_horas(viernes, 2), self.local(2026, 10, 16, 17, 0))
+        self.assertEqual(
+            CalendarioService.transcurrido(viernes, self.local(2026, 10, 20, 12, 30)).total_seconds() / 3600, 6
+        )
+        self.assertFalse(CalendarioService.en_horario(self.local(2026, 10, 16, 12, 30)))
+        self.assertTrue(CalendarioService.en_horario(self.local(2026, 10, 16, 13, 0)))
+
+        # El área con horario propio trabaja el sábado
+        self.assertEqual(
+            CalendarioService.sumar_horas(viernes, 3, self.planta.id), self.local(2026, 10, 17, 10, 0)
+        )
+
+    def test_cambio_de_calendario_invalida(self):
+        from adminpanel.calendario import CalendarioService
+        from adminpanel.models import DiaFeriado
+
+        viernes = self.local(2026, 10, 16, 15, 0)
+        self.assertEqual(CalendarioService.sumar_horas(viernes, 4), self.local(2026, 10, 20, 10, 0))
+        DiaFeriado.objects.create(fecha=timezone.datetime(2026, 10, 20).date(), nombre="Puente")
+        self.assertEqual(CalendarioService.sumar_horas(viernes, 4), self.local(2026, 10, 21, 10, 0))
+
+    def test_version_se_lee_una_vez_por_lote(self):
+        from unittest import mock
+        from adminpanel.calendario import CalendarioService
+
+        viernes = self.local(2026, 10, 16, 15, 0)
+        CalendarioService.sumar_horas(viernes, 4)
+        with mock.patch('adminpanel.calendario.cache.get', wraps=cache.get) as lecturas:
+            for horas in range(50):
+                CalendarioService.sumar_horas(viernes, horas, self.planta.id if horas % 2 else None)
+        self.assertEqual(lecturas.call_count, 0)
+
+
+class FiltroTicketsTest(TestCase):
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+        from adminpanel.models import Priority
+        from tickets.models import CategoriaPrincipal, Ticket
+        from users.models import Rol
+
+        cache.clear()
+        rol = Rol.objects.create(nombre_clave="admin_test", nombre_visible="Admin", tipo_base="admin")
+        admin = User.objects.create_user(username='admin1', password='123', rol=rol)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+        self.alta, _ = Priority.objects.get_or_create(nombre="Alta", defaults={"nivel": 1})
+        self.categoria = CategoriaPrincipal.objects.create(nombre="Redes")
+        Ticket.objects.bulk_create([
+            Ticket(titulo="Uno", descripcion="...", solicitante=admin, prioridad="Alta",
+                   categoria_principal=self.categoria),
+            Ticket(titulo="Dos", descripcion="...", solicitante=admin, prioridad="Baja"),
+        ])
+
+    def test_especificacion_normalizada_y_catalogo_cacheado(self):
+        from adminpanel.filtros import FiltroTicketsService
+
+        por_id = FiltroTicketsService.compilar({'prioridad': str(self.alta.id), 'search': '  red  '})
+        with self.assertNumQueries(0):
+            por_nombre = FiltroTicketsService.compilar({'prioridad': 'Alta', 'search': 'red'})
+        self.assertEqual(por_id, por_nombre)
+        self.assertEqual(FiltroTicketsService.huella(por_id), FiltroTicketsService.huella(por_nombre))
+
+        self.assertEqual(FiltroTicketsService.compilar({'orden': '-dias_abierto'}), {'orden': 'fecha_creacion'})
+        for params in ({'orden': 'descripcion'}, {'estado': 'Otro'}, {'categoria': 'x'}, {'categoria': '999'}):
+            with self.assertRaises(ValueError):
+                FiltroTicketsService.compilar(params)
+
+    def test_lista_y_dashboard_usan_el_mismo_filtro(self):
+        response = self.client.get(f'/api/adminpanel/tickets/?prioridad={self.alta.id}')
+        self.assertEqual(response.status_code, 200)
+        resultados = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual([t['titulo'] for t in resultados], ["Uno"])
+
+        self.assertEqual(self.client.get('/api/adminpanel/tickets/?estado=Otro').status_code, 400)
+        self.assertEqual(self.client.get('/api/adminpanel/dashboard/?categoria=abc').status_code, 400)
@@ -13,6 +13,8 @@ from .views.config_views import (
     SLAViewSet,
     SystemLogViewSet,
     ConfiguracionSistemaView,
+    HorarioLaboralViewSet,
+    DiaFeriadoViewSet,
 )
 from .views.ticket_list_views import (
     AdminTicketViewSet,
@@ -23,8 +25,14 @@ from .views.report_views import (
     GenerarReporteTicketsView,
     GenerarReporteUsuariosView,
     GenerarReporteRendimientoView,
-    GenerarReporteCategoriasView
+    GenerarReporteCategoriasView,
+    MetricasCategoriasView,
+    ReporteJobListCreateView,
+    ReporteJobDetailView,
+    ReporteJobDownloadView,
 )
+from .views.export_views import ExportacionView
+from .views.series_views import SeriesTemporalView
 from .views.rotation_views import (
     RotacionProgramadaViewSet
 )
@@ -37,6 +45,8 @@ router.register(r'areas', AreaAdminViewSet, basename='admin-areas')
 router.register(r'categorias', CategoryAdminViewSet, basename='admin-category-list')
 router.register(r'prioridades', PriorityViewSet, basename='admin-prioridades')
 router.register(r'slas', SLAViewSet, basename='admin-slas')
+router.register(r'horarios', HorarioLaboralViewSet, basename='admin-horarios')
+router.register(r'feriados', DiaFeriadoViewSet, basename='admin-feriados')
 router.register(r'logs', SystemLogViewSet, basename='admin-logs')
 router.register(r'rotaciones', RotacionProgramadaViewSet, basename='admin-rotaciones')
 # Asegúrate de que esta línea apunte al AdminTicketViewSet de ticket_list_views.py
@@ -44,6 +54,7 @@ router.register(r'tickets', AdminTicketViewSet, basename='admin-tickets')
 
 urlpatterns = [
     path("dashboard/", AdminDashboardView.as_view(), name="admin-dashboard"),
+    path("dashboard/series/", SeriesTemporalView.as_view(), name="admin-dashboard-series"),
     path("filtros/tickets/", AdminTicketFilterOptionsView.as_view(), name="admin-ticket-filter-options"),
     
     path("configuracion/", ConfiguracionSistemaView.as_view(), name="admin-configuracion"),
@@ -52,5 +63,10 @@ urlpatterns = [
     path("reportes/usuarios/", GenerarReporteUsuariosView.as_view(), name="admin-reporte-usuarios"),
     path("reportes/rendimiento/", GenerarReporteRendimientoView.as_view(), name="admin-reporte-rendimiento"),
     path("reportes/categorias/", GenerarReporteCategoriasView.as_view(), name="admin-reporte-categorias"),
+    path("reportes/categorias/metricas/", MetricasCategoriasView.as_view(), name="admin-metricas-categorias"),
+    path("reportes/jobs/", ReporteJobListCreateView.as_view(), name="admin-reporte-jobs"),
+    path("reportes/jobs/<uuid:pk>/", ReporteJobDetailView.as_view(), name="admin-reporte-job"),
+    path("reportes/jobs/<uuid:pk>/descargar/", ReporteJobDownloadView.as_view(), name="admin-reporte-job-descargar"),
+    path("exportar/<str:recurso>/", ExportacionView.as_view(), name="admin-exportar"),
     path("", include(router.urls)),
 ]
\ No newline at end of file
@@ -8,14 +8,16 @@ from rest_framework import viewsets, status, serializers
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.http import HttpResponse
-from django.db.models import Count, Avg, Q, F, ExpressionWrapper, DurationField
+from django.db.models import Count, Avg, Q, F
 from datetime import timedelta
+from collections import defaultdict
 import openpyxl
 from openpyxl.styles import Font, PatternFill
 from datetime import datetime
 
 from users.models import User, Rol, Area
 from tickets.models import Ticket, CategoriaPrincipal
+from tickets.optimizacion import ConsultaOptimizadaMixin
 from ..models import Priority, AgentPerformance, Category, SystemLog
 from ..permissions import IsAdminRole
 from ..admin_serializers import (
@@ -26,21 +28,133 @@ from ..admin_serializers import (
 )
 from ..utils_filters import filtrar_tickets  # 👈 IMPORTAR FILTRO UNIVERSAL
 from ..services import UserValidationService  # 👈 Importar servicio de validación
+from ..metricas import MetricasTicketService, inicio_rango
+from ..dashboard_cache import DashboardCache
+from ..filtros import FiltroTicketsService
 
 class AdminDashboardView(APIView):
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def get(self, request):
-        data = self.get_dashboard_data(request)
-        serializer = AdminDashboardMetricsSerializer(data)
-        return Response(serializer.data)
+        # Clave de caché: rango + huella de los filtros ya normalizados
+        try:
+            espec = FiltroTicketsService.compilar(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        clave = {'rango': request.query_params.get('rango'), 'filtros': FiltroTicketsService.huella(espec)}
+        data, estado_cache = DashboardCache.obtener(
+            'admin_dashboard', clave, ('rango', 'filtros'),
+            lambda: dict(AdminDashboardMetricsSerializer(self.get_dashboard_data(request)).data)
+        )
+        return Response(data, headers={'X-Cache': estado_cache})
 
     @staticmethod
     def get_dashboard_data(request):
+        """
+        Métricas del dashboard. Se leen de los rollups pre-agregados
+        (MetricaTicketHora / MetricaTicketDia) salvo que haya búsqueda de texto,
+        que solo puede resolverse sobre la tabla de tickets.
+        """
+        filtros = MetricasTicketService.filtros_desde_request(request)
+        if filtros is None:
+            return AdminDashboardView.get_dashboard_data_en_vivo(request)
+
+        rango = request.query_params.get('rango', 'total')
+        inicio = inicio_rango(rango)
+        agregados, tickets_hoy = MetricasTicketService.agregados_por_dimension(filtros, inicio)
+
+        totales = dict.fromkeys(('total', 'rating_suma', 'rating_cantidad',
+                                 'resolucion_segundos', 'resolucion_cantidad'), 0)
+        por_estado = defaultdict(int)
+        por_prioridad = defaultdict(int)
+        por_categoria = defaultdict(int)
+        rating_categoria = defaultdict(lambda: [0, 0])
+        rating_agente = defaultdict(lambda: [0, 0])
+
+        for (categoria_id, agente_id, prioridad, estado), medidas in agregados.items():
+            if not medidas['total']:
+                continue
+            for campo in totales:
+                totales[campo] += medidas[campo]
+            por_estado[estado] += medidas['total']
+            por_prioridad[prioridad or "Sin Prioridad"] += medidas['total']
+            por_categoria[categoria_id] += medidas['total']
+            if medidas['rating_cantidad']:
+                if categoria_id:
+                    rating_categoria[categoria_id][0] += medidas['rating_suma']
+                    rating_categoria[categoria_id][1] += medidas['rating_cantidad']
+                if agente_id:
+                    rating_agente[agente_id][0] += medidas['rating_suma']
+                    rating_agente[agente_id][1] += medidas['rating_cantidad']
+
+        # Nombres: una consulta por catálogo
+        nombres_categoria = dict(CategoriaPrincipal.objects.filter(
+            id__in=[c for c in por_categoria if c]
+        ).values_list('id', 'nombre'))
+        nombres_agente = dict(User.objects.filter(
+            id__in=list(rating_agente)
+        ).values_list('id', 'username'))
+
+        def promedios(acumulado, nombres):
+            resultado = defaultdict(lambda: [0, 0])
+            for clave, (suma, cantidad) in acumulado.items():
+                if clave in nombres:
+                    resultado[nombres[clave]][0] += suma
+                    resultado[nombres[clave]][1] += cantidad
+            ordenados = sorted(
+                ((nombre, suma / cantidad) for nombre, (suma, cantidad) in resultado.items()),
+                key=lambda item: -item[1]
+            )
+            return {nombre: round(promedio, 2) for nombre, promedio in ordenados}
+
+        tickets_por_categoria = defaultdict(int)
+        for categoria_id, total in por_categoria.items():
+            tickets_por_categoria[nombres_categoria.get(categoria_id) or "Sin Categoría"] += total
+
+        # Atrasados depende de la hora actual: consulta en vivo sobre los abiertos
+        abiertos = AdminDashboardView.get_tickets_in_range(filtrar_tickets(request), rango).filter(
+            estado__in=["Abierto", "En Proceso"]
+        )
+        tickets_atrasados = abiertos.filter(Ticket.filtro_vencidos()).count()
+
+        efectividad_global = (
+            AgentPerformance.objects.aggregate(Avg("efectividad"))["efectividad__avg"] or 0
+        )
+
+        promedio_rating = (
+            totales['rating_suma'] / totales['rating_cantidad'] if totales['rating_cantidad'] else 0
+        )
+        tiempo_prom_resolucion_horas = (
+            totales['resolucion_segundos'] / totales['resolucion_cantidad'] / 3600
+            if totales['resolucion_cantidad'] else 0
+        )
+
+        return {
+            "total_tickets": totales['total'],
+            "tickets_hoy": tickets_hoy,
+            "tickets_abiertos": por_estado["Abierto"],
+            "tickets_en_progreso": por_estado["En Proceso"],
+            "tickets_resueltos": por_estado["Resuelto"],
+            "tickets_atrasados": tickets_atrasados,
+
+            "promedio_rating": round(promedio_rating, 2),
+            "rating_por_categoria": promedios(rating_categoria, nombres_categoria),
+            "rating_por_agente": promedios(rating_agente, nombres_agente),
+
+            "tickets_por_prioridad": dict(por_prioridad),
+            "tickets_por_categoria": dict(tickets_por_categoria),
+
+            "tiempo_promedio_resolucion": round(tiempo_prom_resolucion_horas, 2),
+            "efectividad_global": round(efectividad_global, 2),
+        }
+
+    @staticmethod
+    def get_dashboard_data_en_vivo(request):
+        """Cálculo directo sobre la tabla de tickets (búsqueda de texto)."""
         # Obtener el rango de fechas desde los parámetros GET
         rango = request.query_params.get('rango', 'total')
         categoria_id = request.query_params.get('categoria')
-        hoy = timezone.now().date()
+        hoy = timezone.localdate()
         
         # Usar filtro universal como base
         tickets_filtrados = filtrar_tickets(request)
@@ -62,13 +176,7 @@ class AdminDashboardView(APIView):
             tickets_en_progreso=Count('id', filter=Q(estado="En Proceso")),
             tickets_resueltos=Count('id', filter=Q(estado="Resuelto")),
             
-            tickets_atrasados=Count('id', filter=Q(
-                estado__in=["Abierto", "En Proceso"],
-                fecha_creacion__lt=timezone.now() - ExpressionWrapper(
-                    F('tiempo_estimado_resolucion') * timedelta(hours=1), 
-                    output_field=DurationField()
-                )
-            )),
+            tickets_atrasados=Count('id', filter=Ticket.filtro_vencidos()),
             
             promedio_rating=Avg('rating', filter=Q(rating__isnull=False)),
             
@@ -173,25 +281,11 @@ class AdminDashboardView(APIView):
 
     @staticmethod
     def get_tickets_in_range(base_queryset, rango):
-        """Aplicar filtro de rango sobre un queryset ya filtrado"""
-        hoy = timezone.now()
-        if rango == "dia":
-            return base_queryset.filter(fecha_creacion__date=hoy.date())
-        elif rango == "semana":
-            inicio = hoy - timedelta(days=hoy.weekday())
-            return base_queryset.filter(fecha_creacion__gte=inicio)
-        elif rango == "mes":
-            return base_queryset.filter(
-                fecha_creacion__year=hoy.year, 
-                fecha_creacion__month=hoy.month
-            )
-        elif rango == "anio":
-            return base_queryset.filter(fecha_creacion__year=hoy.year)
-        elif rango == "7dias":
-            return base_queryset.filter(fecha_creacion__gte=hoy - timedelta(days=7))
-        elif rango == "30dias":
-            return base_queryset.filter(fecha_creacion__gte=hoy - timedelta(days=30))
-        return base_queryset
+        """Aplicar filtro de rango sobre un queryset ya filtrado (límites en hora local)"""
+        inicio = inicio_rango(rango)
+        if inicio is None:
+            return base_queryset
+        return base_queryset.filter(fecha_creacion__gte=inicio)
 
 # ============================================================
 #  VIEWSET PARA GESTIONAR AGENTES (CRUD)
@@ -207,7 +301,7 @@ class UserListWithRoleSerializer(AdminUserListSerializer):
     class Meta(AdminUserListSerializer.Meta):
         fields = list(getattr(AdminUserListSerializer.Meta, 'fields', [])) + ['role']
 
-class AgenteAdminViewSet(viewsets.ModelViewSet):
+class AgenteAdminViewSet(ConsultaOptimizadaMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsAdminRole]
     pagination_class = UserPagination
     queryset = User.objects.select_related('rol').all()
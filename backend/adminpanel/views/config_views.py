@@ -1,11 +1,13 @@
 # adminpanel/views/config_views.py
 from rest_framework import viewsets, permissions, generics
-from ..models import Priority, SLA, SystemLog, ConfiguracionSistema
+from ..models import Priority, SLA, SystemLog, ConfiguracionSistema, HorarioLaboral, DiaFeriado
 from ..admin_serializers import (
     PrioritySerializer,
     SLASerializer,
     SystemLogSerializer,
     ConfiguracionSistemaSerializer,
+    HorarioLaboralSerializer,
+    DiaFeriadoSerializer,
 )
 from ..permissions import IsAdminRole
 
@@ -30,6 +32,27 @@ class SLAViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsAdminRole]
 
 
+class HorarioLaboralViewSet(viewsets.ModelViewSet):
+    """
+    API endpoint para el horario laboral (general y por área).
+    Al modificarlo se recalculan las fechas límite de los tickets abiertos.
+    """
+    queryset = HorarioLaboral.objects.select_related('area').all()
+    serializer_class = HorarioLaboralSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAdminRole]
+    filterset_fields = ['area', 'dia_semana']
+
+
+class DiaFeriadoViewSet(viewsets.ModelViewSet):
+    """
+    API endpoint para los días feriados (generales o por área).
+    """
+    queryset = DiaFeriado.objects.select_related('area').all()
+    serializer_class = DiaFeriadoSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAdminRole]
+    filterset_fields = ['area', 'fecha']
+
+
 class SystemLogViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint para ver los registros (logs) del sistema.
@@ -0,0 +1,54 @@
+# adminpanel/views/export_views.py
+from datetime import datetime
+
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from hr_backend.streaming import respuesta_streaming
+from ..exportaciones import ExportacionService, RECURSOS, FORMATOS
+from ..permissions import IsAdminRole
+
+
+class ExportacionView(APIView):
+    """
+    GET /exportar/<recurso>/?formato=csv|ndjson
+
+    recurso: tickets | historial | logs | notificaciones
+    Filtros: los de filtrar_tickets (search, estado, categoria, prioridad, agente),
+    fecha_desde / fecha_hasta (YYYY-MM-DD) y los propios de cada recurso.
+    Reanudación: desde_id=<último id recibido> y opcionalmente limite=<n filas>.
+    comprimir=1 → gzip al vuelo (.gz).
+    """
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def get(self, request, recurso):
+        if recurso not in RECURSOS:
+            return Response(
+                {'error': f'Recurso no válido. Use: {", ".join(RECURSOS)}.'}, status=404
+            )
+
+        formato = request.query_params.get('formato', 'csv').lower()
+        if formato not in FORMATOS:
+            return Response({'error': 'Formato no válido. Use "csv" o "ndjson".'}, status=400)
+
+        queryset, columnas = ExportacionService.queryset(recurso, request)
+        contenido = ExportacionService.lineas(queryset, columnas, formato)
+
+        nombre = f"export_{recurso}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+        # Bajo ASGI, iterador asíncrono: cada bloque sale al cliente en cuanto se genera
+        if request.query_params.get('comprimir') in ('1', 'true'):
+            response = respuesta_streaming(
+                request, ExportacionService.comprimir(contenido), content_type='application/gzip'
+            )
+            nombre += '.gz'
+        else:
+            response = respuesta_streaming(
+                request, (bloque.encode('utf-8') for bloque in contenido), content_type=FORMATOS[formato]
+            )
+
+        response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+        response['Cache-Control'] = 'no-store'
+        # Evita que nginx acumule la respuesta antes de enviarla
+        response['X-Accel-Buffering'] = 'no'
+        return response
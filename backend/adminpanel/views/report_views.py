@@ -2,227 +2,178 @@
 import os
 import logging
 from django.http import FileResponse, Http404
-from django.conf import settings
-from django.db.models import Count, Avg, Q, F
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from ..report_generator import (
-    generar_excel_dashboard, generar_pdf_dashboard, 
-    generar_excel_tickets, generar_pdf_tickets, 
-    generar_excel_usuarios, generar_pdf_usuarios, 
-    generar_excel_rendimiento, generar_pdf_rendimiento, 
-    generar_excel_categorias, generar_pdf_categorias
-)
+from ..dashboard_cache import DashboardCache
 from ..permissions import IsAdminRole
-from ..utils_filters import filtrar_tickets  # 👈 USAR FILTRO UNIVERSAL
-from tickets import models as ticket_models
-from users.models import User
-from ..models import AgentPerformance
+from ..models import ReporteJob
+from ..reportes import ReporteService, FORMATOS, PARAMETROS_POR_TIPO
 
 logger = logging.getLogger(__name__)
 
-class GenerarReporteDashboardView(APIView):
+
+class GenerarReporteBaseView(APIView):
+    """
+    Generación síncrona (GET) de un reporte. Para reportes grandes usar
+    ReporteJobView, que genera el archivo en Celery.
+    """
     permission_classes = [IsAuthenticated, IsAdminRole]
+    tipo = None
+    mensaje_error = 'Error al generar el archivo de reporte'
 
     def get(self, request, *args, **kwargs):
         formato = request.query_params.get('formato', 'xlsx').lower()
-        rango = request.query_params.get('rango', '30dias')
 
-        if formato not in ['xlsx', 'pdf']:
+        if formato not in FORMATOS:
             return Response({'error': 'Formato no válido. Use "xlsx" o "pdf".'}, status=400)
 
         try:
-            # Pasar el objeto request completo (DRF Request)
-            from .admin_views import AdminDashboardView
-            data = AdminDashboardView.get_dashboard_data(request)
-        except Exception as e:
-            print(f"ERROR DASHBOARD DATA: {e}")
-            logger.error(f"Error obteniendo datos del dashboard: {str(e)}", exc_info=True)
-            return Response(
-                {'error': f'No se pudieron obtener las métricas del dashboard: {str(e)}'}, 
-                status=500
-            )
+            parametros = ReporteService.normalizar_parametros(self.tipo, request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
 
         try:
-            if formato == 'xlsx':
-                ruta_archivo = generar_excel_dashboard(data, rango)
-            else:
-                ruta_archivo = generar_pdf_dashboard(data, rango)
+            ruta_archivo = ReporteService.generar(self.tipo, formato, parametros)
         except Exception as e:
-            print(f"ERROR GENERATING DASHBOARD FILE: {e}")
-            logger.error(f"Error generando archivo dashboard: {str(e)}", exc_info=True)
+            print(f"ERROR GENERATING {self.tipo.upper()} REPORT: {e}")
+            logger.error(f"Error generando reporte {self.tipo}: {str(e)}", exc_info=True)
             return Response(
-                {'error': f'Error al generar el archivo de reporte: {str(e)}'}, 
+                {'error': f'{self.mensaje_error}: {str(e)}'},
                 status=500
             )
 
         if os.path.exists(ruta_archivo):
-            response = FileResponse(open(ruta_archivo, 'rb'), as_attachment=True)
-            return response
-        else:
-            raise Http404("El archivo de reporte no fue encontrado.")
+            return FileResponse(open(ruta_archivo, 'rb'), as_attachment=True)
+        raise Http404("El archivo de reporte no fue encontrado.")
 
-class GenerarReporteTicketsView(APIView):
-    permission_classes = [IsAuthenticated, IsAdminRole]
 
-    def get(self, request, *args, **kwargs):
-        formato = request.query_params.get('formato', 'xlsx').lower()
+class GenerarReporteDashboardView(GenerarReporteBaseView):
+    tipo = 'dashboard'
 
-        if formato not in ['xlsx', 'pdf']:
-            return Response({'error': 'Formato no válido. Use "xlsx" o "pdf".'}, status=400)
 
-        try:
-            # Usar filtro universal
-            tickets_filtrados = filtrar_tickets(request)
-            
-            # Optimizar consulta
-            tickets_filtrados = tickets_filtrados.select_related(
-                'solicitante', 'agente', 'categoria_principal'
-            )
+class GenerarReporteTicketsView(GenerarReporteBaseView):
+    tipo = 'tickets'
 
-            if formato == 'xlsx':
-                ruta_archivo = generar_excel_tickets(tickets_filtrados)
-            else:
-                ruta_archivo = generar_pdf_tickets(tickets_filtrados)
-        except Exception as e:
-            print(f"ERROR GENERATING TICKETS REPORT: {e}")
-            logger.error(f"Error generando reporte tickets: {str(e)}", exc_info=True)
-            return Response(
-                {'error': f'Error al generar el archivo de reporte: {str(e)}'}, 
-                status=500
-            )
 
-        if os.path.exists(ruta_archivo):
-            return FileResponse(open(ruta_archivo, 'rb'), as_attachment=True)
-        raise Http404("El archivo de reporte no fue encontrado.")
+class GenerarReporteUsuariosView(GenerarReporteBaseView):
+    tipo = 'usuarios'
+    mensaje_error = 'Error al generar el archivo de reporte de usuarios'
 
-class GenerarReporteUsuariosView(APIView):
-    permission_classes = [IsAuthenticated, IsAdminRole]
 
-    def get(self, request, *args, **kwargs):
-        formato = request.query_params.get('formato', 'xlsx').lower()
+class GenerarReporteRendimientoView(GenerarReporteBaseView):
+    tipo = 'rendimiento'
+    mensaje_error = 'Error al generar el archivo de reporte de rendimiento'
 
-        if formato not in ['xlsx', 'pdf']:
-            return Response({'error': 'Formato no válido. Use "xlsx" o "pdf".'}, status=400)
 
-        try:
-            usuarios = User.objects.all().order_by('username')
+class GenerarReporteCategoriasView(GenerarReporteBaseView):
+    tipo = 'categorias'
+    mensaje_error = 'Error al generar el archivo de reporte por categorías'
 
-            if formato == 'xlsx':
-                ruta_archivo = generar_excel_usuarios(usuarios)
-            else:
-                ruta_archivo = generar_pdf_usuarios(usuarios)
-        except Exception as e:
-            print(f"ERROR GENERATING USERS REPORT: {e}")
-            logger.error(f"Error generando reporte usuarios: {str(e)}", exc_info=True)
-            return Response(
-                {'error': f'Error al generar el archivo de reporte de usuarios: {str(e)}'}, 
-                status=500
-            )
 
-        if os.path.exists(ruta_archivo):
-            return FileResponse(open(ruta_archivo, 'rb'), as_attachment=True)
-        raise Http404("El archivo de reporte no fue encontrado.")
+class MetricasCategoriasView(APIView):
+    """
+    GET /reportes/categorias/metricas/?categoria=<id> → métricas por categoría en JSON
+    (mismos datos que el reporte XLSX/PDF, cacheados como el dashboard).
+    """
+    permission_classes = [IsAuthenticated, IsAdminRole]
 
-class GenerarReporteRendimientoView(APIView):
+    def get(self, request):
+        categoria = request.query_params.get('categoria')
+        if categoria and not categoria.isdigit():
+            return Response({'error': 'Categoría no válida.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        data, estado_cache = DashboardCache.obtener(
+            'metricas_categorias', request.query_params, ('categoria',),
+            lambda: {'categorias': ReporteService.metricas_categorias(categoria)}
+        )
+        return Response(data, headers={'X-Cache': estado_cache})
+
+
+# ============================================================
+#  📦 REPORTES ASÍNCRONOS (CELERY)
+# ============================================================
+def serializar_job(job, request):
+    data = {
+        'id': str(job.id),
+        'tipo': job.tipo,
+        'formato': job.formato,
+        'parametros': job.parametros,
+        'estado': job.estado,
+        'progreso': job.progreso,
+        'error': job.error or None,
+        'fecha_creacion': job.fecha_creacion,
+        'fecha_fin': job.fecha_fin,
+        'status_url': request.build_absolute_uri(
+            reverse('admin-reporte-job', args=[job.id])
+        ),
+        'download_url': None,
+    }
+    if job.estado == 'completado':
+        data['download_url'] = request.build_absolute_uri(
+            reverse('admin-reporte-job-descargar', args=[job.id])
+        )
+    return data
+
+
+class ReporteJobListCreateView(APIView):
+    """
+    POST /reportes/jobs/  {tipo, formato, ...filtros} → 202 con el id del job
+    (200 si se reutiliza un job equivalente en curso o ya generado).
+    GET  /reportes/jobs/  → últimos jobs del usuario.
+    """
     permission_classes = [IsAuthenticated, IsAdminRole]
 
-    def get(self, request, *args, **kwargs):
-        formato = request.query_params.get('formato', 'xlsx').lower()
+    def get(self, request):
+        jobs = ReporteJob.objects.filter(solicitado_por=request.user)[:20]
+        return Response([serializar_job(job, request) for job in jobs])
 
-        if formato not in ['xlsx', 'pdf']:
-            return Response({'error': 'Formato no válido. Use "xlsx" o "pdf".'}, status=400)
+    def post(self, request):
+        tipo = request.data.get('tipo')
+        formato = str(request.data.get('formato', 'xlsx')).lower()
 
-        try:
-            rendimiento = AgentPerformance.objects.select_related(
-                'agente'
-            ).all().order_by('-tickets_resueltos')
-
-            if formato == 'xlsx':
-                ruta_archivo = generar_excel_rendimiento(rendimiento)
-            else:
-                ruta_archivo = generar_pdf_rendimiento(rendimiento)
-        except Exception as e:
-            print(f"ERROR GENERATING PERFORMANCE REPORT: {e}")
-            logger.error(f"Error generando reporte rendimiento: {str(e)}", exc_info=True)
+        if tipo not in PARAMETROS_POR_TIPO:
             return Response(
-                {'error': f'Error al generar el archivo de reporte de rendimiento: {str(e)}'}, 
-                status=500
+                {'error': f'Tipo no válido. Use: {", ".join(PARAMETROS_POR_TIPO)}.'},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        if formato not in FORMATOS:
+            return Response({'error': 'Formato no válido. Use "xlsx" o "pdf".'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if os.path.exists(ruta_archivo):
-            return FileResponse(open(ruta_archivo, 'rb'), as_attachment=True)
-        raise Http404("El archivo de reporte no fue encontrado.")
+        try:
+            job, reutilizado = ReporteService.solicitar(tipo, formato, request.data, request.user)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data = serializar_job(job, request)
+        data['reutilizado'] = reutilizado
+        return Response(data, status=status.HTTP_200_OK if reutilizado else status.HTTP_202_ACCEPTED)
 
-class GenerarReporteCategoriasView(APIView):
+
+class ReporteJobDetailView(APIView):
+    """GET /reportes/jobs/<id>/ → estado, progreso y URL de descarga."""
     permission_classes = [IsAuthenticated, IsAdminRole]
 
-    def get(self, request, *args, **kwargs):
-        formato = request.query_params.get('formato', 'xlsx').lower()
+    def get(self, request, pk):
+        job = get_object_or_404(ReporteJob, pk=pk)
+        return Response(serializar_job(job, request))
 
-        if formato not in ['xlsx', 'pdf']:
-            return Response({'error': 'Formato no válido. Use "xlsx" o "pdf".'}, status=400)
 
-        try:
-            # Obtener el queryset base
-            categorias = ticket_models.CategoriaPrincipal.objects.filter(activo=True)
-
-            # Aplicar filtro de categoría si se provee
-            categoria_id = request.query_params.get('categoria')
-            if categoria_id:
-                categorias = categorias.filter(id=categoria_id)
-
-            # Calcular métricas para cada categoría
-            categorias_con_metricas = []
-            for cat in categorias:
-                tickets_de_categoria = ticket_models.Ticket.objects.filter(
-                    categoria_principal=cat
-                )
-                
-                metricas = tickets_de_categoria.aggregate(
-                    total_tickets=Count('id'),
-                    tickets_abiertos=Count('id', filter=Q(estado__in=['Abierto', 'En Proceso'])),
-                    tickets_resueltos=Count('id', filter=Q(estado='Resuelto')),
-                    rating_promedio=Avg('rating', filter=Q(rating__isnull=False)),
-                    tiempo_promedio_resolucion_duration=Avg(
-                        F('fecha_cierre') - F('fecha_creacion'),
-                        filter=Q(fecha_cierre__isnull=False)
-                    )
-                )
-                
-                cat_data = {
-                    'id': cat.id,
-                    'nombre': cat.nombre,
-                    'descripcion': cat.descripcion,
-                    'activo': cat.activo,
-                    'total_tickets': metricas.get('total_tickets', 0),
-                    'tickets_abiertos': metricas.get('tickets_abiertos', 0),
-                    'tickets_resueltos': metricas.get('tickets_resueltos', 0),
-                    'rating_promedio': round(metricas.get('rating_promedio', 0) or 0, 2),
-                }
-                
-                tiempo_res = metricas.get('tiempo_promedio_resolucion_duration')
-                if tiempo_res:
-                    cat_data['tiempo_promedio_resolucion_horas'] = tiempo_res.total_seconds() / 3600
-                else:
-                    cat_data['tiempo_promedio_resolucion_horas'] = 0
-                    
-                categorias_con_metricas.append(cat_data)
-
-            if formato == 'xlsx':
-                ruta_archivo = generar_excel_categorias(categorias_con_metricas)
-            else:
-                ruta_archivo = generar_pdf_categorias(categorias_con_metricas)
-        except Exception as e:
-            print(f"ERROR GENERATING CATEGORIES REPORT: {e}")
-            logger.error(f"Error generando reporte categorias: {str(e)}", exc_info=True)
-            return Response(
-                {'error': f'Error al generar el archivo de reporte por categorías: {str(e)}'}, 
-                status=500
-            )
+class ReporteJobDownloadView(APIView):
+    """GET /reportes/jobs/<id>/descargar/ → archivo generado."""
+    permission_classes = [IsAuthenticated, IsAdminRole]
 
-        if os.path.exists(ruta_archivo):
-            return FileResponse(open(ruta_archivo, 'rb'), as_attachment=True)
-        raise Http404("El archivo de reporte no fue encontrado.")
\ No newline at end of file
+    def get(self, request, pk):
+        job = get_object_or_404(ReporteJob, pk=pk)
+        if job.estado != 'completado':
+            return Response({'error': 'El reporte aún no está listo.'}, status=status.HTTP_409_CONFLICT)
+
+        ruta_archivo = ReporteService.ruta_absoluta(job)
+        if not os.path.exists(ruta_archivo):
+            raise Http404("El archivo de reporte no fue encontrado.")
+        return FileResponse(
+            open(ruta_archivo, 'rb'), as_attachment=True, filename=os.path.basename(ruta_archivo)
+        )
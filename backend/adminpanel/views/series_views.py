@@ -0,0 +1,25 @@
+# adminpanel/views/series_views.py
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..permissions import IsAdminRole
+from ..series import SeriesTemporalService
+
+
+class SeriesTemporalView(APIView):
+    """
+    GET /dashboard/series/?intervalo=hora|dia|semana&agrupar=categoria|agente
+
+    Filtros: desde / hasta (YYYY-MM-DD, inclusive), categoria=<id>, agente=<id>.
+    Por periodo: tickets creados, resueltos (por fecha de cierre) y p50/p90/p99
+    del tiempo de resolución en horas.
+    """
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def get(self, request):
+        try:
+            parametros = SeriesTemporalService.parametros(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(SeriesTemporalService.obtener(parametros))
@@ -7,9 +7,11 @@ from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 
-from .models import ChatRoom, Message, GroupChat
+from .models import ChatRoom, Message, GroupChat, GroupMembership
 from .notification_utils import create_notifications_for_message
+from .typing import TypingThrottle
 from rest_framework_simplejwt.tokens import UntypedToken
+from hr_backend import json_rapido
 
 
 User = get_user_model()
@@ -55,8 +57,13 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
         await self.accept()
+        self.typing_throttle = TypingThrottle(self.publish_typing)
 
     async def disconnect(self, close_code):
+        # Cerrar el indicador "escribiendo..." pendiente
+        if hasattr(self, "typing_throttle"):
+            await self.typing_throttle.close()
+
         # Salir del grupo al desconectar
         await self.channel_layer.group_discard(
             self.room_group_name,
@@ -77,7 +84,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             data = json.loads(text_data)
             event_type = data.get("type")
         except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({
+            await self.send(text_data=json_rapido.dumps({
                 "error": "Formato de mensaje inválido."
             }))
             return
@@ -85,24 +92,13 @@ class ChatConsumer(AsyncWebsocketConsumer):
         # ============================
         #  EVENTO DE ESCRITURA (TYPING)
         # ============================
+        # Throttle + coalescing por conexión (ver chat/typing.py)
         if event_type == "typing":
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "group_typing",
-                    "sender": self.user.username,
-                }
-            )
+            await self.typing_throttle.typing()
             return
 
         if event_type == "stop_typing":
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "group_stop_typing",
-                    "sender": self.user.username,
-                }
-            )
+            await self.typing_throttle.stop_typing()
             return
 
         # Si el evento no es 'typing' o 'stop_typing', no hacemos nada.
@@ -114,21 +110,31 @@ class ChatConsumer(AsyncWebsocketConsumer):
         Manejador genérico para todos los eventos de chat (nuevo, editado, borrado).
         Recibe el evento desde la señal y lo reenvía al cliente.
         """
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=json_rapido.dumps({
             "type": event["event_type"], # 'chat_message_new' o 'chat_message_update'
             "message": event["message"]
         }))
 
+    async def publish_typing(self, handler):
+        """Publica 'group_typing' / 'group_stop_typing' al grupo (lo llama TypingThrottle)."""
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                "type": handler,
+                "sender": self.user.username,
+            }
+        )
+
     async def group_typing(self, event):
         """Informa a los clientes que un usuario está escribiendo."""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=json_rapido.dumps({
             "typing": True,
             "sender": event["sender"]
         }))
 
     async def group_stop_typing(self, event):
         """Informa a los clientes que un usuario dejó de escribir."""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=json_rapido.dumps({
             "typing": False,
             "sender": event["sender"]
         }))
@@ -180,7 +186,7 @@ class GroupChatConsumer(AsyncWebsocketConsumer):
     """
     WebSocket para chat grupal (ej. RRHH).
     Autenticación por JWT en query string (?token=...).
-    Solo roles ['agente', 'admin'] pueden usar este chat.
+    Solo los miembros del grupo (GroupMembership) pueden conectarse.
     """
     async def connect(self):
         self.group_name = self.scope["url_route"]["kwargs"]["group_name"]
@@ -204,10 +210,8 @@ class GroupChatConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
 
-        # 2. Verificar si el usuario tiene el rol permitido
-        is_authorized = (
-            self.user.rol and self.user.rol.tipo_base in ['agente', 'admin']
-        )
+        # 2. Verificar que el usuario sea miembro del grupo
+        is_authorized = await self.user_in_group()
 
         if not self.user.is_authenticated or not is_authorized:
             await self.close()
@@ -216,8 +220,11 @@ class GroupChatConsumer(AsyncWebsocketConsumer):
         # 3. Unirse al grupo y aceptar la conexión
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
+        self.typing_throttle = TypingThrottle(self.publish_typing)
 
     async def disconnect(self, close_code):
+        if hasattr(self, "typing_throttle"):
+            await self.typing_throttle.close()
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
     async def receive(self, text_data):
@@ -234,30 +241,19 @@ class GroupChatConsumer(AsyncWebsocketConsumer):
             data = json.loads(text_data)
             event_type = data.get("type")
         except json.JSONDecodeError:
-            await self.send(text_data=json.dumps({"error": "Formato de mensaje inválido."}))
+            await self.send(text_data=json_rapido.dumps({"error": "Formato de mensaje inválido."}))
             return
 
         # ============================
         #  EVENTO DE ESCRITURA (TYPING)
         # ============================
+        # Throttle + coalescing por conexión (ver chat/typing.py)
         if event_type == "typing":
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "group_typing",
-                    "sender": self.user.username,
-                }
-            )
+            await self.typing_throttle.typing()
             return
 
         if event_type == "stop_typing":
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    "type": "group_stop_typing",
-                    "sender": self.user.username,
-                }
-            )
+            await self.typing_throttle.stop_typing()
             return
 
         return
@@ -267,25 +263,47 @@ class GroupChatConsumer(AsyncWebsocketConsumer):
         Manejador genérico para todos los eventos de chat (nuevo, editado, borrado).
         Recibe el evento desde la señal y lo reenvía al cliente.
         """
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=json_rapido.dumps({
             "type": event["event_type"],
             "message": event["message"]
         }))
 
+    async def publish_typing(self, handler):
+        """Publica 'group_typing' / 'group_stop_typing' al grupo (lo llama TypingThrottle)."""
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                "type": handler,
+                "sender": self.user.username,
+            }
+        )
+
     async def group_typing(self, event):
         """Informa a los clientes que un usuario está escribiendo."""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=json_rapido.dumps({
             "typing": True,
             "sender": event["sender"]
         }))
 
     async def group_stop_typing(self, event):
         """Informa a los clientes que un usuario dejó de escribir."""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=json_rapido.dumps({
             "typing": False,
             "sender": event["sender"]
         }))
 
+    async def membership_revoked(self, event):
+        """El usuario fue quitado del grupo: se cierra su conexión."""
+        if event["user_id"] == self.user.id:
+            await self.close(code=4003)
+
+    @database_sync_to_async
+    def user_in_group(self):
+        """Verifica que el usuario sea miembro del GroupChat."""
+        return GroupMembership.objects.filter(
+            group__name=self.group_name, user_id=self.user.id
+        ).exists()
+
     @database_sync_to_async
     def serialize_message(self, message):
         """Serializa un objeto de mensaje."""
@@ -351,7 +369,7 @@ class AgentPresenceConsumer(AsyncWebsocketConsumer):
 
     async def agent_online(self, event):
         """Recibir notificación de agente en línea"""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=json_rapido.dumps({
             "type": "agent_online",
             "agent_id": event["agent_id"],
             "username": event["username"]
@@ -359,7 +377,7 @@ class AgentPresenceConsumer(AsyncWebsocketConsumer):
 
     async def agent_offline(self, event):
         """Recibir notificación de agente desconectado"""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=json_rapido.dumps({
             "type": "agent_offline",
             "agent_id": event["agent_id"],
             "username": event["username"]
@@ -0,0 +1,195 @@
+# chat/downloads.py
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+from hr_backend.streaming import respuesta_streaming
+
+from .models import ChatRoom, GroupMembership
+
+# Solo se cachean los permisos concedidos; las revocaciones borran la clave
+# (ver señales en chat/models.py).
+ACCESS_CACHE_SECONDS = 300
+STREAM_CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+# ============================================================
+#  PERMISOS (CACHEADOS) SOBRE SALAS Y GRUPOS
+# ============================================================
+def room_access_key(user_id, room_id):
+    return f"chat_access:{user_id}:room:{room_id}"
+
+
+def group_access_key(user_id, group_id):
+    return f"chat_access:{user_id}:group:{group_id}"
+
+
+def user_can_access_message(user, message):
+    """
+    True si el usuario participa en la sala o es miembro del grupo del mensaje.
+    Usa una sola consulta indexada sobre la tabla intermedia y cachea el resultado.
+    """
+    if message.room_id:
+        key = room_access_key(user.id, message.room_id)
+        check = ChatRoom.participants.through.objects.filter(
+            chatroom_id=message.room_id, user_id=user.id
+        ).exists
+    elif message.group_id:
+        key = group_access_key(user.id, message.group_id)
+        check = GroupMembership.objects.filter(
+            group_id=message.group_id, user_id=user.id
+        ).exists
+    else:
+        return False
+
+    if cache.get(key):
+        return True
+
+    allowed = check()
+    if allowed:
+        cache.set(key, True, ACCESS_CACHE_SECONDS)
+    return allowed
+
+
+def invalidate_room_access(room_id, user_ids):
+    cache.delete_many([room_access_key(user_id, room_id) for user_id in user_ids])
+
+
+def invalidate_group_access(group_id, user_ids):
+    cache.delete_many([group_access_key(user_id, group_id) for user_id in user_ids])
+
+
+# ============================================================
+#  ENTREGA DEL ARCHIVO (X-Accel-Redirect / X-Sendfile / Range)
+# ============================================================
+def file_etag(stat):
+    return quote_etag(f"{stat.st_size:x}-{int(stat.st_mtime):x}")
+
+
+def parse_range(header, size):
+    """
+    Interpreta un único rango 'bytes=inicio-fin'.
+    Devuelve (inicio, fin) inclusivo, None si no hay rango utilizable
+    o False si el rango no es satisfacible (416).
+    """
+    match = RANGE_RE.match(header or "")
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Sufijo: los últimos N bytes
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def iter_file_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, field_file, as_attachment=False):
+    """
+    Devuelve la respuesta de descarga de un FileField.
+
+    - Con CHAT_FILES_SENDFILE_HEADER = 'X-Accel-Redirect' (nginx) o 'X-Sendfile'
+      (Apache/lighttpd) solo se devuelven cabeceras y el servidor web transfiere
+      los bytes.
+    - Sin servidor delante (Daphne directo) se hace streaming con soporte de
+      ETag / If-None-Match / If-Modified-Since, Range e If-Range.
+    """
+    path = field_file.path
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    etag = file_etag(stat)
+    last_modified = http_date(stat.st_mtime)
+    filename = os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    # --- Validación condicional (304) ---
+    if_none_match = request.headers.get("If-None-Match")
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    if (if_none_match and etag in [t.strip() for t in if_none_match.split(",")]) or (
+        not if_none_match and if_modified_since and int(stat.st_mtime) <= if_modified_since
+    ):
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        response["Last-Modified"] = last_modified
+        return response
+
+    disposition = "attachment" if as_attachment else "inline"
+
+    # --- Delegar la transferencia al servidor web ---
+    sendfile_header = getattr(settings, "CHAT_FILES_SENDFILE_HEADER", None)
+    if sendfile_header:
+        response = HttpResponse(content_type=content_type)
+        if sendfile_header == "X-Accel-Redirect":
+            prefix = getattr(settings, "CHAT_FILES_ACCEL_PREFIX", "/protected-media/")
+            response[sendfile_header] = prefix.rstrip("/") + "/" + field_file.name.lstrip("/")
+        else:
+            response[sendfile_header] = path
+        response["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+        response["ETag"] = etag
+        response["Last-Modified"] = last_modified
+        return response
+
+    # --- Streaming desde Python ---
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if range_header and (not if_range or if_range == etag or if_range == last_modified):
+        byte_range = parse_range(range_header, stat.st_size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{stat.st_size}"
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        status = 206
+    else:
+        start, end = 0, stat.st_size - 1
+        status = 200
+    length = end - start + 1
+
+    # Bloques de STREAM_CHUNK_SIZE leídos en un hilo aparte (sin bloquear el
+    # hilo síncrono compartido); bajo ASGI se envían a medida que se leen
+    response = respuesta_streaming(
+        request, iter_file_range(path, start, length), thread_sensitive=False,
+        status=status, content_type=content_type,
+    )
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    response["Content-Length"] = str(length)
+    response["Content-Disposition"] = content_disposition_header(as_attachment, filename)
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = last_modified
+    return response
@@ -0,0 +1,76 @@
+# chat/images.py
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Tamaños máximos (ancho, alto) de los derivados; se conserva la proporción
+THUMB_SIZE = (320, 320)
+PREVIEW_SIZE = (1280, 1280)
+WEBP_QUALITY = 80
+EXIF_ORIENTATION = 0x0112
+
+
+def _to_webp(image, size):
+    derivado = image.copy()
+    derivado.thumbnail(size, Image.LANCZOS)
+    if derivado.mode not in ("RGB", "RGBA"):
+        derivado = derivado.convert("RGBA" if "A" in derivado.getbands() else "RGB")
+    buffer = BytesIO()
+    derivado.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def generar_derivados(message, force=False, broadcast=True):
+    """
+    Genera la miniatura y la vista previa WebP de un mensaje de imagen
+    y guarda las dimensiones del original en el mensaje.
+    Con broadcast=False (backfill) se guarda con update(), sin la señal
+    post_save que reenvía el mensaje por WebSocket.
+    Devuelve True si se generaron los derivados.
+    """
+    if message.message_type != "image" or not message.file or message.is_deleted:
+        return False
+    if message.thumbnail and not force:
+        return False
+
+    try:
+        with message.file.open("rb") as original, Image.open(original) as image:
+            # Dimensiones del original (encabezado), corrigiendo la orientación EXIF
+            width, height = image.size
+            if image.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+                width, height = height, width
+
+            # JPEG: decodificar a escala reducida cuando el original es enorme
+            image.draft("RGB", PREVIEW_SIZE)
+            image = ImageOps.exif_transpose(image)
+
+            thumb = _to_webp(image, THUMB_SIZE)
+            preview = _to_webp(image, PREVIEW_SIZE)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        logger.warning(f"No se pudieron generar derivados del mensaje {message.id}: {e}")
+        return False
+
+    base = os.path.splitext(os.path.basename(message.file.name))[0]
+    for field in (message.thumbnail, message.preview_image):
+        if field:
+            field.delete(save=False)
+    message.thumbnail.save(f"{base}_thumb.webp", ContentFile(thumb), save=False)
+    message.preview_image.save(f"{base}_preview.webp", ContentFile(preview), save=False)
+    message.image_width = width
+    message.image_height = height
+    campos = {
+        "thumbnail": message.thumbnail.name,
+        "preview_image": message.preview_image.name,
+        "image_width": width,
+        "image_height": height,
+    }
+    if broadcast:
+        message.save(update_fields=list(campos))
+    else:
+        type(message).objects.filter(pk=message.pk).update(**campos)
+    return True
@@ -0,0 +1,45 @@
+# backend/chat/management/commands/generar_miniaturas_chat.py
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from chat.images import generar_derivados
+from chat.models import Message
+
+
+class Command(BaseCommand):
+    help = 'Genera miniaturas y vistas previas WebP para las imágenes existentes del chat (media/chat_files).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenera también los derivados existentes.')
+        parser.add_argument('--batch-size', type=int, default=200, help='Filas leídas por consulta.')
+
+    def handle(self, *args, **options):
+        mensajes = Message.objects.filter(
+            message_type='image', is_deleted=False
+        ).exclude(Q(file='') | Q(file__isnull=True))
+
+        if not options['force']:
+            mensajes = mensajes.filter(Q(thumbnail='') | Q(thumbnail__isnull=True))
+
+        total = mensajes.count()
+        if not total:
+            self.stdout.write(" No hay imágenes pendientes.")
+            return
+
+        self.stdout.write(f" Procesando {total} imágenes...")
+
+        generados = omitidos = 0
+        for message in mensajes.order_by('id').iterator(chunk_size=options['batch_size']):
+            # Sin broadcast: el backfill no reenvía mensajes históricos por WebSocket
+            if generar_derivados(message, force=options['force'], broadcast=False):
+                generados += 1
+            else:
+                omitidos += 1
+
+            procesados = generados + omitidos
+            if procesados % 100 == 0:
+                self.stdout.write(f"   {procesados}/{total}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f" Derivados generados: {generados}. Omitidos (archivo ilegible o faltante): {omitidos}."
+        ))
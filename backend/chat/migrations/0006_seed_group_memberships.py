@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:30
+
+from django.db import migrations
+
+DEFAULT_GROUP = 'group-hr'  # Grupo fijo que usa el frontend (ChatLayout.jsx)
+
+
+def seed_group_memberships(apps, schema_editor):
+    """
+    Antes de esta migración cualquier agente/admin podía leer y escribir en
+    cualquier grupo (y los grupos se creaban al hacer GET). Para no cortar el
+    acceso existente, se crea el grupo por defecto y se agregan como miembros
+    todos los agentes/admins a los grupos que ya existen.
+    """
+    GroupChat = apps.get_model('chat', 'GroupChat')
+    GroupMembership = apps.get_model('chat', 'GroupMembership')
+    User = apps.get_model('users', 'User')
+
+    GroupChat.objects.get_or_create(name=DEFAULT_GROUP)
+
+    staff = list(
+        User.objects.filter(rol__tipo_base__in=['agente', 'admin']).values_list('id', 'rol__tipo_base')
+    )
+    memberships = [
+        GroupMembership(
+            group_id=group_id,
+            user_id=user_id,
+            role='admin' if tipo_base == 'admin' else 'member',
+        )
+        for group_id in GroupChat.objects.values_list('id', flat=True)
+        for user_id, tipo_base in staff
+    ]
+    GroupMembership.objects.bulk_create(memberships, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_groupmembership'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_group_memberships, migrations.RunPython.noop),
+    ]
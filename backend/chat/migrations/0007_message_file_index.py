@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_seed_group_memberships'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='message',
+            name='file',
+            field=models.FileField(blank=True, db_index=True, null=True, upload_to='chat_files/'),
+        ),
+    ]
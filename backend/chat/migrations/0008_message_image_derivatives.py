@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0007_message_file_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='preview_image',
+            field=models.FileField(blank=True, null=True, upload_to='chat_thumbs/'),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='thumbnail',
+            field=models.FileField(blank=True, null=True, upload_to='chat_thumbs/'),
+        ),
+    ]
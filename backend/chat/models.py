@@ -1,6 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
@@ -11,14 +11,68 @@ User = settings.AUTH_USER_MODEL
 # 1. CHAT GRUPAL (AGENTES / RRHH)
 
 class GroupChat(models.Model):
+    DEFAULT_NAME = 'group-hr'  # Grupo fijo que usa el frontend (ChatLayout.jsx)
+    STAFF_ROLES = ('agente', 'admin')
+
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    members = models.ManyToManyField(
+        User,
+        through="GroupMembership",
+        related_name="group_chats",
+        blank=True
+    )
+
+    @property
+    def channel_group_name(self):
+        """Grupo de Channels del chat (mensajes y typing)."""
+        return f"group_chat_{self.name}"
+
+    @property
+    def members_channel_name(self):
+        """Grupo de Channels para las notificaciones de los miembros."""
+        return f"group_members_{self.id}"
 
     def __str__(self):
         return self.name
 
 
+class GroupMembership(models.Model):
+    ROLE_OWNER = 'owner'
+    ROLE_ADMIN = 'admin'
+    ROLE_MEMBER = 'member'
+    ROLE_CHOICES = [
+        (ROLE_OWNER, 'Propietario'),
+        (ROLE_ADMIN, 'Administrador'),
+        (ROLE_MEMBER, 'Miembro'),
+    ]
+    MANAGER_ROLES = (ROLE_OWNER, ROLE_ADMIN)
+
+    group = models.ForeignKey(
+        GroupChat,
+        on_delete=models.CASCADE,
+        related_name="memberships"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="group_memberships"
+    )
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default=ROLE_MEMBER)
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('group', 'user')
+
+    @property
+    def can_manage(self):
+        return self.role in self.MANAGER_ROLES
+
+    def __str__(self):
+        return f"{self.user} en {self.group} ({self.role})"
+
+
 # 2. CHAT POR TICKET
 
 class ChatRoom(models.Model):
@@ -95,9 +149,16 @@ class Message(models.Model):
     file = models.FileField(
         upload_to="chat_files/",
         blank=True,
-        null=True
+        null=True,
+        db_index=True  # Búsqueda por ruta en FileDownloadView
     )
 
+    # Derivados WebP de las imágenes (chat/images.py)
+    thumbnail = models.FileField(upload_to="chat_thumbs/", blank=True, null=True)
+    preview_image = models.FileField(upload_to="chat_thumbs/", blank=True, null=True)
+    image_width = models.PositiveIntegerField(blank=True, null=True)
+    image_height = models.PositiveIntegerField(blank=True, null=True)
+
     # Tipo del mensaje
     message_type = models.CharField(
         max_length=10,
@@ -111,6 +172,13 @@ class Message(models.Model):
     is_edited = models.BooleanField(default=False)
     is_deleted = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Historial paginado por cursor (id descendente) dentro de cada sala/grupo
+            models.Index(fields=['group', '-id']),
+            models.Index(fields=['room', '-id']),
+        ]
+
     def __str__(self):
         who = self.sender.username
         if self.room:
@@ -144,10 +212,15 @@ def broadcast_message(sender, instance, created, **kwargs):
 
     serialized_message = MessageSerializer(instance).data
 
+    # Miniatura / vista previa en segundo plano para imágenes nuevas
+    if created and instance.message_type == 'image' and instance.file:
+        from .tasks import encolar_derivados_imagen
+        encolar_derivados_imagen(instance.id)
+
     if instance.room:
         group_name = f"chat_room_{instance.room.id}"
     elif instance.group:
-        group_name = f"group_chat_{instance.group.name}"
+        group_name = instance.group.channel_group_name
     else:
         return # No hay a dónde enviar
 
@@ -165,3 +238,81 @@ def broadcast_message(sender, instance, created, **kwargs):
             "message": serialized_message
         }
     )
+
+
+#  SEÑALES PARA INVALIDAR PERMISOS CACHEADOS (descargas de archivos)
+
+@receiver(m2m_changed, sender=ChatRoom.participants.through)
+def invalidate_room_access_cache(sender, instance, action, pk_set, **kwargs):
+    from .downloads import invalidate_room_access
+
+    if action == "pre_clear":
+        invalidate_room_access(instance.id, instance.participants.values_list("id", flat=True))
+    elif action == "post_remove" and pk_set:
+        invalidate_room_access(instance.id, pk_set)
+
+
+@receiver(post_delete, sender=GroupMembership)
+def invalidate_group_access_cache(sender, instance, **kwargs):
+    from .downloads import invalidate_group_access
+
+    invalidate_group_access(instance.group_id, [instance.user_id])
+
+
+#  SEÑALES DE MEMBRESÍA DEL CHAT GRUPAL
+
+@receiver(post_delete, sender=GroupMembership)
+def close_revoked_group_sockets(sender, instance, **kwargs):
+    """Cierra los WebSockets de grupo que el usuario tenga abiertos al perder la membresía."""
+    group_name = instance.group.channel_group_name
+    event = {"type": "membership_revoked", "user_id": instance.user_id}
+    transaction.on_commit(lambda: async_to_sync(get_channel_layer().group_send)(group_name, event))
+
+
+def add_to_default_group(staff):
+    """
+    Agrega al grupo por defecto a los usuarios [(id, tipo_base)] que aún no
+    son miembros (los admins como administradores del grupo).
+    """
+    if not staff:
+        return
+    group_chat, _ = GroupChat.objects.get_or_create(name=GroupChat.DEFAULT_NAME)
+    existing = set(
+        GroupMembership.objects.filter(
+            group=group_chat, user_id__in=[user_id for user_id, _ in staff]
+        ).values_list("user_id", flat=True)
+    )
+    new_members = [
+        GroupMembership(
+            group=group_chat,
+            user_id=user_id,
+            role=GroupMembership.ROLE_ADMIN if tipo_base == 'admin' else GroupMembership.ROLE_MEMBER,
+        )
+        for user_id, tipo_base in staff if user_id not in existing
+    ]
+    if not new_members:
+        return
+    GroupMembership.objects.bulk_create(new_members, ignore_conflicts=True)
+
+    from .notification_utils import notify_membership_change
+    user_ids = [m.user_id for m in new_members]
+    transaction.on_commit(lambda: notify_membership_change(group_chat, user_ids, joined=True))
+
+
+@receiver(post_save, sender=User)
+def add_staff_user_to_default_group(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Un usuario que recibe rol de agente/admin entra al grupo por defecto."""
+    if raw or not instance.rol_id or (update_fields and 'rol' not in update_fields):
+        return
+    if instance.rol.tipo_base in GroupChat.STAFF_ROLES:
+        add_to_default_group([(instance.id, instance.rol.tipo_base)])
+
+
+@receiver(post_save, sender='users.Rol')
+def add_role_users_to_default_group(sender, instance, created, raw=False, **kwargs):
+    """Si un rol pasa a ser de agente/admin, sus usuarios entran al grupo por defecto."""
+    if raw or created or instance.tipo_base not in GroupChat.STAFF_ROLES:
+        return
+    add_to_default_group([
+        (user_id, instance.tipo_base) for user_id in instance.usuarios.values_list("id", flat=True)
+    ])
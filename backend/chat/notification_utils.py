@@ -1,5 +1,4 @@
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.urls import reverse
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
@@ -107,14 +106,13 @@ def create_notifications_for_message(message: Message):
     # 3. Notificaciones de chat grupal (group)
     elif message.group:
         group = message.group
-        # Aquí depende de cómo manejes los miembros del grupo;
-        # si no tienes relación, podrías notificar solo a ciertos roles.
 
-        # Si por ahora solo quieres notificar a todos los agentes/admins:
-        User = get_user_model()
-        recipients = User.objects.filter(rol__tipo_base__in=["agente", "admin"]).exclude(
-            id=message.sender_id
+        # Destinatarios = miembros del grupo menos el remitente
+        recipient_ids = list(
+            group.memberships.exclude(user_id=message.sender_id).values_list("user_id", flat=True)
         )
+        if not recipient_ids:
+            return
 
         if message.message_type == "image":
             body = f"{message.sender.username} envió una imagen en el grupo {group.name}"
@@ -126,28 +124,52 @@ def create_notifications_for_message(message: Message):
 
         # url = f"/chat-grupal/{group.name}"  # ajusta a la ruta de tu front
 
-        for user in recipients:
-            notif = Notification.objects.create(
-                usuario=user,
+        # Un solo INSERT para todos los miembros
+        Notification.objects.bulk_create([
+            Notification(
+                usuario_id=user_id,
                 mensaje=f"Nuevo mensaje en {group.name}: {body}",
                 tipo="chat_group",
             )
-
-            # ENVIAR WS
-            async_to_sync(channel_layer.group_send)(
-                f"user_{user.id}",
-                {
-                    "type": "send_notification",
-                    "content": {
-                        "channel": "chat_message",
-                        "message_id": message.id,
-                        "notification_id": notif.id,
-                        "sender_name": message.sender.username,
-                        "message": body,
-                        "room_id": group.name, # O lo que uses para identificar el grupo
-                        "is_group": True,
-                        "created_at": str(message.timestamp),
-                        "tipo": "chat_message"
-                    }
+            for user_id in recipient_ids
+        ])
+
+        # ENVIAR WS: un único group_send al canal de miembros del grupo.
+        # NotificationConsumer descarta el evento en la conexión del remitente.
+        async_to_sync(channel_layer.group_send)(
+            group.members_channel_name,
+            {
+                "type": "group_notification",
+                "sender_id": message.sender_id,
+                "content": {
+                    "channel": "chat_message",
+                    "message_id": message.id,
+                    "sender_name": message.sender.username,
+                    "message": body,
+                    "room_id": group.name, # O lo que uses para identificar el grupo
+                    "is_group": True,
+                    "created_at": str(message.timestamp),
+                    "tipo": "chat_message"
                 }
-            )
+            }
+        )
+
+
+def notify_membership_change(group, user_ids, joined):
+    """
+    Avisa a las conexiones de notificaciones de cada usuario para que se
+    suscriban (o desuscriban) del canal de miembros del grupo.
+    """
+    if not user_ids:
+        return
+
+    channel_layer = get_channel_layer()
+    for user_id in user_ids:
+        async_to_sync(channel_layer.group_send)(
+            f"user_{user_id}",
+            {
+                "type": "group_membership_changed",
+                "group_id": group.id,
+                "joined": joined,
+            }
+        )
@@ -1,7 +1,9 @@
 # chat/serializers.py
 from rest_framework import serializers
-from .models import ChatRoom, Message
+from .models import ChatRoom, Message, GroupChat, GroupMembership
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
 
 
 # ============================================================
@@ -10,6 +12,9 @@ from django.conf import settings
 class MessageSerializer(serializers.ModelSerializer):
     sender_name = serializers.CharField(source="sender.username", read_only=True)
     file_url = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+    thumb_url = serializers.SerializerMethodField()
+    preview_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Message
@@ -20,6 +25,11 @@ class MessageSerializer(serializers.ModelSerializer):
             "content",
             "file",
             "file_url",
+            "download_url",
+            "thumb_url",
+            "preview_url",
+            "image_width",
+            "image_height",
             "message_type",
             "timestamp",
             "is_edited",
@@ -43,6 +53,31 @@ class MessageSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.file.url) if request else obj.file.url
         return None
 
+    def _message_url(self, name, obj):
+        url = reverse(name, args=[obj.id])
+        request = self.context.get("request")
+        if settings.DEBUG or not request:
+            return url
+        return request.build_absolute_uri(url)
+
+    def get_download_url(self, obj):
+        """URL de descarga por id del mensaje (Range / ETag)."""
+        if obj.file:
+            return self._message_url("message_file_download", obj)
+        return None
+
+    def get_thumb_url(self, obj):
+        """Miniatura WebP (solo imágenes con derivados generados)."""
+        if obj.message_type == "image" and obj.thumbnail:
+            return self._message_url("message_thumbnail", obj)
+        return None
+
+    def get_preview_url(self, obj):
+        """Vista previa WebP de tamaño medio."""
+        if obj.message_type == "image" and obj.preview_image:
+            return self._message_url("message_preview", obj)
+        return None
+
     def to_representation(self, instance):
         """
         Si el mensaje está borrado, oculta el contenido y el archivo.
@@ -52,6 +87,9 @@ class MessageSerializer(serializers.ModelSerializer):
             ret['content'] = "Este mensaje fue eliminado."
             ret['file'] = None
             ret['file_url'] = None
+            ret['download_url'] = None
+            ret['thumb_url'] = None
+            ret['preview_url'] = None
             ret['message_type'] = 'text' # Se convierte en un mensaje de texto simple
         return ret
 
@@ -99,3 +137,56 @@ class ChatRoomSerializer(serializers.ModelSerializer):
                 "role": role_value,
             })
         return participants_data
+
+
+# 3. SERIALIZERS DEL CHAT GRUPAL
+# ============================================================
+def validate_group_member_ids(value):
+    """Solo agentes y administradores pueden pertenecer a un grupo."""
+    ids = list(dict.fromkeys(value))
+    valid = set(
+        get_user_model().objects.filter(
+            id__in=ids, rol__tipo_base__in=["agente", "admin"]
+        ).values_list("id", flat=True)
+    )
+    invalid = [i for i in ids if i not in valid]
+    if invalid:
+        raise serializers.ValidationError(
+            f"Usuarios inválidos o sin rol de agente/admin: {invalid}"
+        )
+    return ids
+
+
+class GroupChatCreateSerializer(serializers.Serializer):
+    name = serializers.SlugField(max_length=100)
+    description = serializers.CharField(required=False, allow_blank=True)
+    members = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+
+    def validate_name(self, value):
+        if GroupChat.objects.filter(name=value).exists():
+            raise serializers.ValidationError("Ya existe un grupo con ese nombre.")
+        return value
+
+    def validate_members(self, value):
+        return validate_group_member_ids(value)
+
+
+class GroupMembersAddSerializer(serializers.Serializer):
+    user_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    role = serializers.ChoiceField(
+        choices=GroupMembership.ROLE_CHOICES, default=GroupMembership.ROLE_MEMBER
+    )
+
+    def validate_user_ids(self, value):
+        return validate_group_member_ids(value)
+
+
+class GroupMembershipSerializer(serializers.ModelSerializer):
+    user_id = serializers.IntegerField(source="user.id", read_only=True)
+    username = serializers.CharField(source="user.username", read_only=True)
+
+    class Meta:
+        model = GroupMembership
+        fields = ["user_id", "username", "role", "joined_at"]
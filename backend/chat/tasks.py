@@ -0,0 +1,35 @@
+# chat/tasks.py
+import logging
+
+from celery import shared_task
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def generar_derivados_imagen(message_id, force=False):
+    """Genera miniatura y vista previa WebP de un mensaje de imagen."""
+    from .images import generar_derivados
+    from .models import Message
+
+    message = Message.objects.filter(id=message_id).first()
+    if not message:
+        return f"Mensaje {message_id} no existe"
+    generado = generar_derivados(message, force=force)
+    return f"Derivados del mensaje {message_id}: {'generados' if generado else 'omitidos'}"
+
+
+def encolar_derivados_imagen(message_id):
+    """
+    Encola la generación al confirmar la transacción.
+    Si Celery no está disponible, se genera en el mismo proceso.
+    """
+    def _encolar():
+        try:
+            generar_derivados_imagen.delay(message_id)
+        except Exception as e:
+            logger.warning(f"Celery no disponible, generando derivados en línea: {e}")
+            generar_derivados_imagen(message_id)
+
+    transaction.on_commit(_encolar)
@@ -1,3 +1,279 @@
-from django.test import TestCase
+import asyncio
+import shutil
+import tempfile
+from io import BytesIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from users.models import Rol
+from .models import GroupChat, GroupMembership, Message
+from .images import THUMB_SIZE, generar_derivados
+from .serializers import MessageSerializer
+from .typing import TypingThrottle, typing_metrics
+
+User = get_user_model()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TypingThrottleTests(SimpleTestCase):
+    """Throttle / coalescing del indicador "escribiendo..."."""
+
+    def setUp(self):
+        cache.clear()
+        self.published = []
+        self.clock = FakeClock()
+
+    async def publish(self, handler):
+        self.published.append(handler)
+
+    def make_throttle(self, timeout=60):
+        return TypingThrottle(self.publish, throttle=3, timeout=timeout, clock=self.clock)
+
+    async def test_typing_se_publica_una_vez_por_intervalo(self):
+        throttle = self.make_throttle()
+        for _ in range(10):
+            await throttle.typing()
+        self.assertEqual(self.published, ["group_typing"])
+
+        self.clock.now = 3.5
+        await throttle.typing()
+        self.assertEqual(self.published, ["group_typing", "group_typing"])
+        await throttle.close()
+
+    async def test_stop_typing_solo_si_hubo_typing(self):
+        throttle = self.make_throttle()
+        await throttle.stop_typing()
+        self.assertEqual(self.published, [])
+
+        await throttle.typing()
+        await throttle.stop_typing()
+        await throttle.stop_typing()
+        self.assertEqual(self.published, ["group_typing", "group_stop_typing"])
+        await throttle.close()
+
+    async def test_stop_typing_automatico_por_timeout(self):
+        throttle = self.make_throttle(timeout=0.01)
+        await throttle.typing()
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.published, ["group_typing", "group_stop_typing"])
+        self.assertFalse(throttle.is_typing)
+        await throttle.close()
+
+    async def test_close_publica_stop_y_guarda_metricas(self):
+        throttle = self.make_throttle()
+        for _ in range(5):
+            await throttle.typing()
+        await throttle.close()
+
+        self.assertEqual(self.published, ["group_typing", "group_stop_typing"])
+        metrics = typing_metrics()
+        self.assertEqual(metrics["recibidos"], 5)
+        self.assertEqual(metrics["publicados"], 2)
+        self.assertEqual(metrics["suprimidos"], 4)
+
+
+class GroupChatMembershipTests(TestCase):
+    """Membresía explícita y paginación por cursor del chat grupal."""
+
+    def setUp(self):
+        rol = Rol.objects.create(nombre_clave="agente_test", nombre_visible="Agente", tipo_base="agente")
+        self.owner = User.objects.create_user(username="owner", password="x", rol=rol)
+        self.member = User.objects.create_user(username="member", password="x", rol=rol)
+        self.outsider = User.objects.create_user(username="outsider", password="x", rol=rol)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_get_no_crea_grupos(self):
+        response = self.client.get("/api/chat/group/no-existe/messages/")
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(GroupChat.objects.filter(name="no-existe").exists())
+
+    def test_crear_grupo_y_solo_miembros_leen(self):
+        response = self.client.post(
+            "/api/chat/group/", {"name": "soporte", "members": [self.member.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        group = GroupChat.objects.get(name="soporte")
+        self.assertEqual(
+            GroupMembership.objects.get(group=group, user=self.owner).role, GroupMembership.ROLE_OWNER
+        )
+
+        self.client.force_authenticate(self.outsider)
+        response = self.client.get("/api/chat/group/soporte/messages/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_historial_paginado_por_cursor(self):
+        group = GroupChat.objects.create(name="rrhh")
+        GroupMembership.objects.create(group=group, user=self.owner, role=GroupMembership.ROLE_OWNER)
+        ids = [
+            Message.objects.create(group=group, sender=self.owner, content=f"m{i}").id
+            for i in range(5)
+        ]
+
+        response = self.client.get("/api/chat/group/rrhh/messages/?limit=2")
+        self.assertEqual([m["id"] for m in response.data["messages"]], ids[3:])
+        self.assertTrue(response.data["has_more"])
+
+        cursor = response.data["next_cursor"]
+        response = self.client.get(f"/api/chat/group/rrhh/messages/?limit=2&before={cursor}")
+        self.assertEqual([m["id"] for m in response.data["messages"]], ids[1:3])
+
+        response = self.client.get(f"/api/chat/group/rrhh/messages/?limit=2&before={ids[1]}")
+        self.assertEqual([m["id"] for m in response.data["messages"]], ids[:1])
+        self.assertIsNone(response.data["next_cursor"])
+
+    def test_nuevos_agentes_entran_al_grupo_por_defecto(self):
+        default = GroupChat.objects.get(name=GroupChat.DEFAULT_NAME)
+        self.assertTrue(GroupMembership.objects.filter(group=default, user=self.member).exists())
+
+        rol = Rol.objects.create(nombre_clave="solicitante_test", nombre_visible="Solicitante")
+        usuario = User.objects.create_user(username="nuevo", password="x", rol=rol)
+        self.assertFalse(GroupMembership.objects.filter(group=default, user=usuario).exists())
+
+        rol.tipo_base = "admin"
+        rol.save()
+        self.assertEqual(
+            GroupMembership.objects.get(group=default, user=usuario).role, GroupMembership.ROLE_ADMIN
+        )
+
+    def test_quitar_miembro_cierra_su_socket(self):
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+
+        group = GroupChat.objects.get(name=GroupChat.DEFAULT_NAME)
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(group.channel_group_name, channel)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            GroupMembership.objects.get(group=group, user=self.member).delete()
+        event = async_to_sync(layer.receive)(channel)
+        self.assertEqual(event, {"type": "membership_revoked", "user_id": self.member.id})
+
+
+class MessageFileDownloadTests(TestCase):
+    """Descarga por id de mensaje con Range / ETag."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+
+        rol = Rol.objects.create(nombre_clave="agente_test", nombre_visible="Agente", tipo_base="agente")
+        self.member = User.objects.create_user(username="member", password="x", rol=rol)
+        self.outsider = User.objects.create_user(username="outsider", password="x", rol=rol)
+        group = GroupChat.objects.create(name="rrhh")
+        GroupMembership.objects.create(group=group, user=self.member)
+        self.message = Message.objects.create(
+            group=group, sender=self.member, message_type="file",
+            file=SimpleUploadedFile("datos.txt", b"0123456789"),
+        )
+        self.url = f"/api/chat/messages/{self.message.id}/file/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def test_descarga_completa_y_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=20-")
+        self.assertEqual(response.status_code, 416)
+
+    async def test_streaming_por_bloques_bajo_asgi(self):
+        from unittest import mock
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(self.member)}"}
+        with mock.patch("chat.downloads.STREAM_CHUNK_SIZE", 4):
+            response = await self.async_client.get(self.url, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            bloques = [bloque async for bloque in response.streaming_content]
+        self.assertEqual(bloques, [b"0123", b"4567", b"89"])
+        self.assertEqual(response["Content-Length"], "10")
+
+    def test_no_miembro_no_descarga(self):
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class ImageDerivativesTests(TestCase):
+    """Miniatura y vista previa WebP de imágenes del chat."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        rol = Rol.objects.create(nombre_clave="agente_test", nombre_visible="Agente", tipo_base="agente")
+        self.user = User.objects.create_user(username="member", password="x", rol=rol)
+        self.group = GroupChat.objects.create(name="rrhh")
+
+    def crear_imagen(self, size=(2000, 1000)):
+        buffer = BytesIO()
+        Image.new("RGB", size, "red").save(buffer, format="PNG")
+        return Message.objects.create(
+            group=self.group, sender=self.user, message_type="image",
+            file=SimpleUploadedFile("foto.png", buffer.getvalue()),
+        )
+
+    def test_genera_derivados_y_dimensiones(self):
+        message = self.crear_imagen()
+        self.assertTrue(generar_derivados(message))
+
+        message.refresh_from_db()
+        self.assertEqual((message.image_width, message.image_height), (2000, 1000))
+        with message.thumbnail.open("rb") as f, Image.open(f) as thumb:
+            self.assertEqual(thumb.format, "WEBP")
+            self.assertEqual(thumb.size, (THUMB_SIZE[0], THUMB_SIZE[0] // 2))
+
+        data = MessageSerializer(message).data
+        self.assertEqual(data["thumb_url"], f"/api/chat/messages/{message.id}/thumb/")
+
+        # Segunda llamada sin force: no regenera
+        self.assertFalse(generar_derivados(message))
+
+    def test_backfill_sin_broadcast(self):
+        from unittest import mock
+
+        message = self.crear_imagen()
+        with mock.patch("chat.models.async_to_sync") as enviar:
+            self.assertTrue(generar_derivados(message, broadcast=False))
+        enviar.assert_not_called()
+        message.refresh_from_db()
+        self.assertTrue(message.thumbnail)
+        self.assertEqual((message.image_width, message.image_height), (2000, 1000))
+
+    def test_bomba_de_descompresion_se_omite(self):
+        from unittest import mock
+
+        message = self.crear_imagen()
+        with mock.patch("chat.images.Image.open", side_effect=Image.DecompressionBombError("bomba")):
+            self.assertFalse(generar_derivados(message))
@@ -0,0 +1,146 @@
+# chat/typing.py
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+METRICS_CACHE_PREFIX = "chat_typing_metrics"
+METRIC_KEYS = ("recibidos", "publicados", "suprimidos", "auto_stop")
+
+# Cada cuántos frames recibidos se vuelcan los contadores al cache
+METRICS_FLUSH_EVERY = 25
+
+
+class TypingThrottle:
+    """
+    Estado del indicador "escribiendo..." de UNA conexión WebSocket.
+
+    - Publica como máximo un 'typing' por usuario cada CHAT_TYPING_THROTTLE_SECONDS;
+      los frames intermedios se descartan (coalescing).
+    - 'stop_typing' solo se publica si antes se publicó 'typing'.
+    - Si el cliente deja de enviar frames, el servidor publica 'stop_typing'
+      después de CHAT_TYPING_TIMEOUT_SECONDS.
+
+    `publish` es una corrutina que recibe el nombre del handler del consumer
+    ('group_typing' o 'group_stop_typing') y hace el group_send real.
+    """
+
+    def __init__(self, publish, throttle=None, timeout=None, clock=time.monotonic):
+        self._publish = publish
+        self.throttle = throttle if throttle is not None else getattr(
+            settings, "CHAT_TYPING_THROTTLE_SECONDS", 3
+        )
+        self.timeout = timeout if timeout is not None else getattr(
+            settings, "CHAT_TYPING_TIMEOUT_SECONDS", 6
+        )
+        self._clock = clock
+        self.is_typing = False
+        self._last_publish = None
+        self._timer = None
+        self._pending = dict.fromkeys(METRIC_KEYS, 0)
+
+    async def typing(self):
+        """Procesa un frame 'typing'. Devuelve True si se publicó."""
+        self._count("recibidos")
+        self._schedule_auto_stop()
+
+        now = self._clock()
+        if self.is_typing and now - self._last_publish < self.throttle:
+            self._count("suprimidos")
+            await self._maybe_flush()
+            return False
+
+        self.is_typing = True
+        self._last_publish = now
+        await self._publish("group_typing")
+        self._count("publicados")
+        await self._maybe_flush()
+        return True
+
+    async def stop_typing(self):
+        """Procesa un frame 'stop_typing'. Devuelve True si se publicó."""
+        self._count("recibidos")
+        self._cancel_auto_stop()
+
+        if not self.is_typing:
+            self._count("suprimidos")
+            await self._maybe_flush()
+            return False
+
+        await self._stop()
+        await self._maybe_flush()
+        return True
+
+    async def close(self):
+        """Llamar en disconnect(): cierra el indicador pendiente y vuelca métricas."""
+        self._cancel_auto_stop()
+        if self.is_typing:
+            await self._stop()
+        await self.flush_metrics()
+
+    # --- Internos ---
+
+    async def _stop(self):
+        self.is_typing = False
+        self._last_publish = None
+        await self._publish("group_stop_typing")
+        self._count("publicados")
+
+    def _schedule_auto_stop(self):
+        self._cancel_auto_stop()
+        self._timer = asyncio.ensure_future(self._auto_stop())
+
+    def _cancel_auto_stop(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+    async def _auto_stop(self):
+        await asyncio.sleep(self.timeout)
+        self._timer = None
+        if self.is_typing:
+            self._count("auto_stop")
+            await self._stop()
+
+    def _count(self, key):
+        self._pending[key] += 1
+
+    async def _maybe_flush(self):
+        if self._pending["recibidos"] >= METRICS_FLUSH_EVERY:
+            await self.flush_metrics()
+
+    async def flush_metrics(self):
+        """Suma los contadores locales a los globales (cache compartido)."""
+        pending, self._pending = self._pending, dict.fromkeys(METRIC_KEYS, 0)
+        try:
+            for key, delta in pending.items():
+                if not delta:
+                    continue
+                cache_key = f"{METRICS_CACHE_PREFIX}:{key}"
+                try:
+                    await cache.aincr(cache_key, delta)
+                except ValueError:
+                    # La clave aún no existe
+                    await cache.aset(cache_key, delta, timeout=None)
+        except Exception as e:
+            logger.warning(f"No se pudieron guardar las métricas de typing: {e}")
+
+
+def typing_metrics():
+    """
+    Devuelve los contadores globales del indicador "escribiendo...".
+    `suprimidos` = publicaciones al channel layer que se ahorraron.
+    """
+    keys = [f"{METRICS_CACHE_PREFIX}:{key}" for key in METRIC_KEYS]
+    values = cache.get_many(keys)
+    data = {key: values.get(cache_key, 0) for key, cache_key in zip(METRIC_KEYS, keys)}
+
+    recibidos = data["recibidos"]
+    data["porcentaje_ahorro"] = (
+        round(data["suprimidos"] / recibidos * 100, 2) if recibidos else 0
+    )
+    return data
@@ -5,14 +5,20 @@ from .views import (
     ChatRoomDetailView,
     ChatRoomMessagesView,
     FileDownloadView,
+    MessageFileDownloadView,
+    MessageImageDerivativeView,
     SendMessageView,
     GroupChatMessagesView,
     GroupChatSendMessageView,
     GroupChatInfoView,
+    GroupChatListCreateView,
+    GroupChatMembersView,
+    GroupChatMemberDetailView,
     StartDirectChatView,
     MessageDetailView,
     RepairTicketChatsView,
     AgentListView,
+    TypingMetricsView,
 )
 
 urlpatterns = [
@@ -52,11 +58,29 @@ urlpatterns = [
     # ===============================
     #   CHAT GRUPAL (RRHH / AGENTES)
     # ===============================
+    # Listar mis grupos / crear grupo (la creación solo ocurre aquí)
+    path("group/", GroupChatListCreateView.as_view(), name="group_chat_list_create"),
+
     path("group/<str:group_name>/messages/", GroupChatMessagesView.as_view(), name="group_chat_messages"),
 
     path("group/<str:group_name>/send/", GroupChatSendMessageView.as_view(), name="group_chat_send"),
 
     path("group/<str:group_name>/info/", GroupChatInfoView.as_view(), name="group_chat_info"),
+
+    path("group/<str:group_name>/members/", GroupChatMembersView.as_view(), name="group_chat_members"),
+
+    path("group/<str:group_name>/members/<int:user_id>/", GroupChatMemberDetailView.as_view(), name="group_chat_member_detail"),
+
+    # Métricas del indicador "escribiendo..." (solo admin)
+    path("metrics/typing/", TypingMetricsView.as_view(), name="typing_metrics"),
+
+    # Descarga del archivo de un mensaje por id (Range / ETag / X-Accel-Redirect)
+    path("messages/<int:pk>/file/", MessageFileDownloadView.as_view(), name="message_file_download"),
+
+    # Miniatura / vista previa WebP de imágenes
+    path("messages/<int:pk>/thumb/", MessageImageDerivativeView.as_view(), {"variant": "thumb"}, name="message_thumbnail"),
+    path("messages/<int:pk>/preview/", MessageImageDerivativeView.as_view(), {"variant": "preview"}, name="message_preview"),
+
     # chat/urls.py
     path('files/<str:file_path>/', FileDownloadView.as_view(), name='file_download'),
 ]
@@ -5,18 +5,27 @@ from django.utils import timezone
 from rest_framework import generics, permissions, serializers
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.conf import settings
-from django.views.static import serve
 import os
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Count, Q
 
 
-from .models import ChatRoom, Message, GroupChat
-from .serializers import ChatRoomSerializer, MessageSerializer
-from .notification_utils import create_notifications_for_message
+from .models import ChatRoom, Message, GroupChat, GroupMembership
+from .serializers import (
+    ChatRoomSerializer,
+    MessageSerializer,
+    GroupChatCreateSerializer,
+    GroupMembershipSerializer,
+    GroupMembersAddSerializer,
+)
+from .notification_utils import create_notifications_for_message, notify_membership_change
 from .permissions import IsAgentOrAdmin
+from .typing import typing_metrics
+from .downloads import serve_file, user_can_access_message
+from adminpanel.permissions import IsAdminRole
 from tickets.models import Ticket
+from tickets.services.upload_service import UploadService
 
 User = get_user_model()
 
@@ -171,6 +180,11 @@ class SendMessageView(APIView):
         if not content and not file:
             return Response({"error": "El mensaje no puede estar vacío."}, status=400)
 
+        if file:
+            error = UploadService.validar_tamano(file.size)
+            if error:
+                return Response({"error": error}, status=413)
+
         # 5. Determinar tipo automáticamente si hay archivo
         if file:
             ext = file.name.lower()
@@ -254,47 +268,152 @@ class MessageDetailView(APIView):
 #                           CHAT GRUPAL RRHH
 # =============================================================================
 
-#  LISTAR MENSAJES DEL CHAT GRUPAL
+#  CREAR / LISTAR GRUPOS (LA CREACIÓN ES EXPLÍCITA, LOS GET NUNCA ESCRIBEN)
 
-class GroupChatMessagesView(APIView):
+GROUP_MESSAGES_PAGE_SIZE = 50
+GROUP_MESSAGES_MAX_PAGE_SIZE = 100
+
+
+def get_group_and_membership(user, group_name):
+    """
+    Devuelve (group_chat, membership). membership es None si el usuario
+    no pertenece al grupo. Lanza Http404 si el grupo no existe.
+    """
+    group_chat = get_object_or_404(GroupChat, name=group_name)
+    membership = GroupMembership.objects.filter(group=group_chat, user=user).first()
+    return group_chat, membership
+
+
+def is_system_admin(user):
+    return bool(user.rol and user.rol.tipo_base == 'admin')
+
+
+class GroupChatListCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsAgentOrAdmin]
 
-    def get(self, request, group_name):
-        try:
-            group_chat, _ = GroupChat.objects.get_or_create(name=group_name)
+    def get(self, request):
+        """Grupos a los que pertenece el usuario."""
+        memberships = GroupMembership.objects.filter(
+            user=request.user
+        ).select_related("group").annotate(
+            total_members=Count("group__memberships")
+        ).order_by("group__name")
+
+        return Response([
+            {
+                "id": m.group.id,
+                "name": m.group.name,
+                "description": m.group.description,
+                "created_at": m.group.created_at,
+                "my_role": m.role,
+                "total_members": m.total_members,
+            }
+            for m in memberships
+        ])
 
-            messages = Message.objects.filter(
-                group=group_chat
-            ).order_by("timestamp")[:50]
+    def post(self, request):
+        """
+        Crea un grupo. El creador queda como 'owner'.
+        Body: { "name": "...", "description": "...", "members": [ids] }
+        """
+        serializer = GroupChatCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            group_chat = GroupChat.objects.create(
+                name=serializer.validated_data["name"],
+                description=serializer.validated_data.get("description", ""),
+            )
+            GroupMembership.objects.create(
+                group=group_chat, user=request.user, role=GroupMembership.ROLE_OWNER
+            )
+            member_ids = set(serializer.validated_data.get("members", [])) - {request.user.id}
+            GroupMembership.objects.bulk_create([
+                GroupMembership(group=group_chat, user_id=user_id)
+                for user_id in member_ids
+            ])
 
-            serializer = MessageSerializer(messages, many=True, context={"request": request})
+        notify_membership_change(group_chat, [request.user.id, *member_ids], joined=True)
 
-            return Response({
-                "group": group_chat.name,
-                "messages": serializer.data,
-                "total_messages": len(messages) # Optimización: Usar len() en lugar de .count()
-            })
+        return Response({
+            "message": "Grupo creado exitosamente",
+            "id": group_chat.id,
+            "name": group_chat.name,
+            "total_members": len(member_ids) + 1,
+        }, status=201)
 
-        except Exception as e:
-            return Response({"error": f"Error al obtener mensajes: {str(e)}"}, status=500)
 
+#  LISTAR MENSAJES DEL CHAT GRUPAL (PAGINADO POR CURSOR)
+
+class GroupChatMessagesView(APIView):
+    """
+    Historial del grupo, del más reciente hacia atrás.
+    - ?before=<id>  → mensajes anteriores a ese id (cursor)
+    - ?limit=<n>    → tamaño de página (máx. 100)
+    Cada página se devuelve en orden cronológico; `next_cursor` es el
+    valor a enviar en `before` para la página siguiente (None si no hay más).
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAgentOrAdmin]
+
+    def get(self, request, group_name):
+        group_chat, membership = get_group_and_membership(request.user, group_name)
+        if not membership:
+            return Response({"error": "No eres miembro de este grupo"}, status=403)
+
+        try:
+            limit = min(int(request.query_params.get("limit", GROUP_MESSAGES_PAGE_SIZE)),
+                        GROUP_MESSAGES_MAX_PAGE_SIZE)
+            before = request.query_params.get("before")
+            before = int(before) if before else None
+        except ValueError:
+            return Response({"error": "Parámetros de paginación inválidos"}, status=400)
+        if limit < 1:
+            return Response({"error": "Parámetros de paginación inválidos"}, status=400)
+
+        messages = Message.objects.filter(group=group_chat).select_related("sender")
+        if before:
+            messages = messages.filter(id__lt=before)
+
+        # Se pide un registro extra para saber si hay más páginas sin hacer COUNT
+        page = list(messages.order_by("-id")[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+        page.reverse()
+
+        serializer = MessageSerializer(page, many=True, context={"request": request})
+
+        return Response({
+            "group": group_chat.name,
+            "messages": serializer.data,
+            "total_messages": len(page),
+            "has_more": has_more,
+            "next_cursor": page[0].id if has_more else None,
+        })
 
-#  ENVIAR MENSAJE AL CHAT GRUPAL (SOLO RRHH / AGENTES)
+
+#  ENVIAR MENSAJE AL CHAT GRUPAL (SOLO MIEMBROS)
 
 
 class GroupChatSendMessageView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsAgentOrAdmin]
 
     def post(self, request, group_name):
-        try:
-            group_chat, _ = GroupChat.objects.get_or_create(name=group_name)
+        group_chat, membership = get_group_and_membership(request.user, group_name)
+        if not membership:
+            return Response({"error": "No eres miembro de este grupo"}, status=403)
 
+        try:
             message_content = request.data.get("message") or request.data.get("content")
             file = request.FILES.get("file")
 
             if not message_content and not file:
                 return Response({"error": "El mensaje no puede estar vacío"}, status=400)
 
+            if file:
+                error = UploadService.validar_tamano(file.size)
+                if error:
+                    return Response({"error": error}, status=413)
+
             # determinar tipo
             if file:
                 ext = file.name.lower()
@@ -314,7 +433,7 @@ class GroupChatSendMessageView(APIView):
                 message_type=message_type
             )
 
-            # Crear notificaciones para los destinatarios
+            # Crear notificaciones para los miembros
             create_notifications_for_message(message)
 
             serializer = MessageSerializer(message, context={"request": request})
@@ -334,51 +453,175 @@ class GroupChatInfoView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsAgentOrAdmin]
 
     def get(self, request, group_name):
-        try:
-            group_chat, created = GroupChat.objects.get_or_create(name=group_name)
-            message_count = Message.objects.filter(group=group_chat).count()
+        group_chat, membership = get_group_and_membership(request.user, group_name)
+        if not membership and not is_system_admin(request.user):
+            return Response({"error": "No eres miembro de este grupo"}, status=403)
 
-            return Response({
-                "group_name": group_chat.name,
-                "created_at": group_chat.created_at,
-                "total_messages": message_count,
-                "is_new": created
-            })
+        counts = GroupChat.objects.filter(id=group_chat.id).aggregate(
+            total_messages=Count("messages", distinct=True),
+            total_members=Count("memberships", distinct=True),
+        )
+
+        return Response({
+            "group_name": group_chat.name,
+            "description": group_chat.description,
+            "created_at": group_chat.created_at,
+            "total_messages": counts["total_messages"],
+            "total_members": counts["total_members"],
+            "my_role": membership.role if membership else None,
+            "is_new": False,
+        })
 
-        except Exception as e:
-            return Response({"error": f"Error al obtener información: {str(e)}"}, status=500)
+
+#  MIEMBROS DEL CHAT GRUPAL
+
+class GroupChatMembersView(APIView):
+    """
+    GET  → lista de miembros (solo miembros).
+    POST → agrega miembros { "user_ids": [..], "role": "member|admin" }
+           (solo owner/admin del grupo o administradores del sistema).
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAgentOrAdmin]
+
+    def get(self, request, group_name):
+        group_chat, membership = get_group_and_membership(request.user, group_name)
+        if not membership and not is_system_admin(request.user):
+            return Response({"error": "No eres miembro de este grupo"}, status=403)
+
+        memberships = group_chat.memberships.select_related("user").order_by("joined_at")
+        return Response(GroupMembershipSerializer(memberships, many=True).data)
+
+    def post(self, request, group_name):
+        group_chat, membership = get_group_and_membership(request.user, group_name)
+        if not (membership and membership.can_manage) and not is_system_admin(request.user):
+            return Response({"error": "No tienes permisos para administrar este grupo"}, status=403)
+
+        serializer = GroupMembersAddSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        role = serializer.validated_data["role"]
+        if role == GroupMembership.ROLE_OWNER:
+            return Response({"error": "Solo puede existir un propietario"}, status=400)
+
+        existing = set(
+            group_chat.memberships.values_list("user_id", flat=True)
+        )
+        new_ids = [uid for uid in serializer.validated_data["user_ids"] if uid not in existing]
+        GroupMembership.objects.bulk_create([
+            GroupMembership(group=group_chat, user_id=user_id, role=role)
+            for user_id in new_ids
+        ])
+
+        notify_membership_change(group_chat, new_ids, joined=True)
+
+        return Response({
+            "message": f"Se agregaron {len(new_ids)} miembros",
+            "added": new_ids,
+        }, status=201)
+
+
+class GroupChatMemberDetailView(APIView):
+    """DELETE → quita un miembro (owner/admin del grupo, o el propio usuario para salir)."""
+    permission_classes = [permissions.IsAuthenticated, IsAgentOrAdmin]
+
+    def delete(self, request, group_name, user_id):
+        group_chat, membership = get_group_and_membership(request.user, group_name)
+        target = get_object_or_404(GroupMembership, group=group_chat, user_id=user_id)
+
+        is_self = target.user_id == request.user.id
+        can_manage = (membership and membership.can_manage) or is_system_admin(request.user)
+        if not is_self and not can_manage:
+            return Response({"error": "No tienes permisos para administrar este grupo"}, status=403)
+
+        if target.role == GroupMembership.ROLE_OWNER:
+            return Response({"error": "No se puede quitar al propietario del grupo"}, status=400)
+
+        target.delete()
+        notify_membership_change(group_chat, [user_id], joined=False)
+
+        return Response(status=204)
 
 
 #  DESCARGA DE ARCHIVOS (PROTEGIDA)
 
+def download_message_file(request, message):
+    """Valida permisos (cacheados) y entrega el archivo del mensaje."""
+    if not message.file or message.is_deleted:
+        return Response({"error": "Archivo no encontrado"}, status=404)
+
+    if not user_can_access_message(request.user, message):
+        return Response({"error": "No tienes permiso para acceder a este archivo."}, status=403)
+
+    response = serve_file(
+        request, message.file,
+        as_attachment=request.query_params.get("download") == "1",
+    )
+    if response is None:
+        return Response({"error": "Archivo no encontrado"}, status=404)
+    return response
+
+
+class MessageFileDownloadView(APIView):
+    """
+    Descarga el archivo de un mensaje por su id (PK indexada).
+    Soporta Range/ETag o delega la transferencia a nginx (X-Accel-Redirect).
+    ?download=1 fuerza Content-Disposition: attachment.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        message = get_object_or_404(
+            Message.objects.only("id", "room_id", "group_id", "file", "is_deleted"), pk=pk
+        )
+        return download_message_file(request, message)
+
+
+class MessageImageDerivativeView(APIView):
+    """
+    Miniatura (thumb) o vista previa (preview) WebP de un mensaje de imagen.
+    Si aún no se generó, entrega el archivo original en línea (mismos
+    permisos que la descarga del mensaje).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, variant):
+        message = get_object_or_404(
+            Message.objects.only(
+                "id", "room_id", "group_id", "file", "thumbnail", "preview_image", "is_deleted"
+            ),
+            pk=pk
+        )
+        derivative = message.thumbnail if variant == "thumb" else message.preview_image
+        if not derivative:
+            return download_message_file(request, message)
+
+        if message.is_deleted:
+            return Response({"error": "Archivo no encontrado"}, status=404)
+        if not user_can_access_message(request.user, message):
+            return Response({"error": "No tienes permiso para acceder a este archivo."}, status=403)
+
+        response = serve_file(request, derivative)
+        if response is None:
+            return download_message_file(request, message)
+        # Los derivados no cambian: el navegador puede cachearlos
+        response["Cache-Control"] = "private, max-age=86400"
+        return response
+
+
 class FileDownloadView(APIView):
+    """Ruta antigua por path (/media/chat_files/...). Usa el índice sobre `file`."""
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, file_path):
         # Construir la ruta relativa del archivo como se guarda en la BD
         db_file_path = os.path.join('chat_files', file_path)
 
-        # Buscar el mensaje que contiene este archivo
-        message = get_object_or_404(Message, file=db_file_path)
-
-        # Validar permisos
-        user_can_access = False
-        if message.room:
-            # Si el mensaje está en un ChatRoom, verificar si el usuario es participante
-            if message.room.participants.filter(id=request.user.id).exists():
-                user_can_access = True
-        elif message.group:
-            # Si el mensaje está en un GroupChat, verificar si el usuario es agente/admin
-            if request.user.rol and request.user.rol.tipo_base in ['agente', 'admin']:
-                user_can_access = True
-
-        if not user_can_access:
-            return Response({"error": "No tienes permiso para acceder a este archivo."}, status=403)
-
-        # Servir el archivo de forma segura si el usuario tiene permiso
-        if not os.path.exists(os.path.join(settings.MEDIA_ROOT, db_file_path)):
+        message = Message.objects.only(
+            "id", "room_id", "group_id", "file", "is_deleted"
+        ).filter(file=db_file_path).first()
+        if not message:
             return Response({"error": "Archivo no encontrado"}, status=404)
-        return serve(request, file_path, document_root=os.path.join(settings.MEDIA_ROOT, 'chat_files'))
+
+        return download_message_file(request, message)
 
 
 #  VISTA DE REPARACIÓN
@@ -425,3 +668,17 @@ class RepairTicketChatsView(APIView):
             'message': f'Se crearon {len(created_chats)} chat rooms',
             'created_chats': created_chats
         }, status=201)
+
+
+# ============================================================
+#  MÉTRICAS DEL INDICADOR "ESCRIBIENDO..."
+# ============================================================
+class TypingMetricsView(APIView):
+    """
+    Devuelve los contadores de eventos typing/stop_typing:
+    recibidos, publicados, suprimidos (publicaciones ahorradas) y auto_stop.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminRole]
+
+    def get(self, request):
+        return Response(typing_metrics())
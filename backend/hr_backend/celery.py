@@ -14,6 +14,30 @@ app.conf.beat_schedule = {
         'task': 'tickets.tasks.expirar_reasignaciones',  # ← Este es el nombre correcto
         'schedule': crontab(),  # cada minuto
     },
+    'limpiar-subidas-expiradas-cada-hora': {
+        'task': 'tickets.tasks.limpiar_subidas_expiradas',
+        'schedule': crontab(minute=0),
+    },
+    'reconciliar-metricas-tickets-cada-noche': {
+        'task': 'adminpanel.tasks.reconciliar_metricas_tickets',
+        'schedule': crontab(hour=3, minute=15),
+    },
+    'reconstruir-metricas-tickets-cada-semana': {
+        'task': 'adminpanel.tasks.reconstruir_metricas_tickets',
+        'schedule': crontab(hour=4, minute=0, day_of_week='sunday'),
+    },
+    'reconciliar-rendimiento-agentes-cada-noche': {
+        'task': 'adminpanel.tasks.reconciliar_rendimiento_agentes',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'verificar-sla-cada-5-minutos': {
+        'task': 'adminpanel.tasks.verificar_sla',
+        'schedule': crontab(minute='*/5'),
+    },
+    'limpiar-reportes-antiguos-cada-noche': {
+        'task': 'adminpanel.tasks.limpiar_reportes_antiguos',
+        'schedule': crontab(hour=3, minute=45),
+    },
 }
 
 app.conf.timezone = 'America/Guayaquil'
\ No newline at end of file
@@ -0,0 +1,71 @@
+# hr_backend/json_rapido.py
+"""
+JSON rápido para la API y los WebSockets.
+
+Con orjson instalado, las respuestas de DRF, el parseo de los cuerpos JSON y
+los mensajes de los consumers se codifican con orjson; sin orjson (o ante
+un valor que orjson no admite, p. ej. enteros de más de 64 bits) se usa el
+json estándar con el mismo resultado.
+
+Tipos no nativos (Decimal, timedelta, UUID, QuerySet, ...) se convierten
+como en el JSONEncoder de DRF; los datetime en UTC terminan en 'Z', igual
+que en DRF.
+"""
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+OPCIONES = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+_convertir = JSONEncoder().default
+
+
+def dumps_bytes(datos):
+    """JSON compacto en UTF-8 (bytes)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(datos, default=_convertir, option=OPCIONES)
+        except orjson.JSONEncodeError:
+            # El json estándar da el mismo resultado o el TypeError de siempre
+            pass
+    return json.dumps(
+        datos, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def dumps(datos):
+    """JSON como texto, para send(text_data=...) de los consumers."""
+    return dumps_bytes(datos).decode('utf-8')
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    """JSONRenderer de DRF con orjson (mismo JSON compacto y UTF-8)."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Con indentación pedida (?indent / Accept: ...; indent=N) se usa el renderer de DRF
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Igual que DRF: U+2028 / U+2029 escapados (seguros dentro de <script>)
+        return dumps_bytes(data).replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class JSONRapidoParser(JSONParser):
+    """JSONParser de DRF con orjson."""
+    renderer_class = JSONRapidoRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -118,6 +118,28 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Caché compartida (mismo Redis que channels/celery, base 1)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get('REDIS_CACHE_URL', 'redis://redis:6379/1'),
+        "KEY_PREFIX": "hr",
+    }
+}
+
+#  Dashboard: caché de métricas (ver adminpanel/dashboard_cache.py)
+DASHBOARD_CACHE_TTL = 60          # segundos en que una entrada se sirve como fresca
+DASHBOARD_CACHE_STALE_TTL = 600   # segundos en que una entrada vencida aún puede servirse
+SERIES_CACHE_TTL = 3600            # segundos que se cachean los periodos cerrados de las series
+METRICAS_RECONCILIACION_DIAS = int(os.environ.get('METRICAS_RECONCILIACION_DIAS', 2))  # días que reconstruye la reconciliación nocturna de rollups
+
+#  Reportes: días que se conservan los jobs y archivos de media/reportes
+REPORTES_RETENCION_DIAS = 7
+
+#  Chat: indicador "escribiendo..." (ver chat/typing.py)
+CHAT_TYPING_THROTTLE_SECONDS = 3   # máx. un broadcast de 'typing' por usuario cada N segundos
+CHAT_TYPING_TIMEOUT_SECONDS = 6    # 'stop_typing' automático si el cliente deja de enviar
+
 
 DATABASES = {
     'default': {
@@ -138,6 +160,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # JSON con orjson si está instalado (hr_backend/json_rapido.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'hr_backend.json_rapido.JSONRapidoRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'hr_backend.json_rapido.JSONRapidoParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
@@ -169,6 +201,15 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+#  Descarga de archivos del chat (chat/downloads.py)
+#  None → streaming desde Django (Range/ETag). Solo activar si un proxy que
+#  atiende /api/ procesa la cabecera: 'X-Accel-Redirect' en nginx (location
+#  interna CHAT_FILES_ACCEL_PREFIX → MEDIA_ROOT) o 'X-Sendfile' en
+#  Apache/lighttpd. El nginx de frontend/ no proxea la API (el frontend
+#  llama a :8000), así que en este despliegue queda en None.
+CHAT_FILES_SENDFILE_HEADER = os.environ.get('CHAT_FILES_SENDFILE_HEADER') or None
+CHAT_FILES_ACCEL_PREFIX = '/protected-media/'
+
 
 #  Celery + Redis
 CELERY_BROKER_URL = 'redis://redis:6379/0'
@@ -191,6 +232,30 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'tickets.tasks_auto_assign.asignar_tickets_pendientes',
         'schedule': 60,
     },
+    'limpiar-subidas-expiradas-cada-hora': {
+        'task': 'tickets.tasks.limpiar_subidas_expiradas',
+        'schedule': 3600,
+    },
+    'reconciliar-metricas-tickets-cada-noche': {
+        'task': 'adminpanel.tasks.reconciliar_metricas_tickets',
+        'schedule': 86400,
+    },
+    'reconstruir-metricas-tickets-cada-semana': {
+        'task': 'adminpanel.tasks.reconstruir_metricas_tickets',
+        'schedule': 604800,
+    },
+    'reconciliar-rendimiento-agentes-cada-noche': {
+        'task': 'adminpanel.tasks.reconciliar_rendimiento_agentes',
+        'schedule': 86400,
+    },
+    'verificar-sla-cada-5-minutos': {
+        'task': 'adminpanel.tasks.verificar_sla',
+        'schedule': 300,
+    },
+    'limpiar-reportes-antiguos-cada-noche': {
+        'task': 'adminpanel.tasks.limpiar_reportes_antiguos',
+        'schedule': 86400,
+    },
 }
 
 # Configuración de Correo (SMTP)
@@ -0,0 +1,47 @@
+# hr_backend/streaming.py
+"""
+Respuestas en streaming que realmente se envían por partes bajo ASGI.
+
+Con Daphne (ASGI), StreamingHttpResponse consume un iterador síncrono
+completo con sync_to_async(list) antes de enviar el primer byte: la
+respuesta entera queda en memoria. Bajo ASGI se entrega un iterador
+asíncrono que pide cada bloque al generador síncrono con sync_to_async;
+bajo WSGI (runserver, pruebas con el cliente síncrono) se usa el iterador
+síncrono tal cual.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+_FIN = object()
+
+
+async def iterar_async(iterable, thread_sensitive=True):
+    """
+    Iterador asíncrono sobre un iterable síncrono, un bloque por llamada.
+
+    thread_sensitive=True (por defecto) ejecuta todo en el hilo síncrono
+    compartido: necesario si el generador usa la conexión a la base de datos
+    (cursores de servidor). Para lecturas de archivos basta con False.
+    """
+    iterador = iter(iterable)
+    siguiente = sync_to_async(next, thread_sensitive=thread_sensitive)
+    try:
+        while True:
+            bloque = await siguiente(iterador, _FIN)
+            if bloque is _FIN:
+                break
+            yield bloque
+    finally:
+        # Cliente desconectado o fin: cerrar el generador (archivo / cursor) en su hilo
+        cerrar = getattr(iterador, 'close', None)
+        if cerrar is not None:
+            await sync_to_async(cerrar, thread_sensitive=thread_sensitive)()
+
+
+def respuesta_streaming(request, iterable, thread_sensitive=True, **kwargs):
+    """StreamingHttpResponse que hace streaming real tanto en ASGI como en WSGI."""
+    request = getattr(request, '_request', request)  # Request de DRF → HttpRequest
+    if isinstance(request, ASGIRequest):
+        iterable = iterar_async(iterable, thread_sensitive=thread_sensitive)
+    return StreamingHttpResponse(iterable, **kwargs)
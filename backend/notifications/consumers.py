@@ -4,6 +4,8 @@ from urllib.parse import parse_qs
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 
+from hr_backend import json_rapido
+
 
 class NotificationConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -40,12 +42,26 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
             User = get_user_model()
             # obtener usuario de la DB de forma asíncrona
-            self.user = await database_sync_to_async(User.objects.get)(id=user_id)
+            self.user = await database_sync_to_async(
+                User.objects.select_related("rol").get
+            )(id=user_id)
 
-            # Registrar en grupos: individual y broadcast
+            # Registrar en grupos: individual, broadcast y por rol (avisos masivos, p. ej. SLA)
             self.group_name = f"user_{user_id}"
             await self.channel_layer.group_add("broadcast", self.channel_name)
             await self.channel_layer.group_add(self.group_name, self.channel_name)
+            self.rol_group = f"rol_{self.user.rol.tipo_base}" if self.user.rol else None
+            if self.rol_group:
+                await self.channel_layer.group_add(self.rol_group, self.channel_name)
+
+            # Canales de miembros de los chats grupales a los que pertenece
+            from chat.models import GroupMembership
+            group_ids = await database_sync_to_async(list)(
+                GroupMembership.objects.filter(user_id=self.user.id).values_list("group_id", flat=True)
+            )
+            self.member_groups = set()
+            for group_id in group_ids:
+                await self.join_member_group(group_id)
 
             # dejar user en scope por compatibilidad (consumers later)
             self.scope["user"] = self.user
@@ -64,6 +80,10 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         try:
             if hasattr(self, "group_name"):
                 await self.channel_layer.group_discard(self.group_name, self.channel_name)
+            if getattr(self, "rol_group", None):
+                await self.channel_layer.group_discard(self.rol_group, self.channel_name)
+            for group_id in list(getattr(self, "member_groups", ())):
+                await self.leave_member_group(group_id)
             await self.channel_layer.group_discard("broadcast", self.channel_name)
         except Exception:
             pass
@@ -89,7 +109,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                             await database_sync_to_async(notification.save)(update_fields=['leida'])
                         
                         # Confirmar al cliente
-                        await self.send(text_data=json.dumps({
+                        await self.send(text_data=json_rapido.dumps({
                             "type": "notification_marked_read",
                             "notification_id": notification_id
                         }))
@@ -106,7 +126,31 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         data = event.get("content") or event
         # garantizar serializable
         try:
-            await self.send(text_data=json.dumps(data))
+            await self.send(text_data=json_rapido.dumps(data))
         except TypeError:
             # fallback: enviar representación mínima
-            await self.send(text_data=json.dumps({"message": str(data)}))
+            await self.send(text_data=json_rapido.dumps({"message": str(data)}))
+
+    async def group_notification(self, event):
+        """
+        Notificación de chat grupal enviada una sola vez al canal de miembros.
+        El remitente también está suscrito, así que se descarta en su conexión.
+        """
+        if self.user and event.get("sender_id") == self.user.id:
+            return
+        await self.send_notification(event)
+
+    async def group_membership_changed(self, event):
+        """Alta/baja en un chat grupal: (des)suscribir del canal de miembros."""
+        if event.get("joined"):
+            await self.join_member_group(event["group_id"])
+        else:
+            await self.leave_member_group(event["group_id"])
+
+    async def join_member_group(self, group_id):
+        await self.channel_layer.group_add(f"group_members_{group_id}", self.channel_name)
+        self.member_groups.add(group_id)
+
+    async def leave_member_group(self, group_id):
+        await self.channel_layer.group_discard(f"group_members_{group_id}", self.channel_name)
+        self.member_groups.discard(group_id)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='tipo',
+            field=models.CharField(choices=[('general', 'General'), ('ticket_creado', 'Ticket Creado'), ('ticket_asignado', 'Ticket Asignado'), ('ticket_nuevo_admin', 'Nuevo Ticket (Admin)'), ('ticket_actualizado', 'Ticket Actualizado'), ('ticket_cerrado', 'Ticket Cerrado'), ('ticket_eliminado', 'Ticket Eliminado'), ('ticket_reasignado', 'Ticket Reasignado'), ('sistema', 'Sistema'), ('sla_riesgo', 'SLA en Riesgo'), ('sla_incumplido', 'SLA Incumplido')], default='general', max_length=50),
+        ),
+    ]
@@ -21,6 +21,8 @@ class Notification(models.Model):
             ("ticket_eliminado", "Ticket Eliminado"),
             ("ticket_reasignado", "Ticket Reasignado"),
             ("sistema", "Sistema"),
+            ("sla_riesgo", "SLA en Riesgo"),
+            ("sla_incumplido", "SLA Incumplido"),
         ]
     )
     # 🔹 Relación opcional con el ticket
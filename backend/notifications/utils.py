@@ -21,3 +21,34 @@ def send_notification(user_id, message, tipo="general"):
             },
         },
     )
+
+
+def send_bulk_notification(user_ids, message, tipo="general", ticket_id=None, group=None):
+    """
+    La misma notificación para varios usuarios: un solo INSERT (bulk_create) y,
+    si se indica `group` (p. ej. "rol_admin"), un único envío al grupo de
+    websocket en lugar de uno por usuario.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return
+    Notification.objects.bulk_create([
+        Notification(usuario_id=user_id, mensaje=message, tipo=tipo, ticket_id=ticket_id)
+        for user_id in user_ids
+    ])
+
+    evento = {
+        "type": "send_notification",
+        "content": {
+            "tipo": tipo,
+            "mensaje": message,
+            "ticket_id": ticket_id,
+        },
+    }
+    try:
+        channel_layer = get_channel_layer()
+        for destino in ([group] if group else [f"user_{user_id}" for user_id in user_ids]):
+            async_to_sync(channel_layer.group_send)(destino, evento)
+    except Exception as e:
+        # Las notificaciones ya quedaron guardadas; el cliente las verá al recargar
+        print(f"Error enviando notificación WebSocket: {e}")
@@ -0,0 +1,136 @@
+# tickets/condicional.py
+import hashlib
+import logging
+from time import time_ns
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+
+class VersionTablas:
+    """
+    Sellos de versión por tabla en la caché compartida. Cambian al guardar o
+    borrar filas (receptores en adminpanel/signals.py) y sirven para validar
+    respuestas (ETag) sin consultarlas ni serializarlas.
+
+    Tablas: 'tickets', 'asignaciones', 'categorias', 'prioridades', 'usuarios'.
+    """
+
+    PREFIJO = "version_tabla:"
+
+    @staticmethod
+    def obtener(*tablas):
+        claves = [f"{VersionTablas.PREFIJO}{tabla}" for tabla in tablas]
+        try:
+            versiones = cache.get_many(claves)
+            for clave in claves:
+                if clave not in versiones:
+                    # Valor inicial único: si la caché se vacía, los ETag anteriores dejan de coincidir
+                    cache.add(clave, time_ns(), None)
+                    versiones[clave] = cache.get(clave)
+            return [versiones[clave] for clave in claves]
+        except Exception as e:
+            logger.warning(f"Versiones de tablas no disponibles: {e}")
+            return None
+
+    @staticmethod
+    def invalidar(*tablas):
+        for tabla in tablas:
+            clave = f"{VersionTablas.PREFIJO}{tabla}"
+            try:
+                cache.incr(clave)
+            except ValueError:
+                cache.add(clave, time_ns(), None)
+            except Exception as e:
+                logger.warning(f"No se pudo invalidar la versión de {tabla}: {e}")
+
+
+def etag(*partes):
+    return '"%s"' % hashlib.md5(repr(partes).encode()).hexdigest()
+
+
+def etag_tablas(request, *tablas, extra=None):
+    """
+    ETag de una respuesta que solo depende de las tablas indicadas (y de la
+    URL): cambia cuando cambia la versión de alguna. None si la caché no
+    está disponible.
+    """
+    versiones = VersionTablas.obtener(*tablas)
+    if versiones is None:
+        return None
+    return etag(tablas, versiones, request.get_full_path(), extra)
+
+
+def responder_condicional(request, generar, etag=None, ultima_modificacion=None):
+    """
+    304 Not Modified si el cliente ya tiene esta versión (If-None-Match /
+    If-Modified-Since); si no, la respuesta de generar(). Ambas llevan los
+    validadores y Cache-Control: no-cache (el navegador siempre revalida).
+    Sin validadores (p. ej. contenido que depende de la hora) responde normal.
+    """
+    if etag is None and ultima_modificacion is None:
+        return generar()
+    marca = int(ultima_modificacion.timestamp()) if ultima_modificacion else None
+
+    respuesta = get_conditional_response(request, etag=etag, last_modified=marca)
+    if respuesta is None:
+        respuesta = generar()
+        if not 200 <= respuesta.status_code < 300:
+            return respuesta
+
+    if etag:
+        respuesta['ETag'] = etag
+    if marca is not None:
+        respuesta['Last-Modified'] = http_date(marca)
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
+
+
+def validadores_ticket(ticket):
+    """
+    (etag, última modificación) del detalle de un ticket, a partir de sus
+    columnas, las relaciones ya cargadas y una consulta de agregados sobre el
+    historial y el chat, sin serializarlo. (None, None) mientras el detalle
+    depende de la hora (ventana de edición abierta).
+    """
+    from chat.models import Message
+    from tickets.models import TicketHistory
+
+    if ticket.tiempo_restante_edicion > 0:
+        return None, None
+
+    historial = TicketHistory.objects.filter(ticket_id=ticket.pk).aggregate(ultimo=Max('id'), fecha=Max('fecha'))
+    mensajes = Message.objects.filter(room__ticket_id=ticket.pk).aggregate(
+        total=Count('id'), fecha=Max('timestamp')
+    )
+    columnas = [
+        getattr(ticket, campo.attname) for campo in ticket._meta.concrete_fields
+        if campo.attname != 'busqueda'
+    ]
+    relacionados = [
+        (u.username, u.email) if u else None for u in (ticket.solicitante, ticket.agente)
+    ] + [
+        c.nombre if c else None for c in (ticket.categoria_principal, ticket.subcategoria)
+    ]
+    sello = etag(columnas, relacionados, ticket.esta_vencido, historial['ultimo'], mensajes['total'])
+    fechas = [f for f in (ticket.fecha_actualizacion, historial['fecha'], mensajes['fecha']) if f]
+    return sello, max(fechas) if fechas else None
+
+
+class DetalleCondicionalMixin:
+    """
+    Mixin para ViewSets de tickets: el detalle (retrieve) responde 304 si el
+    cliente ya tiene la versión actual, validada con validadores_ticket.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        instancia = self.get_object()
+        sello, ultima_modificacion = validadores_ticket(instancia)
+        return responder_condicional(
+            request, lambda: Response(self.get_serializer(instancia).data), sello, ultima_modificacion
+        )
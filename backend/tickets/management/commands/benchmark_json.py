@@ -0,0 +1,84 @@
+# backend/tickets/management/commands/benchmark_json.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from chat.models import ChatRoom, Message
+from chat.serializers import MessageSerializer
+from hr_backend import json_rapido
+from notifications.models import Notification
+from notifications.serializers import NotificationSerializer
+from tickets.models import Ticket
+from tickets.serializers import TicketListaRapida
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el tiempo de codificación JSON (renderer de DRF vs hr_backend/json_rapido.py) '
+        'de las respuestas más grandes: tickets, notificaciones e historial de chat. '
+        'Los datos se crean dentro de una transacción que se revierte.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=1000, help='Filas por respuesta')
+        parser.add_argument('--repeticiones', type=int, default=20)
+
+    def medir(self, renderer, datos, repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            renderer.render(datos)
+        return (time.perf_counter() - inicio) / repeticiones
+
+    def respuestas(self, filas, request):
+        usuario = User.objects.create_user(username="benchmark_json", password=None)
+        tickets = Ticket.objects.bulk_create([
+            Ticket(titulo=f"Ticket {i}", descripcion="Solicitud de acceso al sistema " * 3, solicitante=usuario)
+            for i in range(filas)
+        ], batch_size=1000)
+        Notification.objects.bulk_create([
+            Notification(usuario=usuario, mensaje=f"El ticket #{t.id} fue actualizado.", ticket=t)
+            for t in tickets
+        ], batch_size=1000)
+        sala = ChatRoom.objects.create(ticket=tickets[0])
+        Message.objects.bulk_create([
+            Message(room=sala, sender=usuario, content=f"Mensaje {i} del historial del chat")
+            for i in range(filas)
+        ], batch_size=1000)
+
+        contexto = {'request': request}
+        return {
+            'tickets': TicketListaRapida(request).representar(
+                TicketListaRapida.valores(Ticket.objects.filter(solicitante=usuario))
+            ),
+            'notificaciones': NotificationSerializer(
+                Notification.objects.filter(usuario=usuario).select_related('usuario', 'ticket'),
+                many=True, context=contexto
+            ).data,
+            'chat': MessageSerializer(
+                Message.objects.filter(room=sala).select_related('sender'), many=True, context=contexto
+            ).data,
+        }
+
+    def handle(self, *args, **options):
+        if json_rapido.orjson is None:
+            self.stdout.write(self.style.WARNING("orjson no está instalado: se mide el respaldo con json estándar."))
+        request = Request(APIRequestFactory().get('/api/'))
+        estandar, rapido = JSONRenderer(), json_rapido.JSONRapidoRenderer()
+
+        with transaction.atomic():
+            respuestas = self.respuestas(options['filas'], request)
+            self.stdout.write(f"{'respuesta':<15} | {'KB':>7} | {'DRF':>9} | {'rápido':>9} | {'ahorro':>9}")
+            for nombre, datos in respuestas.items():
+                tamano = len(estandar.render(datos)) / 1024
+                t_estandar = self.medir(estandar, datos, options['repeticiones'])
+                t_rapido = self.medir(rapido, datos, options['repeticiones'])
+                self.stdout.write(
+                    f"{nombre:<15} | {tamano:>7.0f} | {t_estandar * 1000:>6.2f} ms | {t_rapido * 1000:>6.2f} ms | "
+                    f"{(t_estandar - t_rapido) * 1000:>6.2f} ms ({t_estandar / t_rapido:.1f}x)"
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,77 @@
+# backend/tickets/management/commands/benchmark_lista_tickets.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from tickets.models import CategoriaPrincipal, Subcategoria, Ticket
+from tickets.optimizacion import optimizar_queryset
+from tickets.serializers import TicketListaRapida, TicketSerializer
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara TicketSerializer con la lista rápida (TicketListaRapida) sobre tickets '
+        'sintéticos. Los datos se crean dentro de una transacción que se revierte.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, nargs='+', default=[100, 1000, 10000])
+        parser.add_argument('--repeticiones', type=int, default=3, help='Se informa el mejor tiempo')
+
+    def medir(self, funcion, repeticiones):
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultado = funcion()
+            duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        return mejor, resultado
+
+    def crear_tickets(self, cantidad):
+        solicitante = User.objects.create_user(username="benchmark_solicitante", password=None)
+        agente = User.objects.create_user(username="benchmark_agente", password=None)
+        categoria = CategoriaPrincipal.objects.create(nombre="Benchmark")
+        subcategoria = Subcategoria.objects.create(nombre="Benchmark", categoria=categoria)
+        Ticket.objects.bulk_create([
+            Ticket(
+                titulo=f"Ticket {i}", descripcion="Solicitud de vacaciones " * (i % 3 + 1),
+                solicitante=solicitante, agente=agente if i % 2 else None,
+                categoria_principal=categoria, subcategoria=subcategoria if i % 3 else None,
+            )
+            for i in range(cantidad)
+        ], batch_size=1000)
+        return solicitante
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        request = Request(APIRequestFactory().get('/api/user/tickets/'))
+        repeticiones = options['repeticiones']
+
+        with transaction.atomic():
+            solicitante = self.crear_tickets(max(options['filas']))
+            base = Ticket.objects.filter(solicitante=solicitante).order_by('-fecha_creacion', '-id')
+
+            self.stdout.write(f"{'filas':>7} | {'serializer':>12} | {'lista rápida':>12} | {'mejora':>7}")
+            for cantidad in options['filas']:
+                queryset = base[:cantidad]
+
+                serializer, json_serializer = self.medir(lambda: renderer.render(
+                    TicketSerializer(
+                        optimizar_queryset(queryset, TicketSerializer), many=True, context={'request': request}
+                    ).data
+                ), repeticiones)
+                rapida, json_rapida = self.medir(lambda: renderer.render(
+                    TicketListaRapida(request).representar(TicketListaRapida.valores(queryset))
+                ), repeticiones)
+
+                self.stdout.write(
+                    f"{cantidad:>7} | {cantidad / serializer:>8.0f} f/s | {cantidad / rapida:>8.0f} f/s | "
+                    f"{serializer / rapida:>6.1f}x"
+                    + ("" if len(json_serializer) == len(json_rapida) else "  ⚠ JSON distinto")
+                )
+            transaction.set_rollback(True)
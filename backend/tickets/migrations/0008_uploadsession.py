@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:32
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0007_remove_ticket_tickets_tic_estado_4360a2_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nombre_archivo', models.CharField(max_length=255)),
+                ('tamano_total', models.BigIntegerField(help_text='Tamaño declarado en bytes')),
+                ('recibido', models.BigIntegerField(default=0, help_text='Bytes escritos (offset para reanudar)')),
+                ('sha256', models.CharField(blank=True, help_text='Checksum esperado del archivo completo', max_length=64)),
+                ('estado', models.CharField(choices=[('activa', 'Activa'), ('completada', 'Completada'), ('cancelada', 'Cancelada')], default='activa', max_length=20)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subidas', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Subida por partes',
+                'verbose_name_plural': 'Subidas por partes',
+                'indexes': [models.Index(fields=['estado', 'fecha_actualizacion'], name='tickets_upl_estado_a186c7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:07
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, Min, OuterRef, Q, Subquery
+from django.utils import timezone
+
+
+def inicializar_sla(apps, schema_editor):
+    """
+    Estado inicial del SLA a partir del historial (el motor anterior dejaba
+    entradas "SLA en Riesgo" / "SLA Incumplido"), para no repetir avisos.
+    Los tickets abiertos quedan pendientes de evaluar.
+    """
+    Ticket = apps.get_model('tickets', 'Ticket')
+    TicketHistory = apps.get_model('tickets', 'TicketHistory')
+
+    # StateService registra accion="Cambio de Estado" con el estado nuevo en la descripción
+    primera_respuesta = TicketHistory.objects.filter(
+        Q(accion__icontains='Proceso') | Q(descripcion__icontains="a 'En Proceso'"),
+        ticket=OuterRef('pk'),
+    ).order_by().values('ticket').annotate(primera=Min('fecha')).values('primera')
+    Ticket.objects.update(fecha_primera_respuesta=Subquery(primera_respuesta))
+    # Ya respondidos sin rastro en el historial: la última actualización como cota
+    Ticket.objects.filter(
+        fecha_primera_respuesta__isnull=True, estado__in=['En Proceso', 'Resuelto', 'Cerrado']
+    ).update(fecha_primera_respuesta=F('fecha_actualizacion'))
+
+    Ticket.objects.filter(
+        historial__accion__iexact='SLA en Riesgo'
+    ).update(sla_estado='riesgo')
+    Ticket.objects.filter(
+        historial__accion__iexact='SLA Incumplido'
+    ).update(sla_estado='incumplido')
+
+    Ticket.objects.exclude(
+        Q(estado__in=['Resuelto', 'Cerrado']) | Q(sla_estado='incumplido')
+    ).update(sla_revision=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_uploadsession'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='fecha_primera_respuesta',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='sla_estado',
+            field=models.CharField(choices=[('ok', 'OK'), ('riesgo', 'En riesgo'), ('incumplido', 'Incumplido')], default='ok', help_text='Peor estado de SLA alcanzado (ya notificado)', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='sla_revision',
+            field=models.DateTimeField(blank=True, help_text='Próximo momento en que el SLA del ticket puede cambiar; vacío si ya no hay nada que evaluar', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('sla_revision__isnull', False)), fields=['sla_revision'], name='ticket_sla_revision_idx'),
+        ),
+        migrations.RunPython(inicializar_sla, migrations.RunPython.noop),
+    ]
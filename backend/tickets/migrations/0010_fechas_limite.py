@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:10
+
+from django.conf import settings
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def calcular_fechas_limite(apps, schema_editor):
+    """Fechas límite de los tickets existentes (creación + horas estimadas / del SLA)."""
+    Ticket = apps.get_model('tickets', 'Ticket')
+    SLA = apps.get_model('adminpanel', 'SLA')
+
+    horas_respuesta = {
+        sla.nombre.strip().lower(): sla.tiempo_respuesta_horas
+        for sla in SLA.objects.filter(activo=True)
+    }
+    lote = []
+    tickets = Ticket.objects.select_related('categoria_principal').only(
+        'id', 'fecha_creacion', 'tiempo_estimado_resolucion', 'categoria_principal__nombre'
+    )
+    for t in tickets.iterator(chunk_size=1000):
+        t.fecha_limite_resolucion = t.fecha_creacion + timedelta(hours=t.tiempo_estimado_resolucion)
+        horas = horas_respuesta.get(t.categoria_principal.nombre.strip().lower()) if t.categoria_principal else None
+        t.fecha_limite_respuesta = t.fecha_creacion + timedelta(hours=horas) if horas is not None else None
+        lote.append(t)
+        if len(lote) >= 1000:
+            Ticket.objects.bulk_update(lote, ['fecha_limite_resolucion', 'fecha_limite_respuesta'])
+            lote = []
+    if lote:
+        Ticket.objects.bulk_update(lote, ['fecha_limite_resolucion', 'fecha_limite_respuesta'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_sla_estado'),
+        ('adminpanel', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='fecha_limite_resolucion',
+            field=models.DateTimeField(blank=True, help_text='Creación + tiempo estimado de resolución', null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='fecha_limite_respuesta',
+            field=models.DateTimeField(blank=True, help_text='Creación + tiempo de respuesta del SLA de la categoría', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('estado__in', ['Abierto', 'En Proceso'])), fields=['fecha_limite_resolucion'], name='ticket_abierto_limite_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('estado__in', ['Abierto', 'En Proceso']), ('fecha_primera_respuesta__isnull', True)), fields=['fecha_limite_respuesta'], name='ticket_respuesta_limite_idx'),
+        ),
+        migrations.RunPython(calcular_fechas_limite, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:18
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+# Solo PostgreSQL: en otros motores la búsqueda usa icontains (ver BusquedaTicketService)
+SQL_CREAR = [
+    """
+    CREATE OR REPLACE FUNCTION tickets_ticket_busqueda_actualizar() RETURNS trigger AS $$
+    BEGIN
+        NEW.busqueda :=
+            setweight(to_tsvector('spanish', coalesce(NEW.titulo, '')), 'A') ||
+            setweight(to_tsvector('spanish', coalesce(NEW.descripcion, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS ticket_busqueda_trigger ON tickets_ticket",
+    """
+    CREATE TRIGGER ticket_busqueda_trigger
+        BEFORE INSERT OR UPDATE OF titulo, descripcion ON tickets_ticket
+        FOR EACH ROW EXECUTE FUNCTION tickets_ticket_busqueda_actualizar()
+    """,
+    """
+    UPDATE tickets_ticket SET busqueda =
+        setweight(to_tsvector('spanish', coalesce(titulo, '')), 'A') ||
+        setweight(to_tsvector('spanish', coalesce(descripcion, '')), 'B')
+    """,
+    "CREATE INDEX IF NOT EXISTS ticket_busqueda_gin ON tickets_ticket USING gin (busqueda)",
+    "CREATE INDEX IF NOT EXISTS usuario_username_trgm ON users_user USING gin (username gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS usuario_email_trgm ON users_user USING gin (email gin_trgm_ops)",
+]
+
+SQL_ELIMINAR = [
+    "DROP INDEX IF EXISTS usuario_email_trgm",
+    "DROP INDEX IF EXISTS usuario_username_trgm",
+    "DROP INDEX IF EXISTS ticket_busqueda_gin",
+    "DROP TRIGGER IF EXISTS ticket_busqueda_trigger ON tickets_ticket",
+    "DROP FUNCTION IF EXISTS tickets_ticket_busqueda_actualizar()",
+]
+
+
+def _ejecutar(sql):
+    def operacion(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for sentencia in sql:
+                schema_editor.execute(sentencia, params=None)
+    return operacion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0010_fechas_limite'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='ticket',
+            name='busqueda',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(_ejecutar(SQL_CREAR), _ejecutar(SQL_ELIMINAR)),
+    ]
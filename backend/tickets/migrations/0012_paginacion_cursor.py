@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0011_busqueda'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['fecha_creacion', 'id'], name='ticket_creacion_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='ticket_actualizacion_id_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-19 20:05
+
+from django.db import migrations
+
+
+# Solo PostgreSQL. username__icontains / email__icontains se compilan como
+# UPPER("users_user"."username"::text) LIKE UPPER('%x%'): los índices trigram
+# deben ser sobre esa misma expresión para que el planificador los use.
+SQL_CREAR = [
+    "DROP INDEX IF EXISTS usuario_username_trgm",
+    "DROP INDEX IF EXISTS usuario_email_trgm",
+    "CREATE INDEX IF NOT EXISTS usuario_username_upper_trgm ON users_user "
+    "USING gin ((UPPER(username::text)) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS usuario_email_upper_trgm ON users_user "
+    "USING gin ((UPPER(email::text)) gin_trgm_ops)",
+]
+
+SQL_ELIMINAR = [
+    "DROP INDEX IF EXISTS usuario_email_upper_trgm",
+    "DROP INDEX IF EXISTS usuario_username_upper_trgm",
+    "CREATE INDEX IF NOT EXISTS usuario_username_trgm ON users_user USING gin (username gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS usuario_email_trgm ON users_user USING gin (email gin_trgm_ops)",
+]
+
+
+def _ejecutar(sql):
+    def operacion(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for sentencia in sql:
+                schema_editor.execute(sentencia, params=None)
+    return operacion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0012_paginacion_cursor'),
+    ]
+
+    operations = [
+        migrations.RunPython(_ejecutar(SQL_CREAR), _ejecutar(SQL_ELIMINAR)),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 21:10
+
+from django.db import migrations
+from django.db.models import F, Min, OuterRef, Q, Subquery
+
+
+def reparar_primera_respuesta(apps, schema_editor):
+    """
+    0009 solo tomaba la primera respuesta de entradas del historial con
+    'Proceso' en la acción; los cambios hechos con StateService
+    (accion="Cambio de Estado") quedaban sin fecha y el motor SLA los
+    marcaba como FRT incumplido. Solo toca tickets ya respondidos sin fecha.
+    """
+    Ticket = apps.get_model('tickets', 'Ticket')
+    TicketHistory = apps.get_model('tickets', 'TicketHistory')
+
+    sin_fecha = Ticket.objects.filter(
+        fecha_primera_respuesta__isnull=True, estado__in=['En Proceso', 'Resuelto', 'Cerrado']
+    )
+    primera_respuesta = TicketHistory.objects.filter(
+        Q(accion__icontains='Proceso') | Q(descripcion__icontains="a 'En Proceso'"),
+        ticket=OuterRef('pk'),
+    ).order_by().values('ticket').annotate(primera=Min('fecha')).values('primera')
+    sin_fecha.update(fecha_primera_respuesta=Subquery(primera_respuesta))
+    sin_fecha.update(fecha_primera_respuesta=F('fecha_actualizacion'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0013_busqueda_usuarios_upper'),
+    ]
+
+    operations = [
+        migrations.RunPython(reparar_primera_respuesta, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ from .ticket import Ticket
 from .assignment import TicketAssignment
 from .history import TicketHistory
 from .category import CategoriaPrincipal, Subcategoria, FlujoAprobacion
+from .upload import UploadSession
 
 __all__ = [
     'Ticket', 
@@ -9,5 +10,6 @@ __all__ = [
     'TicketHistory',
     'CategoriaPrincipal', 
     'Subcategoria', 
-    'FlujoAprobacion'
+    'FlujoAprobacion',
+    'UploadSession'
 ]
\ No newline at end of file
@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
@@ -89,6 +90,39 @@ class Ticket(models.Model):
     )
     comentario_cierre = models.TextField(blank=True)
 
+    # Fechas límite precalculadas (al crear o cambiar de categoría)
+    fecha_limite_respuesta = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Creación + tiempo de respuesta del SLA de la categoría"
+    )
+    fecha_limite_resolucion = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Creación + tiempo estimado de resolución"
+    )
+
+    # SLA (ver adminpanel/sla_notifications.py)
+    SLA_OK = 'ok'
+    SLA_RIESGO = 'riesgo'
+    SLA_INCUMPLIDO = 'incumplido'
+    SLA_ESTADO_CHOICES = [
+        (SLA_OK, 'OK'),
+        (SLA_RIESGO, 'En riesgo'),
+        (SLA_INCUMPLIDO, 'Incumplido'),
+    ]
+    fecha_primera_respuesta = models.DateTimeField(null=True, blank=True)
+    sla_estado = models.CharField(
+        max_length=20, choices=SLA_ESTADO_CHOICES, default=SLA_OK,
+        help_text="Peor estado de SLA alcanzado (ya notificado)"
+    )
+    sla_revision = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Próximo momento en que el SLA del ticket puede cambiar; vacío si ya no hay nada que evaluar"
+    )
+
+    # Búsqueda de texto (PostgreSQL): titulo peso A, descripcion peso B.
+    # La mantiene un trigger y tiene índice GIN (migración 0011_busqueda).
+    busqueda = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ['-fecha_creacion']
         indexes = [
@@ -97,6 +131,23 @@ class Ticket(models.Model):
             models.Index(fields=['agente', 'estado']),
             models.Index(fields=['categoria_principal', 'estado']),
             models.Index(fields=['prioridad', 'estado']),
+            # Vencidos / por vencer: rango sobre los tickets abiertos ordenados por fecha límite
+            models.Index(
+                fields=['fecha_limite_resolucion'], name='ticket_abierto_limite_idx',
+                condition=models.Q(estado__in=['Abierto', 'En Proceso'])
+            ),
+            models.Index(
+                fields=['fecha_limite_respuesta'], name='ticket_respuesta_limite_idx',
+                condition=models.Q(estado__in=['Abierto', 'En Proceso'], fecha_primera_respuesta__isnull=True)
+            ),
+            # Listas paginadas por cursor (tickets/pagination.py)
+            models.Index(fields=['fecha_creacion', 'id'], name='ticket_creacion_id_idx'),
+            models.Index(fields=['fecha_actualizacion', 'id'], name='ticket_actualizacion_id_idx'),
+            # Solo los tickets pendientes de evaluar SLA (los cerrados quedan fuera)
+            models.Index(
+                fields=['sla_revision'], name='ticket_sla_revision_idx',
+                condition=models.Q(sla_revision__isnull=False)
+            ),
         ]
         verbose_name = 'Ticket'
         verbose_name_plural = 'Tickets'
@@ -142,14 +193,42 @@ class Ticket(models.Model):
         """Un ticket vence si supera el tiempo estimado de resolución."""
         if self.estado in ['Resuelto', 'Cerrado']:
             return False
+        if self.fecha_limite_resolucion:
+            return timezone.now() > self.fecha_limite_resolucion
         horas = self.tiempo_transcurrido.total_seconds() / 3600
         return horas > self.tiempo_estimado_resolucion
 
+    @staticmethod
+    def filtro_vencidos(prefijo='', ahora=None):
+        """
+        Q para filtrar o contar tickets vencidos en consultas (esta_vencido es una
+        propiedad y no sirve en filter). Mismo criterio que el dashboard: abiertos o
+        en proceso cuya fecha límite de resolución ya pasó (índice parcial
+        ticket_abierto_limite_idx).
+        `prefijo` permite usarlo desde otra relación, p. ej. 'tickets_asignados__'.
+        """
+        return models.Q(**{
+            f'{prefijo}estado__in': ['Abierto', 'En Proceso'],
+            f'{prefijo}fecha_limite_resolucion__lt': ahora or timezone.now(),
+        })
+
+    @staticmethod
+    def filtro_por_vencer(ventana=timedelta(hours=1), prefijo='', ahora=None):
+        """Q de los tickets abiertos que vencen dentro de `ventana`."""
+        ahora = ahora or timezone.now()
+        return models.Q(**{
+            f'{prefijo}estado__in': ['Abierto', 'En Proceso'],
+            f'{prefijo}fecha_limite_resolucion__gte': ahora,
+            f'{prefijo}fecha_limite_resolucion__lt': ahora + ventana,
+        })
+
     @property
     def tiempo_restante_resolucion(self):
         """Tiempo restante para resolver en horas."""
         if self.esta_vencido:
             return 0
+        if self.fecha_limite_resolucion:
+            return max(0, (self.fecha_limite_resolucion - timezone.now()).total_seconds() / 3600)
         horas_transcurridas = self.tiempo_transcurrido.total_seconds() / 3600
         return max(0, self.tiempo_estimado_resolucion - horas_transcurridas)
 
@@ -321,6 +400,55 @@ class Ticket(models.Model):
         
         return dirty_fields
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Para detectar cambios de categoría / tiempo estimado sin consultar la BD al guardar
+        instance._categoria_cargada = instance.__dict__.get('categoria_principal_id')
+        instance._tiempo_cargado = instance.__dict__.get('tiempo_estimado_resolucion')
+        return instance
+
+    @staticmethod
+    def horas_respuesta_sla(categoria):
+        """Horas de respuesta del SLA activo de la categoría (mismo nombre), o None."""
+        if not categoria:
+            return None
+        from adminpanel.models import SLA
+        return SLA.objects.filter(
+            activo=True, nombre__iexact=categoria.nombre.strip()
+        ).values_list('tiempo_respuesta_horas', flat=True).first()
+
+    def calcular_fechas_limite(self):
+        """
+        Fechas límite de respuesta y resolución a partir de la creación, en
+        horas laborables del área del solicitante (adminpanel/calendario.py).
+        Solo al crear el ticket o al cambiar su categoría o tiempo estimado;
+        los demás guardados conservan las fechas ya calculadas.
+        """
+        from adminpanel.calendario import CalendarioService
+
+        cambio_categoria = self._state.adding or \
+            getattr(self, '_categoria_cargada', None) != self.categoria_principal_id
+        cambio_tiempo = self._state.adding or self.fecha_limite_resolucion is None or \
+            getattr(self, '_tiempo_cargado', None) != self.tiempo_estimado_resolucion
+        if not (cambio_categoria or cambio_tiempo):
+            return
+
+        inicio = self.fecha_creacion or timezone.now()
+        area_id = self.solicitante.area_id if self.solicitante_id else None
+        if cambio_tiempo:
+            self.fecha_limite_resolucion = CalendarioService.sumar_horas(
+                inicio, self.tiempo_estimado_resolucion, area_id
+            )
+            self._tiempo_cargado = self.tiempo_estimado_resolucion
+
+        if cambio_categoria:
+            horas = Ticket.horas_respuesta_sla(self.categoria_principal)
+            self.fecha_limite_respuesta = (
+                CalendarioService.sumar_horas(inicio, horas, area_id) if horas is not None else None
+            )
+            self._categoria_cargada = self.categoria_principal_id
+
     def __str__(self):
         return f"Ticket #{self.id} - {self.titulo} ({self.prioridad})"
 
@@ -347,6 +475,17 @@ def asignar_valores_automaticos(sender, instance, **kwargs):
             instance.tiempo_estimado_resolucion = instance.categoria_principal.tiempo_resolucion_horas
 
 
+@receiver(pre_save, sender=Ticket)
+def asignar_fechas_limite(sender, instance, raw=False, **kwargs):
+    """
+    Recalcula las fechas límite después de asignar_valores_automaticos,
+    que puede cambiar el tiempo estimado de resolución.
+    """
+    if raw:
+        return
+    instance.calcular_fechas_limite()
+
+
 @receiver(post_save, sender=Ticket)
 def notificar_prioridad_alta(sender, instance, created, **kwargs):
     """
@@ -0,0 +1,50 @@
+import os
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class UploadSession(models.Model):
+    """
+    Subida de un adjunto por partes (init → append → complete).
+    Los bytes se escriben en un archivo temporal hasta que se completa
+    y se adjunta a un Ticket o a un Message del chat.
+    """
+    ESTADO_CHOICES = [
+        ('activa', 'Activa'),
+        ('completada', 'Completada'),
+        ('cancelada', 'Cancelada'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='subidas'
+    )
+    nombre_archivo = models.CharField(max_length=255)
+    tamano_total = models.BigIntegerField(help_text="Tamaño declarado en bytes")
+    recibido = models.BigIntegerField(default=0, help_text="Bytes escritos (offset para reanudar)")
+    sha256 = models.CharField(max_length=64, blank=True, help_text="Checksum esperado del archivo completo")
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='activa')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'fecha_actualizacion']),
+        ]
+        verbose_name = 'Subida por partes'
+        verbose_name_plural = 'Subidas por partes'
+
+    @property
+    def ruta_temporal(self):
+        return os.path.join(settings.MEDIA_ROOT, 'uploads_tmp', f'{self.id}.part')
+
+    @property
+    def completa(self):
+        return self.recibido == self.tamano_total
+
+    def __str__(self):
+        return f"Subida {self.id} - {self.nombre_archivo} ({self.recibido}/{self.tamano_total})"
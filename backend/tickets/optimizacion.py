@@ -0,0 +1,73 @@
+# tickets/optimizacion.py
+from rest_framework.response import Response
+
+from tickets.serializers import TicketSerializer
+from tickets.serializers.lista_rapida import COMPATIBLE, TicketListaRapida
+
+
+def optimizar_queryset(queryset, serializer_class):
+    """
+    Aplica al queryset las necesidades de carga que declara el serializer en
+    su Meta, para serializar una lista con un número constante de consultas:
+
+        class Meta:
+            select_related = ('solicitante', 'agente')
+            prefetch_related = ('participants',)
+            anotaciones = {'total_tickets': Count('tickets_asignados')}
+
+    Meta se hereda (class Meta(Padre.Meta)), así que los serializers
+    derivados declaran solo lo que agregan.
+    """
+    meta = getattr(serializer_class, 'Meta', None)
+    if meta is None or not hasattr(queryset, 'query'):
+        return queryset
+
+    select_related = getattr(meta, 'select_related', ())
+    prefetch_related = getattr(meta, 'prefetch_related', ())
+    anotaciones = getattr(meta, 'anotaciones', {})
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    if anotaciones:
+        queryset = queryset.annotate(**anotaciones)
+    return queryset
+
+
+class ConsultaOptimizadaMixin:
+    """
+    Mixin para ViewSets: aplica optimizar_queryset con el serializer de la
+    acción en list / retrieve / update / destroy (filter_queryset). Las
+    acciones propias que arman su queryset llaman a self.optimizar_queryset.
+    """
+
+    def optimizar_queryset(self, queryset):
+        return optimizar_queryset(queryset, self.get_serializer_class())
+
+    def filter_queryset(self, queryset):
+        return self.optimizar_queryset(super().filter_queryset(queryset))
+
+
+class ListaRapidaMixin:
+    """
+    Mixin para ViewSets de tickets cuya lista usa TicketSerializer: la lista
+    se arma con TicketListaRapida (filas de values(), mismo JSON). Las
+    acciones de lista propias llaman a self.lista_rapida(queryset).
+    """
+
+    def lista_rapida(self, queryset):
+        if self.get_serializer_class() is not TicketSerializer or not COMPATIBLE:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(self.get_serializer(page, many=True).data)
+            return Response(self.get_serializer(queryset, many=True).data)
+
+        filas = TicketListaRapida.valores(queryset)
+        page = self.paginate_queryset(filas)
+        lista = TicketListaRapida(self.request)
+        if page is not None:
+            return self.get_paginated_response(lista.representar(page))
+        return Response(lista.representar(filas))
+
+    def list(self, request, *args, **kwargs):
+        return self.lista_rapida(self.filter_queryset(self.get_queryset()))
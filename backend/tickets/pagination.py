@@ -0,0 +1,179 @@
+# tickets/pagination.py
+import base64
+import json
+import logging
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+logger = logging.getLogger(__name__)
+
+# Órdenes con paginación por cursor: (campo de fecha, id) en la misma dirección,
+# cubiertos por los índices ticket_creacion_id_idx / ticket_actualizacion_id_idx
+ORDENES_CURSOR = {
+    ('-fecha_creacion', '-id'), ('fecha_creacion', 'id'),
+    ('-fecha_actualizacion', '-id'), ('fecha_actualizacion', 'id'),
+}
+
+
+def conteo_aproximado(queryset):
+    """
+    Filas estimadas por el planificador de PostgreSQL (estadísticas de la
+    tabla), sin recorrerlas como COUNT(*). None en otros motores.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.warning(f"No se pudo estimar el conteo: {e}")
+        return None
+
+
+class TicketCursorPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre (fecha, id): cada página filtra a
+    partir de la última fila de la anterior, sin OFFSET ni COUNT(*), así que
+    el costo no depende de la profundidad de la página.
+
+    ?conteo=aproximado añade 'count_aproximado' (estimación de PostgreSQL).
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    # -------------------------------------------
+    # Cursor
+    # -------------------------------------------
+    @staticmethod
+    def codificar(valor, pk, atras=False):
+        datos = [valor.isoformat(), pk, 1 if atras else 0]
+        return base64.urlsafe_b64encode(json.dumps(datos).encode()).decode()
+
+    @staticmethod
+    def decodificar(cursor):
+        try:
+            valor, pk, atras = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            fecha = parse_datetime(valor)
+            if fecha is None:
+                raise ValueError(valor)
+            return fecha, int(pk), bool(atras)
+        except Exception:
+            raise NotFound('Cursor no válido.')
+
+    def _page_size(self, request):
+        valor = request.query_params.get(self.page_size_query_param)
+        if valor and valor.isdigit() and int(valor) > 0:
+            return min(int(valor), self.max_page_size)
+        return self.page_size
+
+    # -------------------------------------------
+    # Paginación
+    # -------------------------------------------
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.campo, _ = queryset.query.order_by
+        descendente = self.campo.startswith('-')
+        nombre = self.campo.lstrip('-')
+        tamano = self._page_size(request)
+
+        posicion, atras = None, False
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            *posicion, atras = self.decodificar(cursor)
+
+        if posicion:
+            fecha, pk = posicion
+            # Hacia adelante en el orden pedido, o hacia atrás para la página previa
+            menor = descendente != atras
+            op = 'lt' if menor else 'gt'
+            # La cota simple sobre la fecha (lte / gte) da al índice (fecha, id) una
+            # clave de inicio; el OR solo desempata las filas con la misma fecha
+            queryset = queryset.filter(
+                Q(**{f'{nombre}__{op}e': fecha}),
+                Q(**{f'{nombre}__{op}': fecha}) | Q(**{nombre: fecha, f'id__{op}': pk}),
+            )
+        if atras:
+            queryset = queryset.reverse()
+
+        filas = list(queryset[:tamano + 1])
+        hay_mas = len(filas) > tamano
+        filas = filas[:tamano]
+        if atras:
+            filas.reverse()
+
+        self.nombre = nombre
+        self.filas = filas
+        # Desde una página previa siempre hay siguiente; desde la primera no hay previa
+        self.hay_siguiente = hay_mas if not atras else bool(posicion)
+        self.hay_anterior = bool(posicion) if not atras else hay_mas
+        self.conteo = conteo_aproximado(queryset.order_by()) \
+            if request.query_params.get('conteo') == 'aproximado' and not posicion else None
+        return filas
+
+    def _enlace(self, fila, atras):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'conteo')
+        # Instancias o filas de values() (listas rápidas)
+        if isinstance(fila, dict):
+            valor, pk = fila[self.nombre], fila['id']
+        else:
+            valor, pk = getattr(fila, self.nombre), fila.pk
+        return replace_query_param(url, self.cursor_query_param, self.codificar(valor, pk, atras))
+
+    def get_next_link(self):
+        return self._enlace(self.filas[-1], False) if self.hay_siguiente and self.filas else None
+
+    def get_previous_link(self):
+        return self._enlace(self.filas[0], True) if self.hay_anterior and self.filas else None
+
+    def get_paginated_response(self, data):
+        respuesta = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.request.query_params.get('conteo') == 'aproximado':
+            respuesta['count_aproximado'] = self.conteo
+        return Response(respuesta)
+
+
+class TicketPagination(BasePagination):
+    """
+    Paginación de las listas de tickets.
+
+    Por defecto, por número de página (compatible con el frontend actual).
+    Con ?cursor=... o ?paginacion=cursor y un orden por (fecha, id), por
+    cursor (TicketCursorPagination). Otros órdenes (p. ej. por relevancia)
+    siguen paginando por número de página.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginador = PageNumberPagination()
+        cursor = (
+            TicketCursorPagination.cursor_query_param in request.query_params
+            or request.query_params.get('paginacion') == 'cursor'
+        )
+        if cursor and tuple(queryset.query.order_by) in ORDENES_CURSOR:
+            self.paginador = TicketCursorPagination(self.paginador.page_size)
+        return self.paginador.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginador.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return PageNumberPagination().get_paginated_response_schema(schema)
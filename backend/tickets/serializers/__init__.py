@@ -4,6 +4,7 @@ from .ticket_serializers import (
     TicketDetailSerializer,
     TicketListSerializer
 )
+from .lista_rapida import TicketListaRapida
 from .assignment_serializers import (
     TicketAssignmentSerializer,
     TicketAssignmentCreateSerializer
@@ -20,6 +21,7 @@ __all__ = [
     'TicketCreateSerializer', 
     'TicketDetailSerializer',
     'TicketListSerializer',
+    'TicketListaRapida',
     'TicketAssignmentSerializer',
     'TicketAssignmentCreateSerializer',
     'TicketStateUpdateSerializer',
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from tickets.models import Ticket
+from .ticket_serializers import TicketSerializer
+
+# Columnas leídas con values() (sin instanciar modelos)
+COLUMNAS = (
+    'id', 'titulo', 'descripcion', 'estado', 'prioridad',
+    'solicitante_id', 'solicitante__username', 'solicitante__email',
+    'agente_id', 'agente__username', 'agente__email',
+    'categoria_principal_id', 'categoria_principal__nombre',
+    'subcategoria_id', 'subcategoria__nombre',
+    'archivo_adjunto', 'fecha_creacion', 'fecha_actualizacion', 'fecha_cierre',
+    'tiempo_estimado_resolucion', 'rating', 'comentario_cierre',
+    'fecha_limite_resolucion', 'chat_room__id',
+)
+
+# Campos de salida, en el orden de TicketSerializer
+CAMPOS = (
+    'id', 'titulo', 'descripcion', 'estado', 'prioridad',
+    'solicitante', 'solicitante_info',
+    'agente', 'agente_info',
+    'categoria_principal', 'categoria_nombre',
+    'subcategoria', 'subcategoria_nombre',
+    'archivo_adjunto',
+    'fecha_creacion', 'fecha_actualizacion', 'fecha_cierre',
+    'tiempo_estimado_resolucion',
+    'rating', 'comentario_cierre',
+    'tiempo_restante_edicion', 'puede_editar', 'puede_eliminar', 'esta_vencido',
+    'sala_chat_id',
+)
+
+# Si TicketSerializer cambia de campos, las listas vuelven a usarlo hasta actualizar CAMPOS
+COMPATIBLE = tuple(TicketSerializer.Meta.fields) == CAMPOS
+
+EDICION = timedelta(minutes=5)
+CERRADOS = ('Resuelto', 'Cerrado')
+
+
+class TicketListaRapida:
+    """
+    Representación de solo lectura de las listas de tickets, construida a
+    partir de filas de values(): el mismo JSON que TicketSerializer (mismos
+    campos, orden y formatos) sin instanciar modelos ni campos de DRF por
+    fila, y con un único `ahora` para los campos que dependen de la hora
+    (tiempo_restante_edicion, puede_editar, puede_eliminar, esta_vencido).
+    """
+
+    def __init__(self, request=None, ahora=None):
+        self.request = request
+        self.ahora = ahora or timezone.now()
+        self._fecha = serializers.DateTimeField().to_representation
+        self._storage = Ticket._meta.get_field('archivo_adjunto').storage
+
+    @staticmethod
+    def valores(queryset):
+        return queryset.values(*COLUMNAS)
+
+    def _archivo(self, nombre):
+        # Igual que serializers.FileField
+        if not nombre:
+            return None
+        if not api_settings.UPLOADED_FILES_USE_URL:
+            return nombre
+        url = self._storage.url(nombre)
+        return self.request.build_absolute_uri(url) if self.request is not None else url
+
+    def fila(self, f):
+        ahora, fecha = self.ahora, self._fecha
+        creacion, estado = f['fecha_creacion'], f['estado']
+
+        restante = max(0, int((creacion + EDICION - ahora).total_seconds())) if creacion else 0
+        puede_editar = estado == 'Abierto' and restante > 0
+        if estado in CERRADOS:
+            vencido = False
+        elif f['fecha_limite_resolucion']:
+            vencido = ahora > f['fecha_limite_resolucion']
+        else:
+            transcurrido = (ahora - creacion) if creacion else timedelta(0)
+            vencido = transcurrido.total_seconds() / 3600 > f['tiempo_estimado_resolucion']
+
+        solicitante, agente = f['solicitante_id'], f['agente_id']
+        datos = {
+            'id': f['id'],
+            'titulo': f['titulo'],
+            'descripcion': f['descripcion'],
+            'estado': estado,
+            'prioridad': f['prioridad'],
+            'solicitante': solicitante,
+            'solicitante_info': {
+                'id': solicitante, 'username': f['solicitante__username'], 'email': f['solicitante__email'],
+            } if solicitante is not None else None,
+            'agente': agente,
+            'agente_info': {
+                'id': agente, 'username': f['agente__username'], 'email': f['agente__email'],
+            } if agente is not None else None,
+            'categoria_principal': f['categoria_principal_id'],
+        }
+        # Como en el serializer: sin categoría / subcategoría el nombre se omite
+        if f['categoria_principal_id'] is not None:
+            datos['categoria_nombre'] = f['categoria_principal__nombre']
+        datos['subcategoria'] = f['subcategoria_id']
+        if f['subcategoria_id'] is not None:
+            datos['subcategoria_nombre'] = f['subcategoria__nombre']
+        datos.update({
+            'archivo_adjunto': self._archivo(f['archivo_adjunto']),
+            'fecha_creacion': fecha(creacion),
+            'fecha_actualizacion': fecha(f['fecha_actualizacion']),
+            'fecha_cierre': fecha(f['fecha_cierre']),
+            'tiempo_estimado_resolucion': f['tiempo_estimado_resolucion'],
+            'rating': f['rating'],
+            'comentario_cierre': f['comentario_cierre'],
+            'tiempo_restante_edicion': restante,
+            'puede_editar': puede_editar,
+            'puede_eliminar': puede_editar,
+            'esta_vencido': vencido,
+            'sala_chat_id': f['chat_room__id'],
+        })
+        return datos
+
+    def representar(self, filas):
+        return [self.fila(f) for f in filas]
@@ -45,6 +45,8 @@ class TicketSerializer(serializers.ModelSerializer):
             'id', 'solicitante', 'fecha_creacion', 'fecha_actualizacion',
             'tiempo_restante_edicion', 'puede_editar', 'puede_eliminar', 'esta_vencido'
         ]
+        # Relaciones que se leen por fila (ver tickets/optimizacion.py)
+        select_related = ('solicitante', 'agente', 'categoria_principal', 'subcategoria', 'chat_room')
 
     def get_sala_chat_id(self, obj):
         """Devuelve el ID de sala de chat si existe."""
@@ -66,6 +68,15 @@ class TicketCreateSerializer(serializers.ModelSerializer):
             'archivo_adjunto'
         ]
 
+    def validate_archivo_adjunto(self, value):
+        """Aplica ConfiguracionSistema.limite_adjuntos_mb."""
+        if value:
+            from tickets.services.upload_service import UploadService
+            error = UploadService.validar_tamano(value.size)
+            if error:
+                raise serializers.ValidationError(error)
+        return value
+
     def create(self, validated_data):
         validated_data['solicitante'] = self.context['request'].user
         return super().create(validated_data)
@@ -90,6 +101,7 @@ class TicketListSerializer(serializers.ModelSerializer):
             'categoria_nombre', 'subcategoria_nombre',
             'dias_abierto'
         ]
+        select_related = ('solicitante', 'agente', 'categoria_principal', 'subcategoria')
 
     def get_dias_abierto(self, obj):
         """Días desde que se abrió el ticket."""
@@ -2,5 +2,7 @@
 from .notification_service import NotificationService
 from .assignment_service import AssignmentService
 from .state_service import StateService
+from .upload_service import UploadService
+from .busqueda_service import BusquedaTicketService
 
-__all__ = ['NotificationService', 'AssignmentService', 'StateService']
\ No newline at end of file
+__all__ = ['NotificationService', 'AssignmentService', 'StateService', 'UploadService', 'BusquedaTicketService']
\ No newline at end of file
@@ -1,10 +1,10 @@
 from django.utils import timezone
 from django.db import transaction
 from django.db.models import Count, Q
-from datetime import time
 from tickets.models import Ticket, TicketAssignment, TicketHistory, CategoriaPrincipal
 from users.models import User
 from tickets.services.notification_service import NotificationService
+from adminpanel.calendario import CalendarioService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,12 +15,14 @@ class AssignmentService:
     Servicio de asignación automática y reasignación con reglas avanzadas.
     """
 
-    HORA_LIMITE = time(15, 0, 0)  # 3:00 PM
-
     @staticmethod
-    def horario_valido():
-        ahora = timezone.localtime().time()
-        return ahora <= AssignmentService.HORA_LIMITE
+    def horario_valido(momento=None):
+        """
+        Se asigna dentro del horario laboral y antes de la hora límite
+        (ConfiguracionSistema.hora_limite_tickets, ver adminpanel/calendario.py).
+        """
+        momento = momento or timezone.now()
+        return CalendarioService.en_horario(momento) and CalendarioService.antes_de_hora_limite(momento)
 
     @staticmethod
     def asignar_agente_inicial(ticket):
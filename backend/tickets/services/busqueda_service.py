@@ -0,0 +1,76 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q
+
+from users.models import User
+
+# Palabras de la consulta (sin operadores de tsquery)
+PALABRA = re.compile(r'\w+', re.UNICODE)
+
+
+class BusquedaTicketService:
+    """
+    Búsqueda de tickets para las listas de administración.
+
+    En PostgreSQL usa la columna Ticket.busqueda (tsvector en español con
+    índice GIN) con coincidencia por prefijo y orden por relevancia; los
+    usuarios se buscan por username / email con los índices trigram
+    (pg_trgm). En otros motores se usa icontains.
+    """
+
+    @staticmethod
+    def _consulta(texto):
+        """tsquery 'palabra:* & otra:*' (prefijos) o None si no hay palabras."""
+        palabras = PALABRA.findall(texto)
+        if not palabras:
+            return None
+        return SearchQuery(
+            ' & '.join(f"{palabra}:*" for palabra in palabras), search_type='raw', config='spanish'
+        )
+
+    @staticmethod
+    def _usuarios(texto, con_email=False):
+        """
+        Ids de usuarios cuyo username (o email) contiene el texto. En
+        PostgreSQL icontains se compila como UPPER(col::text) LIKE UPPER(...),
+        cubierto por los índices trigram usuario_*_upper_trgm.
+        """
+        filtro = Q(username__icontains=texto)
+        if con_email:
+            filtro |= Q(email__icontains=texto)
+        return User.objects.filter(filtro).values('id')
+
+    @staticmethod
+    def filtrar(queryset, texto, con_email=False):
+        """
+        Aplica la búsqueda. Devuelve (queryset, ordenable_por_relevancia).
+        `#123` o un número buscan además por número de ticket.
+        """
+        texto = (texto or '').strip()
+        if not texto:
+            return queryset, False
+
+        usuarios = BusquedaTicketService._usuarios(texto, con_email)
+        condiciones = Q(solicitante_id__in=usuarios) | Q(agente_id__in=usuarios)
+        numero = texto.lstrip('#')
+        if numero.isdigit():
+            condiciones |= Q(id=int(numero))
+
+        if connection.vendor != 'postgresql':
+            return queryset.filter(
+                condiciones | Q(titulo__icontains=texto) | Q(descripcion__icontains=texto)
+            ), False
+
+        consulta = BusquedaTicketService._consulta(texto)
+        if consulta is None:
+            return queryset.filter(condiciones), False
+        return queryset.filter(condiciones | Q(busqueda=consulta)).annotate(
+            relevancia=SearchRank(F('busqueda'), consulta)
+        ), True
+
+    @staticmethod
+    def ordenar_por_relevancia(queryset):
+        # Coincidencias solo por número o usuario no tienen rango: al final
+        return queryset.order_by(F('relevancia').desc(nulls_last=True), '-fecha_creacion')
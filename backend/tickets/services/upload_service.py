@@ -0,0 +1,306 @@
+import hashlib
+import logging
+import os
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from tickets.condicional import VersionTablas
+from tickets.models import Ticket, TicketHistory, UploadSession
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+class UploadService:
+    """
+    Servicio de subidas por partes (reanudables) para adjuntos de tickets y chat.
+    """
+
+    CHUNK_MAX_BYTES = 5 * 1024 * 1024      # Tamaño máximo de cada parte
+    CHUNK_SUGERIDO_BYTES = 1024 * 1024     # Tamaño recomendado al cliente
+    READ_BLOCK = 64 * 1024
+    EXPIRACION = timedelta(hours=24)       # Subidas activas sin actividad
+    LIMITE_CACHE_KEY = "config:limite_adjuntos_bytes"
+
+    # -------------------------------------------
+    # Límite configurado (ConfiguracionSistema)
+    # -------------------------------------------
+    @staticmethod
+    def limite_bytes():
+        """Límite de adjuntos en bytes, leído de ConfiguracionSistema (cacheado 60 s)."""
+        limite = cache.get(UploadService.LIMITE_CACHE_KEY)
+        if limite is None:
+            from adminpanel.models import ConfiguracionSistema
+            mb = ConfiguracionSistema.objects.filter(pk=1).values_list(
+                'limite_adjuntos_mb', flat=True
+            ).first()
+            limite = (mb if mb is not None else 10) * 1024 * 1024
+            cache.set(UploadService.LIMITE_CACHE_KEY, limite, 60)
+        return limite
+
+    @staticmethod
+    def validar_tamano(tamano):
+        """Devuelve un mensaje de error si el tamaño supera el límite configurado."""
+        limite = UploadService.limite_bytes()
+        if tamano > limite:
+            return f"El archivo supera el límite de {limite // (1024 * 1024)} MB."
+        return None
+
+    # -------------------------------------------
+    # init / append / complete
+    # -------------------------------------------
+    @staticmethod
+    def iniciar(usuario, nombre_archivo, tamano_total, sha256=""):
+        if tamano_total <= 0:
+            return {"error": "El tamaño del archivo debe ser mayor a 0.", "status": 400}
+
+        error = UploadService.validar_tamano(tamano_total)
+        if error:
+            return {"error": error, "status": 413}
+
+        subida = UploadSession.objects.create(
+            usuario=usuario,
+            nombre_archivo=os.path.basename(nombre_archivo)[:255],
+            tamano_total=tamano_total,
+            sha256=(sha256 or "").lower(),
+        )
+        os.makedirs(os.path.dirname(subida.ruta_temporal), exist_ok=True)
+        open(subida.ruta_temporal, "wb").close()
+
+        return {"success": True, "subida": subida}
+
+    @staticmethod
+    def agregar_parte(subida, offset, stream, longitud, sha256_parte=None):
+        """
+        Escribe una parte en el archivo temporal a partir de `offset`.
+        El offset debe coincidir con lo ya recibido (si no, el cliente debe reanudar
+        desde `recibido`). Si se envía el checksum de la parte y no coincide,
+        la parte se descarta.
+        """
+        if subida.estado != 'activa':
+            return {"error": "La subida no está activa.", "status": 409}
+
+        if offset != subida.recibido:
+            return {
+                "error": "Offset inválido.",
+                "status": 409,
+                "recibido": subida.recibido,
+            }
+
+        if longitud <= 0 or longitud > UploadService.CHUNK_MAX_BYTES:
+            return {"error": "Tamaño de parte inválido.", "status": 400}
+
+        if subida.recibido + longitud > subida.tamano_total:
+            return {"error": "La parte excede el tamaño declarado.", "status": 413}
+
+        digest = hashlib.sha256()
+        escritos = 0
+        with open(subida.ruta_temporal, "r+b") as destino:
+            destino.seek(offset)
+            while escritos < longitud:
+                bloque = stream.read(min(UploadService.READ_BLOCK, longitud - escritos))
+                if not bloque:
+                    break
+                digest.update(bloque)
+                destino.write(bloque)
+                escritos += len(bloque)
+
+            if escritos != longitud or (sha256_parte and digest.hexdigest() != sha256_parte.lower()):
+                # Parte incompleta o corrupta: volver al último offset válido
+                destino.truncate(offset)
+                if escritos != longitud:
+                    return {"error": "La parte llegó incompleta.", "status": 400, "recibido": offset}
+                return {"error": "Checksum de la parte inválido.", "status": 400, "recibido": offset}
+
+        # Avance atómico: solo si nadie escribió este mismo offset en paralelo
+        actualizadas = UploadSession.objects.filter(
+            id=subida.id, recibido=offset, estado='activa'
+        ).update(recibido=offset + escritos, fecha_actualizacion=timezone.now())
+        if not actualizadas:
+            subida.refresh_from_db(fields=["recibido"])
+            return {"error": "Offset inválido.", "status": 409, "recibido": subida.recibido}
+
+        subida.recibido = offset + escritos
+        return {"success": True, "recibido": subida.recibido}
+
+    @staticmethod
+    def checksum_archivo(ruta):
+        digest = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(UploadService.READ_BLOCK), b""):
+                digest.update(bloque)
+        return digest.hexdigest()
+
+    @staticmethod
+    def completar(subida, usuario, destino, **datos):
+        """
+        Verifica tamaño y checksum y adjunta el archivo al destino en un solo paso.
+        destino = 'ticket' (datos: ticket_id) o 'mensaje'
+        (datos: room_id o group_name, content opcional).
+
+        La sesión se bloquea (select_for_update) hasta terminar: un segundo
+        complete concurrente espera y encuentra la subida ya completada.
+        """
+        with transaction.atomic():
+            subida = UploadSession.objects.select_for_update().filter(id=subida.id).first()
+            if subida is None or subida.estado != 'activa':
+                return {"error": "La subida no está activa.", "status": 409}
+            return UploadService._completar(subida, usuario, destino, datos)
+
+    @staticmethod
+    def _completar(subida, usuario, destino, datos):
+        if not subida.completa:
+            return {
+                "error": "La subida está incompleta.",
+                "status": 409,
+                "recibido": subida.recibido,
+            }
+
+        checksum = UploadService.checksum_archivo(subida.ruta_temporal)
+        if subida.sha256 and checksum != subida.sha256:
+            return {"error": "El checksum del archivo no coincide.", "status": 400}
+
+        if destino == 'ticket':
+            resultado = UploadService._adjuntar_a_ticket(subida, usuario, datos.get("ticket_id"))
+        elif destino == 'mensaje':
+            resultado = UploadService._adjuntar_a_mensaje(subida, usuario, datos)
+        else:
+            return {"error": "Destino inválido. Use 'ticket' o 'mensaje'.", "status": 400}
+
+        if "error" not in resultado:
+            resultado["sha256"] = checksum
+        return resultado
+
+    @staticmethod
+    def cancelar(subida):
+        UploadSession.objects.filter(id=subida.id).update(estado='cancelada')
+        UploadService._borrar_temporal(subida)
+
+    # -------------------------------------------
+    # Destinos
+    # -------------------------------------------
+    @staticmethod
+    def _mover_a_storage(subida, field_file, upload_to):
+        """
+        Mueve el archivo temporal a su ubicación final (sin copiar)
+        y asigna el nombre al FileField.
+        """
+        nombre = default_storage.get_available_name(
+            os.path.join(upload_to, subida.nombre_archivo)
+        )
+        ruta_final = default_storage.path(nombre)
+        os.makedirs(os.path.dirname(ruta_final), exist_ok=True)
+        os.replace(subida.ruta_temporal, ruta_final)
+        field_file.name = nombre
+        return ruta_final
+
+    @staticmethod
+    def _adjuntar_a_ticket(subida, usuario, ticket_id):
+        ticket = Ticket.objects.filter(id=ticket_id).first()
+        if not ticket:
+            return {"error": "Ticket no encontrado.", "status": 404}
+
+        es_admin = usuario.rol and usuario.rol.tipo_base == 'admin'
+        if usuario.id not in (ticket.solicitante_id, ticket.agente_id) and not es_admin:
+            return {"error": "No tienes permisos sobre este ticket.", "status": 403}
+
+        with transaction.atomic():
+            anterior = ticket.archivo_adjunto.name if ticket.archivo_adjunto else None
+            ruta_final = UploadService._mover_a_storage(
+                subida, ticket.archivo_adjunto, 'tickets/adjuntos/'
+            )
+            try:
+                # update() directo: no dispara las señales post_save del ticket
+                Ticket.objects.filter(id=ticket.id).update(
+                    archivo_adjunto=ticket.archivo_adjunto.name,
+                    fecha_actualizacion=timezone.now(),
+                )
+                transaction.on_commit(lambda: VersionTablas.invalidar('tickets'))
+                TicketHistory.objects.create(
+                    ticket=ticket,
+                    usuario=usuario,
+                    accion="Adjunto",
+                    descripcion=f"Archivo adjuntado: {subida.nombre_archivo}"
+                )
+                UploadSession.objects.filter(id=subida.id).update(estado='completada')
+            except Exception:
+                os.replace(ruta_final, subida.ruta_temporal)
+                raise
+
+        if anterior:
+            transaction.on_commit(lambda: default_storage.delete(anterior))
+
+        return {"success": True, "ticket_id": ticket.id, "archivo": ticket.archivo_adjunto.name}
+
+    @staticmethod
+    def _adjuntar_a_mensaje(subida, usuario, datos):
+        from chat.models import ChatRoom, GroupChat, GroupMembership, Message
+        from chat.notification_utils import create_notifications_for_message
+
+        room = group = None
+        if datos.get("room_id"):
+            room = ChatRoom.objects.filter(id=datos["room_id"]).select_related("ticket").first()
+            if not room:
+                return {"error": "Chat no encontrado.", "status": 404}
+            if not room.participants.filter(id=usuario.id).exists():
+                return {"error": "No tienes acceso a este chat.", "status": 403}
+            if not room.is_active:
+                return {"error": "Este chat está cerrado.", "status": 400}
+            if room.type == 'TICKET' and (not room.ticket or room.ticket.estado != 'En Proceso'):
+                return {"error": "El chat solo está activo cuando el ticket está 'En Proceso'.", "status": 403}
+        elif datos.get("group_name"):
+            group = GroupChat.objects.filter(name=datos["group_name"]).first()
+            if not group:
+                return {"error": "Grupo no encontrado.", "status": 404}
+            if not GroupMembership.objects.filter(group=group, user=usuario).exists():
+                return {"error": "No eres miembro de este grupo.", "status": 403}
+        else:
+            return {"error": "Debe indicar room_id o group_name.", "status": 400}
+
+        tipo = "image" if subida.nombre_archivo.lower().endswith(IMAGE_EXTENSIONS) else "file"
+
+        with transaction.atomic():
+            message = Message(
+                room=room,
+                group=group,
+                sender=usuario,
+                content=(datos.get("content") or "").strip(),
+                message_type=tipo,
+            )
+            ruta_final = UploadService._mover_a_storage(subida, message.file, 'chat_files/')
+            try:
+                message.save()
+                UploadSession.objects.filter(id=subida.id).update(estado='completada')
+            except Exception:
+                os.replace(ruta_final, subida.ruta_temporal)
+                raise
+
+        transaction.on_commit(lambda: create_notifications_for_message(message))
+        return {"success": True, "message": message}
+
+    # -------------------------------------------
+    # Limpieza
+    # -------------------------------------------
+    @staticmethod
+    def _borrar_temporal(subida):
+        try:
+            os.remove(subida.ruta_temporal)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def limpiar_expiradas():
+        """Cancela subidas activas sin actividad y borra sus temporales."""
+        limite = timezone.now() - UploadService.EXPIRACION
+        expiradas = list(UploadSession.objects.filter(
+            estado='activa', fecha_actualizacion__lt=limite
+        ))
+        for subida in expiradas:
+            UploadService._borrar_temporal(subida)
+        UploadSession.objects.filter(id__in=[s.id for s in expiradas]).update(estado='cancelada')
+        return len(expiradas)
@@ -48,4 +48,16 @@ def expirar_reasignaciones():
     except Exception as e:
         error_msg = f"❌ Error en expirar_reasignaciones: {str(e)}"
         print(error_msg)
-        raise
\ No newline at end of file
+        raise
+
+@shared_task
+def limpiar_subidas_expiradas():
+    """
+    Cancela las subidas por partes sin actividad y borra sus archivos temporales.
+    """
+    from tickets.services.upload_service import UploadService
+
+    total = UploadService.limpiar_expiradas()
+    resultado = f"🧹 Subidas expiradas canceladas: {total}"
+    print(resultado)
+    return resultado
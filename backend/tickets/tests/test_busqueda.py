@@ -0,0 +1,52 @@
+import pytest
+
+from django.db import connection
+
+from tickets.models import Ticket
+from tickets.services.busqueda_service import BusquedaTicketService
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def tickets():
+    ana = User.objects.create_user(username="ana.lopez", email="ana@empresa.com", password="123")
+    luis = User.objects.create_user(username="luis", email="luis@empresa.com", password="123")
+    # bulk_create: sin señales de notificación
+    return Ticket.objects.bulk_create([
+        Ticket(titulo="Impresora sin tóner", descripcion="La impresora del piso 2", solicitante=ana),
+        Ticket(titulo="Acceso VPN", descripcion="No conecta desde casa", solicitante=luis, agente=ana),
+        Ticket(titulo="Correo", descripcion="Buzón lleno", solicitante=luis),
+    ])
+
+
+def buscar(texto, **kwargs):
+    queryset, _ = BusquedaTicketService.filtrar(Ticket.objects.all(), texto, **kwargs)
+    return set(queryset.values_list('titulo', flat=True))
+
+
+def test_busqueda_por_texto_usuario_y_numero(tickets):
+    assert buscar("impresora") == {"Impresora sin tóner"}
+    # Solicitante o agente
+    assert buscar("ana.lo") == {"Impresora sin tóner", "Acceso VPN"}
+    assert buscar("luis@empresa", con_email=True) == {"Acceso VPN", "Correo"}
+    assert buscar(f"#{tickets[2].id}") == {"Correo"}
+    assert buscar("   ") == {"Impresora sin tóner", "Acceso VPN", "Correo"}
+
+
+def test_consulta_por_prefijo():
+    consulta = BusquedaTicketService._consulta("impres  VPN!")
+    assert consulta.source_expressions[-1].value == "impres:* & VPN:*"
+    assert BusquedaTicketService._consulta("&|!") is None
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason="índices trigram solo en PostgreSQL")
+def test_busqueda_de_usuarios_usa_indices_trigram():
+    sql, params = BusquedaTicketService._usuarios("ana", con_email=True).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute(f"EXPLAIN {sql}", params)
+        plan = "\n".join(fila[0] for fila in cursor.fetchall())
+    assert "usuario_username_upper_trgm" in plan
+    assert "usuario_email_upper_trgm" in plan
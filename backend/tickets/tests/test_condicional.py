@@ -0,0 +1,81 @@
+import pytest
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tickets.models import CategoriaPrincipal, Ticket, TicketHistory
+from users.models import Rol, User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def cliente():
+    rol, _ = Rol.objects.get_or_create(nombre_clave="solicitante_test", defaults={'tipo_base': 'solicitante'})
+    ana = User.objects.create_user(username="ana", password="123", rol=rol)
+    client = APIClient()
+    client.force_authenticate(ana)
+    return client, ana
+
+
+def test_detalle_de_ticket_responde_304_hasta_que_cambia(cliente):
+    client, ana = cliente
+    ticket = Ticket.objects.bulk_create([Ticket(titulo="Impresora", descripcion="...", solicitante=ana)])[0]
+    # Fuera de la ventana de edición: el detalle ya no depende de la hora
+    Ticket.objects.filter(id=ticket.id).update(fecha_creacion=timezone.now() - timedelta(hours=1))
+    url = f'/api/user/tickets/{ticket.id}/'
+
+    primera = client.get(url)
+    assert primera.status_code == 200
+    assert primera['ETag'] and primera['Last-Modified']
+    assert 'no-cache' in primera['Cache-Control']
+
+    repetida = client.get(url, HTTP_IF_NONE_MATCH=primera['ETag'])
+    assert repetida.status_code == 304
+    assert repetida['ETag'] == primera['ETag']
+
+    TicketHistory.objects.create(ticket=ticket, usuario=ana, accion="Comentario añadido", descripcion="...")
+    cambiada = client.get(url, HTTP_IF_NONE_MATCH=primera['ETag'])
+    assert cambiada.status_code == 200
+    assert cambiada['ETag'] != primera['ETag']
+
+
+def test_detalle_en_ventana_de_edicion_sin_validadores(cliente):
+    client, ana = cliente
+    ticket = Ticket.objects.bulk_create([Ticket(titulo="Nuevo", descripcion="...", solicitante=ana)])[0]
+    response = client.get(f'/api/user/tickets/{ticket.id}/')
+    assert response.status_code == 200
+    assert not response.has_header('ETag')
+
+
+def test_categorias_304_hasta_que_cambia_la_version(cliente, django_capture_on_commit_callbacks):
+    client, _ = cliente
+    primera = client.get('/api/categorias/')
+    assert primera.status_code == 200
+    assert client.get('/api/categorias/', HTTP_IF_NONE_MATCH=primera['ETag']).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        CategoriaPrincipal.objects.create(nombre="Telefonía")
+    cambiada = client.get('/api/categorias/', HTTP_IF_NONE_MATCH=primera['ETag'])
+    assert cambiada.status_code == 200
+    assert "Telefonía" in cambiada.content.decode()
+
+
+def test_update_masivo_cambia_el_etag_de_agentes(cliente, django_capture_on_commit_callbacks):
+    from adminpanel.metricas import MetricasTicketService
+
+    client, ana = cliente
+    rol, _ = Rol.objects.get_or_create(nombre_clave="agente_test", defaults={'tipo_base': 'agente'})
+    luis = User.objects.create_user(username="luis", password="123", rol=rol)
+    ticket = Ticket.objects.bulk_create([Ticket(titulo="VPN", descripcion="...", solicitante=ana)])[0]
+
+    url = '/api/agent/agentes-conectados/'
+    primera = client.get(url)
+    assert client.get(url, HTTP_IF_NONE_MATCH=primera['ETag']).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        MetricasTicketService.update_masivo(Ticket.objects.filter(id=ticket.id), agente=luis)
+    cambiada = client.get(url, HTTP_IF_NONE_MATCH=primera['ETag'])
+    assert cambiada.status_code == 200
+    assert cambiada.data['agentes'][0]['tickets_activos'] == 1
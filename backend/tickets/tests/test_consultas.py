@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from chat.models import ChatRoom
+from tickets.models import CategoriaPrincipal, Subcategoria, Ticket
+from users.models import Rol, User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def usuarios():
+    roles = {
+        tipo: Rol.objects.get_or_create(nombre_clave=f"{tipo}_test", defaults={'nombre_visible': tipo, 'tipo_base': tipo})[0]
+        for tipo in ('admin', 'agente', 'solicitante')
+    }
+    return {tipo: User.objects.create_user(username=tipo, password="123", rol=rol) for tipo, rol in roles.items()}
+
+
+def crear_tickets(usuarios, cantidad):
+    categoria, _ = CategoriaPrincipal.objects.get_or_create(nombre="Redes")
+    subcategoria, _ = Subcategoria.objects.get_or_create(nombre="Wifi", categoria=categoria)
+    # bulk_create: sin señales de notificación
+    tickets = Ticket.objects.bulk_create([
+        Ticket(titulo=f"T{i}", descripcion="...", solicitante=usuarios['solicitante'], agente=usuarios['agente'],
+               categoria_principal=categoria, subcategoria=subcategoria)
+        for i in range(cantidad)
+    ])
+    ChatRoom.objects.bulk_create([ChatRoom(ticket=t) for t in tickets[::2]])
+    # Más filas también para la lista de usuarios del panel
+    inicio = User.objects.count()
+    User.objects.bulk_create([
+        User(username=f"usuario{inicio + i}", rol=usuarios['agente'].rol) for i in range(cantidad)
+    ])
+
+
+def consultas(usuario, url):
+    client = APIClient()
+    client.force_authenticate(usuario)
+    with CaptureQueriesContext(connection) as capturadas:
+        response = client.get(url)
+    assert response.status_code == 200, response.data
+    return len(capturadas), len(response.data['results'])
+
+
+@pytest.mark.parametrize('tipo,url', [
+    ('solicitante', '/api/user/tickets/'),
+    ('agente', '/api/agent/tickets/'),
+    ('agente', '/api/agent/tickets/tickets-asignados-a-mi/'),
+    ('admin', '/api/admin/tickets/'),
+    ('admin', '/api/adminpanel/tickets/'),
+    ('admin', '/api/adminpanel/agentes/'),
+])
+def test_consultas_constantes_por_pagina(usuarios, tipo, url):
+    crear_tickets(usuarios, 2)
+    consultas(usuarios[tipo], url)  # catálogos y cachés ya cargados
+
+    pocas, filas_pocas = consultas(usuarios[tipo], url)
+    crear_tickets(usuarios, 10)
+    muchas, filas_muchas = consultas(usuarios[tipo], url)
+
+    assert filas_muchas > filas_pocas
+    assert muchas == pocas
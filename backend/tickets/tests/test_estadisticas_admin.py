@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tickets.models import Ticket
+from users.models import Rol, User
+
+pytestmark = pytest.mark.django_db
+
+
+# ---------------------------------------------------------
+# 🧪 Fixtures
+# ---------------------------------------------------------
+@pytest.fixture(autouse=True)
+def cache_local(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+
+
+@pytest.fixture
+def agente():
+    rol = Rol.objects.create(nombre_clave="agente_test", nombre_visible="Agente", tipo_base="agente")
+    return User.objects.create_user(username="agente1", password="123", rol=rol)
+
+
+@pytest.fixture
+def cliente(agente):
+    client = APIClient()
+    client.force_authenticate(agente)
+    return client
+
+
+@pytest.fixture
+def tickets(agente):
+    ahora = timezone.now()
+    # bulk_create: sin señales de notificación, no son parte de esta prueba
+    creados = Ticket.objects.bulk_create([
+        Ticket(titulo="Resuelto", descripcion="...", solicitante=agente, agente=agente,
+               estado="Resuelto", rating=4, fecha_cierre=ahora + timedelta(hours=3)),
+        Ticket(titulo="Resuelto 2", descripcion="...", solicitante=agente, agente=agente,
+               estado="Resuelto", rating=2, fecha_cierre=ahora + timedelta(hours=1)),
+        Ticket(titulo="Vencido", descripcion="...", solicitante=agente, agente=agente,
+               estado="En Proceso", tiempo_estimado_resolucion=24),
+        Ticket(titulo="A tiempo", descripcion="...", solicitante=agente, estado="Abierto",
+               tiempo_estimado_resolucion=24),
+    ])
+    Ticket.objects.update(fecha_creacion=ahora)
+    Ticket.objects.filter(titulo="Vencido").update(
+        fecha_creacion=ahora - timedelta(hours=30), fecha_limite_resolucion=ahora - timedelta(hours=6)
+    )
+    Ticket.objects.filter(titulo="A tiempo").update(fecha_limite_resolucion=ahora + timedelta(minutes=30))
+    return creados
+
+
+def test_estadisticas(cliente, tickets):
+    datos = cliente.get("/api/admin/tickets/estadisticas/").data["estadisticas_generales"]
+
+    assert datos["total_tickets"] == 4
+    assert (datos["tickets_abiertos"], datos["tickets_en_proceso"], datos["tickets_resueltos"]) == (1, 1, 2)
+    assert datos["tickets_vencidos"] == 1
+    assert datos["tickets_por_vencer"] == 1
+    assert datos["tiempo_promedio_resolucion_horas"] == 2.0
+
+
+def test_reporte_agentes(cliente, tickets, django_assert_max_num_queries):
+    with django_assert_max_num_queries(1):
+        reporte = cliente.get("/api/admin/tickets/reporte_agentes/").data["reporte_agentes"]
+
+    assert reporte == [{
+        "agente": "agente1",
+        "role": "Agente",
+        "tickets_asignados": 3,
+        "tickets_resueltos": 2,
+        "tickets_vencidos": 1,
+        "tasa_resolucion": 66.7,
+        "rating_promedio": 3.0,
+    }]
+
+
+def test_fechas_limite_al_cambiar_categoria(agente):
+    from adminpanel.models import SLA
+    from tickets.models import CategoriaPrincipal
+
+    redes = CategoriaPrincipal.objects.create(nombre="Redes", tiempo_resolucion_horas=8)
+    otra = CategoriaPrincipal.objects.create(nombre="Otra", tiempo_resolucion_horas=48)
+    SLA.objects.create(nombre="redes", tiempo_respuesta_horas=2, tiempo_resolucion_horas=8)
+    creado, = Ticket.objects.bulk_create([
+        Ticket(titulo="T", descripcion="...", solicitante=agente, categoria_principal=otra)
+    ])
+
+    ticket = Ticket.objects.get(pk=creado.pk)
+    ticket.categoria_principal = redes
+    ticket.save(update_fields=['categoria_principal'])
+    ticket.refresh_from_db()
+    creacion = ticket.fecha_creacion
+    assert ticket.fecha_limite_respuesta == creacion + timedelta(hours=2)
+    assert ticket.fecha_limite_resolucion == creacion + timedelta(hours=8)
+
+    # Sin SLA para la categoría: no hay fecha límite de respuesta
+    ticket.categoria_principal = otra
+    ticket.save()
+    ticket.refresh_from_db()
+    assert ticket.fecha_limite_respuesta is None
+    assert ticket.fecha_limite_resolucion == creacion + timedelta(hours=48)
+
+
+def test_guardar_sin_cambios_conserva_fechas_limite(agente):
+    from unittest import mock
+
+    creado, = Ticket.objects.bulk_create([Ticket(titulo="T", descripcion="...", solicitante=agente)])
+    Ticket.objects.get(pk=creado.pk).save()
+    ticket = Ticket.objects.get(pk=creado.pk)
+    limite = ticket.fecha_limite_resolucion
+    assert limite is not None
+
+    ticket.titulo = "Otro título"
+    with mock.patch('adminpanel.calendario.CalendarioService.sumar_horas') as sumar:
+        ticket.save(update_fields=['titulo'])
+    sumar.assert_not_called()
+    ticket.refresh_from_db()
+    assert ticket.fecha_limite_resolucion == limite
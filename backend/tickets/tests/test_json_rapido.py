@@ -0,0 +1,48 @@
+import io
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from hr_backend import json_rapido
+
+DATOS = {
+    'results': [{
+        'id': 1,
+        'titulo': 'Impresora sin tóner\u2028',
+        'creado': datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=dt_timezone.utc),
+        'local': datetime(2026, 1, 2, 3, 4, 5, tzinfo=ZoneInfo('America/Guayaquil')),
+        'fecha': date(2026, 1, 2),
+        'monto': Decimal('10.50'),
+        'duracion': timedelta(hours=1),
+        'uuid': uuid.UUID(int=1),
+        'rating': None,
+    }],
+    'por_id': {1: 'Alta', 2: 'Media'},
+}
+
+
+@pytest.mark.parametrize('con_orjson', [True, False])
+def test_mismo_json_que_drf(monkeypatch, con_orjson):
+    if not con_orjson:
+        monkeypatch.setattr(json_rapido, 'orjson', None)
+    elif json_rapido.orjson is None:
+        pytest.skip("orjson no está instalado")
+
+    assert json_rapido.JSONRapidoRenderer().render(DATOS) == JSONRenderer().render(DATOS)
+    assert json_rapido.dumps(DATOS) == JSONRenderer().render(DATOS).decode().replace('\\u2028', '\u2028')
+    with pytest.raises(TypeError):
+        json_rapido.dumps({'objeto': object()})
+
+
+def test_parser():
+    parser = json_rapido.JSONRapidoParser()
+    assert parser.parse(io.BytesIO('{"titulo": "Acción", "ids": [1, 2]}'.encode())) == {
+        'titulo': 'Acción', 'ids': [1, 2]
+    }
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"titulo": NaN}'))
@@ -0,0 +1,63 @@
+import pytest
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from chat.models import ChatRoom
+from tickets.models import CategoriaPrincipal, Subcategoria, Ticket
+from tickets.serializers import TicketListaRapida, TicketSerializer
+from tickets.serializers.lista_rapida import COMPATIBLE
+from users.models import Rol, User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def tickets():
+    rol, _ = Rol.objects.get_or_create(nombre_clave="solicitante_test", defaults={'tipo_base': 'solicitante'})
+    ana = User.objects.create_user(username="ana", email="ana@empresa.com", password="123", rol=rol)
+    luis = User.objects.create_user(username="luis", password="123")
+    categoria, _ = CategoriaPrincipal.objects.get_or_create(nombre="Redes")
+    subcategoria, _ = Subcategoria.objects.get_or_create(nombre="Wifi", categoria=categoria)
+    # bulk_create: sin señales de notificación
+    creados = Ticket.objects.bulk_create([
+        Ticket(titulo="Nuevo", descripcion="...", solicitante=ana),
+        Ticket(titulo="Asignado", descripcion="...", solicitante=ana, agente=luis, categoria_principal=categoria,
+               subcategoria=subcategoria, estado='En Proceso', archivo_adjunto='tickets/adjuntos/captura.png'),
+        Ticket(titulo="Cerrado", descripcion="...", solicitante=ana, categoria_principal=categoria,
+               estado='Cerrado', rating=4, comentario_cierre="Listo"),
+        Ticket(titulo="Sin solicitante", descripcion="...", solicitante=None, tiempo_estimado_resolucion=1),
+    ])
+    hace_dos_horas = timezone.now() - timedelta(hours=2)
+    Ticket.objects.filter(id__in=[creados[2].id, creados[3].id]).update(
+        fecha_creacion=hace_dos_horas, fecha_cierre=hace_dos_horas
+    )
+    Ticket.objects.filter(id=creados[1].id).update(fecha_limite_resolucion=hace_dos_horas)
+    ChatRoom.objects.create(ticket=creados[1])
+    return ana
+
+
+def test_mismo_json_que_el_serializer(tickets):
+    assert COMPATIBLE
+    request = Request(APIRequestFactory().get('/api/user/tickets/'))
+    queryset = Ticket.objects.order_by('-fecha_creacion', '-id')
+    ahora = timezone.now()
+    with mock.patch('django.utils.timezone.now', return_value=ahora):
+        esperado = JSONRenderer().render(TicketSerializer(queryset, many=True, context={'request': request}).data)
+        rapido = JSONRenderer().render(
+            TicketListaRapida(request, ahora).representar(TicketListaRapida.valores(queryset))
+        )
+    assert rapido == esperado
+
+
+def test_lista_de_la_vista_con_cursor(tickets):
+    client = APIClient()
+    client.force_authenticate(tickets)
+    response = client.get('/api/user/tickets/?paginacion=cursor&page_size=2')
+    assert [t['titulo'] for t in response.data['results']] == ["Asignado", "Nuevo"]
+    siguiente = client.get(response.data['next'])
+    assert [t['titulo'] for t in siguiente.data['results']] == ["Cerrado"]
@@ -0,0 +1,79 @@
+import pytest
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import parse_qs, urlparse
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from tickets.models import Ticket
+from tickets.pagination import TicketPagination
+from users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def tickets():
+    ana = User.objects.create_user(username="ana", password="123")
+    Ticket.objects.bulk_create([Ticket(titulo=f"T{i}", descripcion="...", solicitante=ana) for i in range(25)])
+    # Fechas repetidas: el desempate por id debe mantener el orden entre páginas
+    ids = list(Ticket.objects.order_by('id').values_list('id', flat=True))
+    Ticket.objects.filter(id__in=ids[:12]).update(fecha_creacion=datetime(2026, 1, 1, tzinfo=dt_timezone.utc))
+    Ticket.objects.filter(id__in=ids[12:]).update(fecha_creacion=datetime(2026, 1, 2, tzinfo=dt_timezone.utc))
+    return Ticket.objects.order_by('-fecha_creacion', '-id')
+
+
+def pagina(queryset, url):
+    paginador = TicketPagination()
+    filas = paginador.paginate_queryset(queryset, Request(APIRequestFactory().get(url)))
+    return [t.id for t in filas], paginador.get_paginated_response([]).data
+
+
+def test_recorrido_por_cursor(tickets):
+    esperado = list(tickets.values_list('id', flat=True))
+    vistos, url, paginas = [], '/api/tickets/?paginacion=cursor&conteo=aproximado', []
+    while url:
+        ids, datos = pagina(tickets, url)
+        assert 'count' not in datos
+        vistos += ids
+        paginas.append((ids, datos))
+        url = datos['next']
+    assert vistos == esperado
+    assert [len(ids) for ids, _ in paginas] == [10, 10, 5]
+    assert paginas[0][1]['previous'] is None
+    # count_aproximado solo en PostgreSQL (None en otros motores)
+    assert 'count_aproximado' in paginas[0][1] and 'conteo' not in paginas[0][1]['next']
+
+    # La página previa de la tercera es la segunda
+    previa = paginas[2][1]['previous']
+    ids, datos = pagina(tickets, previa)
+    assert ids == paginas[1][0]
+    assert datos['next'] and datos['previous']
+
+    cursor = parse_qs(urlparse(datos['next']).query)['cursor'][0]
+    assert pagina(tickets, f'/api/tickets/?cursor={cursor}&page_size=3')[0] == esperado[20:23]
+
+
+def test_sin_cursor_o_con_otro_orden_pagina_por_numero(tickets):
+    _, datos = pagina(tickets, '/api/tickets/')
+    assert datos['count'] == 25
+    _, datos = pagina(tickets.order_by('titulo'), '/api/tickets/?paginacion=cursor')
+    assert datos['count'] == 25
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason="plan de PostgreSQL")
+def test_cursor_usa_clave_de_inicio_en_el_indice(tickets):
+    _, datos = pagina(tickets, '/api/tickets/?paginacion=cursor&page_size=5')
+    with CaptureQueriesContext(connection) as consultas:
+        pagina(tickets, datos['next'])
+    sql = consultas.captured_queries[-1]['sql']
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_sort = off")
+        cursor.execute(f"EXPLAIN {sql}")
+        plan = [fila[0] for fila in cursor.fetchall()]
+    assert any('ticket_creacion_id_idx' in linea for linea in plan)
+    # La fecha del cursor acota el recorrido del índice (no se filtra fila por fila)
+    assert any('Index Cond' in linea and 'fecha_creacion' in linea for linea in plan)
@@ -0,0 +1,128 @@
+import hashlib
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from adminpanel.models import ConfiguracionSistema
+from tickets.models import Ticket, UploadSession
+from users.models import Rol, User
+
+pytestmark = pytest.mark.django_db
+
+CONTENIDO = b"%PDF-" + b"x" * 3000
+
+
+# ---------------------------------------------------------
+# 🧪 Fixtures
+# ---------------------------------------------------------
+@pytest.fixture(autouse=True)
+def media_tmp(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    cache.clear()
+
+
+@pytest.fixture
+def solicitante():
+    rol = Rol.objects.create(nombre_clave="solicitante_test", nombre_visible="Solicitante", tipo_base="solicitante")
+    return User.objects.create_user(username="sol", password="123", rol=rol)
+
+
+@pytest.fixture
+def cliente(solicitante):
+    client = APIClient()
+    client.force_authenticate(solicitante)
+    return client
+
+
+@pytest.fixture
+def ticket(solicitante):
+    # bulk_create: sin señales de notificación, no son parte de esta prueba
+    return Ticket.objects.bulk_create([
+        Ticket(titulo="Con adjunto", descripcion="...", solicitante=solicitante)
+    ])[0]
+
+
+def iniciar(cliente, contenido=CONTENIDO, **extra):
+    return cliente.post("/api/uploads/", {
+        "nombre_archivo": "reporte.pdf",
+        "tamano_total": len(contenido),
+        "sha256": hashlib.sha256(contenido).hexdigest(),
+        **extra,
+    }, format="json")
+
+
+def enviar_parte(cliente, subida_id, offset, parte):
+    return cliente.generic(
+        "PUT", f"/api/uploads/{subida_id}/append/", parte,
+        content_type="application/octet-stream",
+        HTTP_UPLOAD_OFFSET=str(offset),
+        HTTP_X_CHUNK_SHA256=hashlib.sha256(parte).hexdigest(),
+    )
+
+
+# ---------------------------------------------------------
+# 🧪 1. Flujo completo init → append → complete
+# ---------------------------------------------------------
+def test_subida_por_partes_adjunta_al_ticket(cliente, ticket):
+    subida_id = iniciar(cliente).data["id"]
+
+    assert enviar_parte(cliente, subida_id, 0, CONTENIDO[:1000]).data["recibido"] == 1000
+
+    # Reintento con offset viejo → 409 con el offset correcto para reanudar
+    repetida = enviar_parte(cliente, subida_id, 0, CONTENIDO[:1000])
+    assert repetida.status_code == 409
+    assert repetida.data["recibido"] == 1000
+
+    assert enviar_parte(cliente, subida_id, 1000, CONTENIDO[1000:]).status_code == 200
+
+    response = cliente.post(f"/api/uploads/{subida_id}/complete/", {
+        "destino": "ticket", "ticket_id": ticket.id,
+    }, format="json")
+    assert response.status_code == 201
+
+    ticket.refresh_from_db()
+    with ticket.archivo_adjunto.open("rb") as f:
+        assert f.read() == CONTENIDO
+    assert UploadSession.objects.get(id=subida_id).estado == "completada"
+
+    # Un segundo complete no vuelve a mover el archivo
+    repetido = cliente.post(f"/api/uploads/{subida_id}/complete/", {
+        "destino": "ticket", "ticket_id": ticket.id,
+    }, format="json")
+    assert repetido.status_code == 409
+
+
+def test_complete_con_ids_no_numericos(cliente):
+    subida_id = iniciar(cliente).data["id"]
+    enviar_parte(cliente, subida_id, 0, CONTENIDO)
+    for datos in ({"destino": "ticket", "ticket_id": "abc"}, {"destino": "mensaje", "room_id": "1;"}):
+        response = cliente.post(f"/api/uploads/{subida_id}/complete/", datos, format="json")
+        assert response.status_code == 400
+    assert UploadSession.objects.get(id=subida_id).estado == "activa"
+
+
+# ---------------------------------------------------------
+# 🧪 2. Límite de ConfiguracionSistema.limite_adjuntos_mb
+# ---------------------------------------------------------
+def test_limite_de_adjuntos_se_aplica_en_init(cliente):
+    ConfiguracionSistema.objects.create(pk=1, limite_adjuntos_mb=1)
+    response = cliente.post("/api/uploads/", {
+        "nombre_archivo": "grande.pdf", "tamano_total": 2 * 1024 * 1024,
+    }, format="json")
+    assert response.status_code == 413
+
+
+# ---------------------------------------------------------
+# 🧪 3. Checksum inválido
+# ---------------------------------------------------------
+def test_parte_con_checksum_invalido_se_descarta(cliente):
+    subida_id = iniciar(cliente).data["id"]
+    response = cliente.generic(
+        "PUT", f"/api/uploads/{subida_id}/append/", CONTENIDO[:500],
+        content_type="application/octet-stream",
+        HTTP_UPLOAD_OFFSET="0",
+        HTTP_X_CHUNK_SHA256="0" * 64,
+    )
+    assert response.status_code == 400
+    assert UploadSession.objects.get(id=subida_id).recibido == 0
@@ -9,7 +9,8 @@ from tickets.views import (
     AgentesDisponiblesView,
     CategoriaPrincipalViewSet,
     SubcategoriaViewSet,
-    TicketAssignmentViewSet
+    TicketAssignmentViewSet,
+    UploadViewSet
 )
 
 router = DefaultRouter()
@@ -26,6 +27,9 @@ router.register(r'subcategorias', SubcategoriaViewSet, basename='subcategorias')
 # Asignaciones (principalmente para administradores)
 router.register(r'asignaciones', TicketAssignmentViewSet, basename='asignaciones')
 
+# Subidas por partes (adjuntos de tickets y chat)
+router.register(r'uploads', UploadViewSet, basename='uploads')
+
 urlpatterns = [
     path('', include(router.urls)),
     
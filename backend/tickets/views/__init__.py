@@ -4,6 +4,7 @@ from .user_views import UserTicketViewSet
 from .admin_views import AdminTicketViewSet
 from .category_views import CategoriaPrincipalViewSet, SubcategoriaViewSet
 from .assignment_views import TicketAssignmentViewSet
+from .upload_views import UploadViewSet
 
 __all__ = [
     'BaseTicketViewSet',
@@ -14,5 +15,6 @@ __all__ = [
     'AgentesDisponiblesView',
     'CategoriaPrincipalViewSet',
     'SubcategoriaViewSet',
-    'TicketAssignmentViewSet'
+    'TicketAssignmentViewSet',
+    'UploadViewSet'
 ]
\ No newline at end of file
@@ -1,20 +1,22 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
-from django.utils import timezone
-from datetime import timedelta
+from django.db.models import Avg, Count, F, Q
 
 from tickets.models import Ticket, TicketAssignment
 from tickets.serializers import TicketSerializer, TicketDetailSerializer
 from tickets.permissions import IsAgenteOrAdmin
+from tickets.pagination import TicketPagination
+from tickets.optimizacion import ConsultaOptimizadaMixin, ListaRapidaMixin
+from tickets.condicional import DetalleCondicionalMixin
 
-class AdminTicketViewSet(viewsets.ModelViewSet):
+class AdminTicketViewSet(ConsultaOptimizadaMixin, ListaRapidaMixin, DetalleCondicionalMixin, viewsets.ModelViewSet):
     """
     Vista para administradores - Acceso completo a todos los tickets
     """
     serializer_class = TicketSerializer
     permission_classes = [IsAgenteOrAdmin]
+    pagination_class = TicketPagination
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -23,89 +25,91 @@ class AdminTicketViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Administradores ven todos los tickets"""
-        return Ticket.objects.all().order_by('-fecha_creacion')
+        return Ticket.objects.all().order_by('-fecha_creacion', '-id')
 
     @action(detail=False, methods=['get'])
     def estadisticas(self, request):
-        """Obtener estadísticas generales del sistema"""
-        # Estadísticas básicas
-        total_tickets = Ticket.objects.count()
-        tickets_abiertos = Ticket.objects.filter(estado='Abierto').count()
-        tickets_proceso = Ticket.objects.filter(estado='En Proceso').count()
-        tickets_resueltos = Ticket.objects.filter(estado='Resuelto').count()
-        
+        """Obtener estadísticas generales del sistema (cacheadas, ver DashboardCache)"""
+        from adminpanel.dashboard_cache import DashboardCache
+
+        data, estado_cache = DashboardCache.obtener(
+            'tickets_estadisticas', request.query_params, (), self.calcular_estadisticas
+        )
+        return Response(data, headers={'X-Cache': estado_cache})
+
+    def calcular_estadisticas(self):
+        """Estadísticas generales del sistema (mismos criterios que el dashboard)"""
+        # =============================
+        # 🚀 CONSULTA ÚNICA CON AGREGACIÓN CONDICIONAL
+        # =============================
+        metricas = Ticket.objects.aggregate(
+            total_tickets=Count('id'),
+            tickets_abiertos=Count('id', filter=Q(estado='Abierto')),
+            tickets_en_proceso=Count('id', filter=Q(estado='En Proceso')),
+            tickets_resueltos=Count('id', filter=Q(estado='Resuelto')),
+            tickets_vencidos=Count('id', filter=Ticket.filtro_vencidos()),
+            tickets_por_vencer=Count('id', filter=Ticket.filtro_por_vencer()),
+            tiempo_promedio_resolucion=Avg(
+                F('fecha_cierre') - F('fecha_creacion'),
+                filter=Q(fecha_cierre__isnull=False)
+            ),
+        )
+
         # Tickets por categoría
         tickets_por_categoria = Ticket.objects.values(
             'categoria_principal__nombre'
         ).annotate(
             total=Count('id')
         ).order_by('-total')
-        
-        # Tickets vencidos
-        tickets_vencidos = Ticket.objects.filter(esta_vencido=True).count()
-        
+
         # Reasignaciones pendientes
         reasignaciones_pendientes = TicketAssignment.objects.filter(estado='pendiente').count()
-        
-        # Tiempo promedio de resolución (solo tickets cerrados)
-        tickets_cerrados = Ticket.objects.filter(estado='Resuelto', fecha_cierre__isnull=False)
-        tiempo_promedio = None
-        if tickets_cerrados.exists():
-            total_segundos = sum(
-                (ticket.fecha_cierre - ticket.fecha_creacion).total_seconds()
-                for ticket in tickets_cerrados
-            )
-            tiempo_promedio_horas = total_segundos / (tickets_cerrados.count() * 3600)
-            tiempo_promedio = round(tiempo_promedio_horas, 1)
-        
-        return Response({
+
+        tiempo_promedio = metricas.pop('tiempo_promedio_resolucion')
+        if tiempo_promedio is not None:
+            tiempo_promedio = round(tiempo_promedio.total_seconds() / 3600, 1)
+
+        return {
             "estadisticas_generales": {
-                "total_tickets": total_tickets,
-                "tickets_abiertos": tickets_abiertos,
-                "tickets_en_proceso": tickets_proceso,
-                "tickets_resueltos": tickets_resueltos,
-                "tickets_vencidos": tickets_vencidos,
+                **metricas,
                 "reasignaciones_pendientes": reasignaciones_pendientes,
                 "tiempo_promedio_resolucion_horas": tiempo_promedio
             },
             "tickets_por_categoria": list(tickets_por_categoria),
-        })
+        }
 
     @action(detail=False, methods=['get'])
     def reporte_agentes(self, request):
-        """Reporte de desempeño por agente"""
+        """Reporte de desempeño por agente (una sola consulta agrupada)"""
         from users.models import User
-        
+
         # ✅ CORRECCIÓN: Usar tipo_base para encontrar a todos los agentes
-        agentes = User.objects.filter(rol__tipo_base='agente')
-        
+        agentes = User.objects.filter(rol__tipo_base='agente').select_related('rol').annotate(
+            total_asignados=Count('tickets_asignados'),
+            total_resueltos=Count('tickets_asignados', filter=Q(tickets_asignados__estado='Resuelto')),
+            total_vencidos=Count(
+                'tickets_asignados', filter=Ticket.filtro_vencidos('tickets_asignados__')
+            ),
+            rating_promedio=Avg('tickets_asignados__rating'),
+        )
+
         reporte_agentes = []
         for agente in agentes:
-            # Tickets asignados al agente
-            tickets_asignados = Ticket.objects.filter(agente=agente)
-            tickets_resueltos = tickets_asignados.filter(estado='Resuelto')
-            tickets_vencidos = tickets_asignados.filter(esta_vencido=True)
-            
             # Calcular tasa de resolución
             tasa_resolucion = 0
-            if tickets_asignados.exists():
-                tasa_resolucion = (tickets_resueltos.count() / tickets_asignados.count()) * 100
-            
-            # Rating promedio
-            rating_promedio = tickets_resueltos.aggregate(
-                avg_rating=Count('rating')
-            )['avg_rating'] or 0
-            
+            if agente.total_asignados:
+                tasa_resolucion = (agente.total_resueltos / agente.total_asignados) * 100
+
             reporte_agentes.append({
                 "agente": agente.username,
                 "role": agente.rol.nombre_visible if agente.rol else 'N/A',
-                "tickets_asignados": tickets_asignados.count(),
-                "tickets_resueltos": tickets_resueltos.count(),
-                "tickets_vencidos": tickets_vencidos.count(),
+                "tickets_asignados": agente.total_asignados,
+                "tickets_resueltos": agente.total_resueltos,
+                "tickets_vencidos": agente.total_vencidos,
                 "tasa_resolucion": round(tasa_resolucion, 1),
-                "rating_promedio": rating_promedio
+                "rating_promedio": round(agente.rating_promedio or 0, 2)
             })
-        
+
         return Response({
             "reporte_agentes": sorted(reporte_agentes, key=lambda x: x['tasa_resolucion'], reverse=True)
-        })
\ No newline at end of file
+        })
@@ -11,16 +11,20 @@ from tickets.models import Ticket, TicketAssignment
 from tickets.serializers import TicketSerializer, TicketDetailSerializer, TicketAssignmentCreateSerializer, TicketStateUpdateSerializer # Importar el nuevo serializer
 from tickets.permissions import IsTicketOwner, CanReassignTicket, CanChangeTicketState, IsAgenteOrAdmin, CanEditTicket, IsAgente
 from tickets.services.assignment_service import AssignmentService
+from tickets.pagination import TicketPagination
+from tickets.optimizacion import ConsultaOptimizadaMixin, ListaRapidaMixin
+from tickets.condicional import DetalleCondicionalMixin, etag_tablas, responder_condicional
 from tickets.services.state_service import StateService
 from users.models import User
 
-class AgentTicketViewSet(viewsets.ModelViewSet):
+class AgentTicketViewSet(ConsultaOptimizadaMixin, ListaRapidaMixin, DetalleCondicionalMixin, viewsets.ModelViewSet):
     """
     Vista para agentes - Ven tickets asignados y pendientes de aceptación
     """
     serializer_class = TicketSerializer
     permission_classes = [IsAgenteOrAdmin, IsTicketOwner]
-    
+    pagination_class = TicketPagination
+
     def get_serializer_class(self):
         if self.action == 'cambiar_estado':
             return TicketStateUpdateSerializer
@@ -47,7 +51,7 @@ class AgentTicketViewSet(viewsets.ModelViewSet):
                 Q(agente=user) | 
                 Q(solicitante=user) |
                 Q(id__in=list(tickets_pendientes_ids))
-            ).distinct().order_by('-fecha_actualizacion')
+            ).distinct().order_by('-fecha_actualizacion', '-id')
             
         # Si no está autenticado, no devolver nada.
         return Ticket.objects.none()
@@ -69,29 +73,19 @@ class AgentTicketViewSet(viewsets.ModelViewSet):
     def mis_tickets_creados(self, request):
         """Devuelve los tickets creados por el agente actual."""
         user = request.user
-        queryset = Ticket.objects.filter(solicitante=user).order_by('-fecha_actualizacion')
-        
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = self.optimizar_queryset(
+            Ticket.objects.filter(solicitante=user).order_by('-fecha_actualizacion', '-id')
+        )
+        return self.lista_rapida(queryset)
 
     @action(detail=False, methods=['get'], url_path='tickets-asignados-a-mi')
     def tickets_asignados_a_mi(self, request):
         """Devuelve los tickets asignados directamente al agente actual."""
         user = request.user
-        queryset = Ticket.objects.filter(agente=user).order_by('-fecha_actualizacion')
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = self.optimizar_queryset(
+            Ticket.objects.filter(agente=user).order_by('-fecha_actualizacion', '-id')
+        )
+        return self.lista_rapida(queryset)
 
     @action(detail=True, methods=['post'])
     def reasignar(self, request, pk=None):
@@ -365,6 +359,15 @@ class AgentesDisponiblesView(APIView):
     permission_classes = []  # Cambia a permisos más básicos
 
     def get(self, request):
+        # esta_activo depende de la hora: los agentes activos ahora entran en el ETag
+        activos = list(User.objects.filter(
+            Q(rol__tipo_base='agente') | Q(rol__tipo_base='admin'),
+            last_login__gte=timezone.now() - timedelta(minutes=3)
+        ).order_by('id').values_list('id', flat=True))
+        sello = etag_tablas(request, 'tickets', 'asignaciones', 'usuarios', 'roles', extra=activos)
+        return responder_condicional(request, lambda: self.listar(request), etag=sello)
+
+    def listar(self, request):
         """Listar todos los agentes disponibles"""
         try:            
             # ✅ CORRECCIÓN: Usar tipo_base para encontrar a todos los agentes y admins
@@ -424,6 +427,10 @@ class AgentesConectadosView(APIView):
     permission_classes = [] 
 
     def get(self, request):
+        sello = etag_tablas(request, 'tickets', 'asignaciones', 'usuarios', 'roles')
+        return responder_condicional(request, lambda: self.listar(request), etag=sello)
+
+    def listar(self, request):
         try:
             from asgiref.sync import async_to_sync
             from channels.layers import get_channel_layer
@@ -1,3 +1,5 @@
+from functools import partial
+
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -5,6 +7,7 @@ from rest_framework.response import Response
 from tickets.models import CategoriaPrincipal, Subcategoria
 from tickets.serializers import CategoriaPrincipalSerializer, SubcategoriaSerializer
 from tickets.permissions import IsAdminOrReadOnly
+from tickets.condicional import etag_tablas, responder_condicional
 
 class CategoriaPrincipalViewSet(viewsets.ModelViewSet):
     """
@@ -14,13 +17,25 @@ class CategoriaPrincipalViewSet(viewsets.ModelViewSet):
     serializer_class = CategoriaPrincipalSerializer
     permission_classes = [IsAdminOrReadOnly]
 
+    # Lecturas con ETag: 304 mientras no cambien categorías, subcategorías ni roles
+    def _condicional(self, request, generar):
+        return responder_condicional(request, generar, etag=etag_tablas(request, 'categorias', 'roles'))
+
+    def list(self, request, *args, **kwargs):
+        return self._condicional(request, partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._condicional(request, partial(super().retrieve, request, *args, **kwargs))
+
     @action(detail=True, methods=['get'])
     def subcategorias(self, request, pk=None):
         """Obtener subcategorías de una categoría específica"""
-        categoria = self.get_object()
-        subcategorias = categoria.subcategorias.all()
-        serializer = SubcategoriaSerializer(subcategorias, many=True)
-        return Response(serializer.data)
+        def generar():
+            categoria = self.get_object()
+            subcategorias = categoria.subcategorias.all()
+            serializer = SubcategoriaSerializer(subcategorias, many=True)
+            return Response(serializer.data)
+        return self._condicional(request, generar)
 
 
 class SubcategoriaViewSet(viewsets.ModelViewSet):
@@ -0,0 +1,108 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets, status, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from tickets.models import UploadSession
+from tickets.services.upload_service import UploadService
+
+
+def respuesta_servicio(resultado, status_ok=status.HTTP_200_OK):
+    """Convierte el dict del servicio en Response (usa 'status' para los errores)."""
+    if 'error' in resultado:
+        codigo = resultado.pop('status', status.HTTP_400_BAD_REQUEST)
+        return Response(resultado, status=codigo)
+    return Response(resultado, status=status_ok)
+
+
+class UploadViewSet(viewsets.ViewSet):
+    """
+    Subidas por partes y reanudables para adjuntos de tickets y chat.
+
+    POST   /uploads/                  → init {nombre_archivo, tamano_total, sha256?}
+    GET    /uploads/{id}/             → estado y offset para reanudar
+    PUT    /uploads/{id}/append/      → cuerpo binario; cabeceras Upload-Offset
+                                        y X-Chunk-SHA256 (opcional)
+    POST   /uploads/{id}/complete/    → {destino: 'ticket'|'mensaje', ticket_id |
+                                         room_id | group_name, content?}
+    DELETE /uploads/{id}/             → cancelar
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_subida(self, pk):
+        return get_object_or_404(UploadSession, pk=pk, usuario=self.request.user)
+
+    def serializar(self, subida):
+        return {
+            "id": str(subida.id),
+            "nombre_archivo": subida.nombre_archivo,
+            "tamano_total": subida.tamano_total,
+            "recibido": subida.recibido,
+            "estado": subida.estado,
+            "chunk_sugerido": UploadService.CHUNK_SUGERIDO_BYTES,
+            "chunk_maximo": UploadService.CHUNK_MAX_BYTES,
+        }
+
+    def create(self, request):
+        try:
+            tamano_total = int(request.data.get('tamano_total'))
+        except (TypeError, ValueError):
+            return Response({"error": "tamano_total es obligatorio"}, status=status.HTTP_400_BAD_REQUEST)
+
+        nombre_archivo = request.data.get('nombre_archivo')
+        if not nombre_archivo:
+            return Response({"error": "nombre_archivo es obligatorio"}, status=status.HTTP_400_BAD_REQUEST)
+
+        resultado = UploadService.iniciar(
+            request.user, nombre_archivo, tamano_total, request.data.get('sha256', '')
+        )
+        if 'error' in resultado:
+            return respuesta_servicio(resultado)
+        return Response(self.serializar(resultado['subida']), status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        return Response(self.serializar(self.get_subida(pk)))
+
+    def destroy(self, request, pk=None):
+        UploadService.cancelar(self.get_subida(pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['put', 'post'])
+    def append(self, request, pk=None):
+        subida = self.get_subida(pk)
+        try:
+            offset = int(request.headers.get('Upload-Offset', subida.recibido))
+            longitud = int(request.headers.get('Content-Length') or 0)
+        except ValueError:
+            return Response({"error": "Cabeceras inválidas"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Se lee el cuerpo crudo por bloques: no pasa por los parsers de DRF
+        resultado = UploadService.agregar_parte(
+            subida, offset, request.stream, longitud,
+            sha256_parte=request.headers.get('X-Chunk-SHA256'),
+        )
+        return respuesta_servicio(resultado)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        subida = self.get_subida(pk)
+        datos = {
+            key: request.data.get(key)
+            for key in ('ticket_id', 'room_id', 'group_name', 'content')
+            if request.data.get(key) is not None
+        }
+        for key in ('ticket_id', 'room_id'):
+            if key in datos:
+                try:
+                    datos[key] = int(datos[key])
+                except (TypeError, ValueError):
+                    return Response({"error": f"{key} debe ser un número"}, status=status.HTTP_400_BAD_REQUEST)
+        resultado = UploadService.completar(
+            subida, request.user, request.data.get('destino'), **datos
+        )
+        if 'message' in resultado:
+            from chat.serializers import MessageSerializer
+            resultado['message'] = MessageSerializer(
+                resultado['message'], context={"request": request}
+            ).data
+        return respuesta_servicio(resultado, status_ok=status.HTTP_201_CREATED)
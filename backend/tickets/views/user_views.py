@@ -3,7 +3,6 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
 from django.db.models import Q
-from django.utils import timezone
 
 from tickets.models import Ticket, TicketHistory
 from tickets.serializers import (   
@@ -12,17 +11,22 @@ from tickets.serializers import (
     TicketDetailSerializer
 )
 from tickets.permissions import IsSolicitante, IsTicketOwner
+from tickets.pagination import TicketPagination
+from tickets.optimizacion import ConsultaOptimizadaMixin, ListaRapidaMixin
+from tickets.condicional import DetalleCondicionalMixin
 from tickets.services.notification_service import NotificationService
 from tickets.services.agent_availability_service import AgentAvailabilityService
 from users.models import User
+from adminpanel.calendario import CalendarioService
 
 
-class UserTicketViewSet(viewsets.ModelViewSet):
+class UserTicketViewSet(ConsultaOptimizadaMixin, ListaRapidaMixin, DetalleCondicionalMixin, viewsets.ModelViewSet):
     """
     Vista para Solicitantes - Permite a los usuarios con rol de Solicitante gestionar sus propios tickets.
     """
     serializer_class = TicketSerializer
     permission_classes = [IsSolicitante, IsTicketOwner]
+    pagination_class = TicketPagination
 
     # -------------------------------------------
     # Serializers dinámicos
@@ -40,16 +44,16 @@ class UserTicketViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Ticket.objects.filter(
             solicitante=self.request.user
-        ).order_by('-fecha_creacion')
+        ).order_by('-fecha_creacion', '-id')
 
     # -------------------------------------------
     # Crear ticket
     # -------------------------------------------
     def perform_create(self, serializer):
-        # 1) Validar horario
-        hora_actual = timezone.localtime().time()
-        if hora_actual.hour >= 15:
-            raise ValidationError("❌ No se reciben tickets después de las 3 PM.")
+        # 1) Validar horario (hora límite configurable)
+        if not CalendarioService.antes_de_hora_limite():
+            hora_limite = CalendarioService.hora_limite_tickets()
+            raise ValidationError(f"❌ No se reciben tickets después de las {hora_limite:%H:%M}.")
 
         # 2) Crear ticket
         ticket = serializer.save()
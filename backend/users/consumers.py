@@ -1,11 +1,11 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
-import json
 from django.core.cache import cache
 from urllib.parse import parse_qs
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from hr_backend import json_rapido
 
 User = get_user_model()
 
@@ -68,7 +68,7 @@ class PresenceConsumer(AsyncWebsocketConsumer):
 
     async def presence_update(self, event):
         # Enviar el mensaje de actualización de presencia al cliente WebSocket
-        await self.send(text_data=json.dumps(event["payload"]))
+        await self.send(text_data=json_rapido.dumps(event["payload"]))
 
     async def authenticate_via_token(self):
         """